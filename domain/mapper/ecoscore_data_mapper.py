@@ -26,7 +26,7 @@ class EcoscoreDataMapper:
             product_dict
         )
 
-        return EcoscoreData(
+        return EcoscoreData.build(
             score=(
                 int(product_dict.get(score_field))
                 if product_dict.get(score_field)
@@ -4,7 +4,8 @@ from domain.utils.ingredient_normalizer import IngredientNormalizer
 
 class IngredientsMapper:
     """
-    This is a class that maps products values to Ingredients objects.
+    This is a class that maps products values to Ingredients objects. The ingredients text in title format and the
+    ingredients list of a product come from the same entry of the cache of the ingredient normalizer.
 
     Attributes:
         ingredient_normalizer (IngredientNormalizer)
@@ -21,12 +22,12 @@ class IngredientsMapper:
         """Maps the given ingredients string of an FDC product to an Ingredients object containing:
         - ingredients_list: a normalized list of ingredients
         - ingredients_text: the formatted ingredients string"""
-        ingredients_list = self.ingredient_normalizer.normalise_ingredients_list(
-            ingredients
+        ingredients_text, ingredients_list = (
+            self.ingredient_normalizer.normalise_ingredients(ingredients)
         )
 
-        return Ingredients(
-            ingredients_list=ingredients_list, ingredients_text=ingredients.title()
+        return Ingredients.build(
+            ingredients_list=ingredients_list, ingredients_text=ingredients_text or None
         )
 
     def map_off_dict_to_ingredients(self, product_dict: dict) -> Ingredients:
@@ -35,10 +36,12 @@ class IngredientsMapper:
         - ingredients_text: the formatted ingredients string"""
         ingredients_text_field = "ingredients_text"
 
-        return Ingredients(
-            ingredients_list=self.ingredient_normalizer.normalise_ingredients_list(
+        ingredients_text, ingredients_list = (
+            self.ingredient_normalizer.normalise_ingredients(
                 product_dict.get(ingredients_text_field)
-            ),
-            ingredients_text=product_dict.get(ingredients_text_field, "").title()
-            or None,
+            )
+        )
+
+        return Ingredients.build(
+            ingredients_list=ingredients_list, ingredients_text=ingredients_text or None
         )
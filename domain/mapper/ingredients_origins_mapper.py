@@ -21,7 +21,7 @@ class IngredientsOriginMapper:
         if isinstance(origins_value, str):
             origins_value = [origins_value.strip()] if origins_value.strip() else []
 
-        return IngredientsOrigins(
+        return IngredientsOrigins.build(
             origins=origins_value,
             percent=None,
             transportation_score=None,
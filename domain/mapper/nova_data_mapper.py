@@ -16,7 +16,7 @@ class NovaDataMapper:
         - group_markers"""
         score_field = "nova_group"
 
-        return NovaData(
+        return NovaData.build(
             score=(
                 int(product_dict.get(score_field))
                 if isinstance(product_dict.get(score_field), int)
@@ -1,4 +1,4 @@
-from decimal import Decimal
+from domain.utils.unit_converter import UnitConverter
 
 
 class NutrientAmountMapper:
@@ -6,37 +6,17 @@ class NutrientAmountMapper:
     This is a class that maps products values to NutrientAmount objects.
 
     Attributes:
-       unit_conversions_to_g (IngredientNormalizer)
+       unit_conversions_to_g (dict[str, float]): The number of units in a gram of each convertible unit, shared with the
+       UnitConverter
 
     Methods:
        map_nutrient(nutrient_value, nutrient_unit): Maps the given nutrient value to its corresponding value in grams
     """
 
     def __init__(self):
-        self.unit_conversions_to_g = {
-            "mcg": 1000000,
-            "mg": 1000,
-            "cg": 100,
-            "dg": 10,
-        }
+        self.unit_conversions_to_g = UnitConverter.units_per_gram
 
-    def map_nutrient(self, nutrient_value, nutrient_unit: str):
-        """Maps the given nutrient value to its corresponding value in grams"""
-        if nutrient_value is None or nutrient_unit is None:
-            return None
-
-        converted_value = None
-        nutrient_unit = nutrient_unit.strip().lower()
-
-        if nutrient_unit == "g":
-            converted_value = nutrient_value
-        elif nutrient_unit == "iu":
-            converted_value = (
-                Decimal(nutrient_value) * Decimal("0.3") / Decimal("1000000")
-            )
-        elif nutrient_unit in self.unit_conversions_to_g:
-            converted_value = (
-                Decimal(nutrient_value) / self.unit_conversions_to_g[nutrient_unit]
-            )
-
-        return float(converted_value) if converted_value is not None else None
+    @staticmethod
+    def map_nutrient(nutrient_value, nutrient_unit: str):
+        """Maps the given nutrient value to its corresponding value in grams, with the UnitConverter"""
+        return UnitConverter.to_grams(nutrient_value, nutrient_unit)
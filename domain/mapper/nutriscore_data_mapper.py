@@ -1,8 +1,11 @@
-from decimal import Decimal
+import numpy as np
+
 from domain.mapper.number_mapper import NumberMapper
 from domain.product.complexFields.score.nutriscore_data import NutriscoreData
 from domain.utils.converter import Converter
-from domain.mapper.nutrient_amount_mapper import NutrientAmountMapper
+from domain.utils.fdc_nutrient_index import FdcNutrientIndex
+from domain.utils.nutrient_matrix import NutrientMatrix
+from domain.utils.unit_converter import UnitConverter
 
 
 class NutriscoreDataMapper:
@@ -11,21 +14,39 @@ class NutriscoreDataMapper:
 
     Attributes:
         number_mapper (NumberMapper)
-        energy_kcal_to_kj (Decimal): The decimal value to convert energy value from kcal to kj
+        energy_kcal_to_kj (float): The factor converting an energy value from kcal to kj
+        off_nutriment_fields (tuple[str, ...]): The fields of the nutriscore data filled from the OFF nutriments
 
     Methods:
-        map_fdc_dict_to_nutriscore_data(food_nutrients): Maps the given food_nutrients list to a NutriscoreData object
+        map_fdc_dict_to_nutriscore_data(food_nutrients): Maps the given food_nutrients list (or its FdcNutrientIndex) to a
+        NutriscoreData object
         map_off_dict_to_nutriscore_data(product_dict): Maps the given dictionary to a NutriscoreData object
+        fill_off_nutriments(nutriments, product_dicts): Fills the given NutrientMatrix with the nutriscore data of the
+        given OFF products
+        map_off_dicts_to_nutriscore_data(product_dicts, nutriments, as_dicts): Maps the given dictionaries, with their
+        NutrientMatrix, to NutriscoreData objects or to their dictionaries
     """
 
+    # The fields of the nutriscore data filled from the OFF nutriments, in the order of fill_off_nutriments
+    off_nutriment_fields = (
+        "energy_kcal_100g",
+        "fibers_100g",
+        "proteins_100g",
+        "saturated_fats_100g",
+        "sodium_100g",
+        "sugar_100g",
+        "fruit_percentage",
+    )
+
     def __init__(self, number_mapper: NumberMapper):
         self.number_mapper = number_mapper
-        self.energy_kcal_to_kj = Decimal(4.1868)
+        self.energy_kcal_to_kj = 4.1868
 
     def map_fdc_dict_to_nutriscore_data(
-        self, food_nutrients: list[dict]
+        self, food_nutrients: list[dict] | FdcNutrientIndex
     ) -> NutriscoreData:
-        """Maps the given food nutrients list of an FDC product to a NutriscoreData object"""
+        """Maps the given food nutrients list of an FDC product, or its index, to a NutriscoreData object"""
+        food_nutrients = FdcNutrientIndex.of(food_nutrients)
         nutrient_ids = {
             "fibers_100g": 1079,
             "proteins_100g": 1003,
@@ -40,81 +61,102 @@ class NutriscoreDataMapper:
             "is_beverage": None,
         }
 
-        energy_kcal = next(
-            (
-                item["amount"]
-                for item in food_nutrients
-                if item["nutrient"]["id"] == 1008
-            ),
-            None,
-        )
+        energy_kcal = food_nutrients.amount(1008)
 
         if energy_kcal is not None:
             nutriscore_data["energy_kcal_100g"] = float(energy_kcal)
 
         for field, nutrient_id in nutrient_ids.items():
-            value = next(
-                (
-                    item["amount"]
-                    for item in food_nutrients
-                    if item["nutrient"]["id"] == nutrient_id
-                ),
-                None,
-            )
-            unit = next(
-                (
-                    item["nutrient"]["unitName"]
-                    for item in food_nutrients
-                    if item["nutrient"]["id"] == nutrient_id
-                ),
-                None,
+            nutriscore_data[field] = UnitConverter.to_grams(
+                food_nutrients.amount(nutrient_id), food_nutrients.unit(nutrient_id)
             )
 
-            nutriscore_data[field] = NutrientAmountMapper().map_nutrient(value, unit)
-
-        return NutriscoreData(**nutriscore_data)
+        return NutriscoreData.build(**nutriscore_data)
 
     def map_off_dict_to_nutriscore_data(self, product_dict: dict) -> NutriscoreData:
-        """Maps the values in a given OFF (jsonl) product to a NutriscoreData object"""
-        nutrients_field = "nutriments"
+        """Maps the values in a given OFF (jsonl) product to a NutriscoreData object. The NaN nutriments are missing
+        values (None), as in the NutrientMatrix of map_off_dicts_to_nutriscore_data"""
         nutriscore_score_field = "nutriscore_grade"
-        energy_field = "energy-kcal_100g"
-        fibers_field = "fiber_100g"
-        fruit_percentage_field = "fruits-vegetables-nuts_100g"
-        proteins_field = "proteins_100g"
-        saturated_fats_field = "saturated-fat_100g"
-        sodium_field = "sodium_100g"
-        sugar_field = "sugars_100g"
-
-        return NutriscoreData(
-            score=(
-                self.number_mapper.map_letter_to_number(
-                    product_dict.get(nutriscore_score_field)
-                )
-                if product_dict.get(nutriscore_score_field)
-                else None
-            ),
-            energy_kcal_100g=product_dict.get(nutrients_field, {}).get(energy_field),
-            fibers_100g=(
-                Converter.safe_float(
-                    product_dict.get(nutrients_field, {}).get(fibers_field)
+
+        return NutriscoreData.build(
+            score=self.__map_off_score(product_dict.get(nutriscore_score_field)),
+            **{
+                field: Converter.none_if_nan(value)
+                for field, value in zip(
+                    self.off_nutriment_fields,
+                    self.__map_off_nutriments(product_dict.get("nutriments", {})),
                 )
-                if product_dict.get(nutrients_field, {}).get(fibers_field) is not None
-                else None
+            },
+            is_beverage=None,
+        )
+
+    def fill_off_nutriments(
+        self, nutriments: NutrientMatrix, product_dicts: list[dict]
+    ) -> None:
+        """Fills the nutriscore data columns of the given NutrientMatrix with the nutriments of the given OFF (jsonl)
+        products, converted as by map_off_dict_to_nutriscore_data"""
+        rows = [
+            self.__map_off_nutriments(product_dict.get("nutriments", {}))
+            for product_dict in product_dicts
+        ]
+        nutriments.fill(
+            [f"nutriscore_data.{field}" for field in self.off_nutriment_fields],
+            np.array(rows, dtype=np.float64).reshape(
+                len(rows), len(self.off_nutriment_fields)
             ),
-            fruit_percentage=(
-                Converter.safe_float(
-                    product_dict.get(nutrients_field, {}).get(fruit_percentage_field)
-                )
-                if product_dict.get(nutrients_field, {}).get(fruit_percentage_field)
-                is not None
+        )
+
+    def map_off_dicts_to_nutriscore_data(
+        self,
+        product_dicts: list[dict],
+        nutriments: NutrientMatrix,
+        as_dicts: bool = False,
+    ) -> list[NutriscoreData] | list[dict]:
+        """Maps the given OFF (jsonl) products, with their NutrientMatrix filled by fill_off_nutriments, to
+        NutriscoreData objects, or directly to their dictionaries (as given by model_dump) if as_dicts is True
+        """
+        nutriscore_data = []
+        for product_dict, nutriscore_values in zip(
+            product_dicts, nutriments.section_dicts("nutriscore_data")
+        ):
+            nutriscore_values["score"] = self.__map_off_score(
+                product_dict.get("nutriscore_grade")
+            )
+            nutriscore_values["is_beverage"] = None
+            nutriscore_data.append(
+                nutriscore_values
+                if as_dicts
+                else NutriscoreData.build(**nutriscore_values)
+            )
+        return nutriscore_data
+
+    def __map_off_nutriments(self, product_nutriments: dict) -> list[float | None]:
+        """Returns the values of the off_nutriment_fields of the given OFF nutriments, in their order"""
+        return [
+            Converter.optional_float(product_nutriments.get("energy-kcal_100g")),
+            (
+                Converter.safe_float(product_nutriments.get("fiber_100g"))
+                if product_nutriments.get("fiber_100g") is not None
                 else None
             ),
-            proteins_100g=product_dict.get(nutrients_field, {}).get(proteins_field),
-            saturated_fats_100g=product_dict.get(nutrients_field, {}).get(
-                saturated_fats_field
+            Converter.optional_float(product_nutriments.get("proteins_100g")),
+            Converter.optional_float(product_nutriments.get("saturated-fat_100g")),
+            Converter.optional_float(product_nutriments.get("sodium_100g")),
+            Converter.optional_float(product_nutriments.get("sugars_100g")),
+            self.__map_off_fruit_percentage(
+                product_nutriments.get("fruits-vegetables-nuts_100g")
             ),
-            sodium_100g=product_dict.get(nutrients_field, {}).get(sodium_field),
-            sugar_100g=product_dict.get(nutrients_field, {}).get(sugar_field),
-            is_beverage=None,
+        ]
+
+    def __map_off_score(self, grade: str | None) -> int | None:
+        """Returns the score of the given nutriscore grade, None if there is no grade"""
+        return self.number_mapper.map_letter_to_number(grade) if grade else None
+
+    @staticmethod
+    def __map_off_fruit_percentage(fruit_percentage) -> float | None:
+        """Returns the given fruits, vegetables and nuts percentage as a float, None if it is missing or invalid"""
+        return (
+            Converter.safe_float(fruit_percentage)
+            if fruit_percentage is not None
+            else None
         )
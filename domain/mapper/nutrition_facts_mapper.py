@@ -1,6 +1,7 @@
-from decimal import Decimal
+import math
+
+import numpy as np
 
-from domain.mapper.nutrient_amount_mapper import NutrientAmountMapper
 from domain.product.complexFields.nutrition_facts import NutritionFacts
 from domain.product.complexFields.nutritionFactsPerHundredGrams import (
     NutritionFactsPerHundredGrams,
@@ -8,6 +9,10 @@ from domain.product.complexFields.nutritionFactsPerHundredGrams import (
 from domain.product.complexFields.nutritionFactsPerServing import (
     NutritionFactsPerServing,
 )
+from domain.utils.converter import Converter
+from domain.utils.fdc_nutrient_index import FdcNutrientIndex
+from domain.utils.nutrient_matrix import NutrientMatrix
+from domain.utils.unit_converter import UnitConverter
 
 
 class NutritionFactsMapper:
@@ -15,15 +20,90 @@ class NutritionFactsMapper:
     This is a class that maps products values to NutritionFacts objects.
 
     Attributes:
-        sodium_to_salt (Decimal): The decimal value to convert sodium value to salt value
+        off_nutriments_100g (dict[str, str]): The field of the nutrition facts per 100g of each OFF nutriment
+        off_nutriments_serving (dict[str, str]): The field of the nutrition facts per serving of each OFF nutriment
+        off_nutriment_columns (tuple[str, ...]): The OFF nutriments read by fill_off_nutriments
+        section_100g (str): The section of the NutrientMatrix columns of the nutrition facts per 100g
+        section_serving (str): The section of the NutrientMatrix columns of the nutrition facts per serving
+        sodium_to_salt (float): The factor converting a sodium value to a salt value
 
     Methods:
-        map_fdc_dict_to_nutrition_facts(food_nutrients): Maps the given food nutrients list to a NutritionFacts object
+        map_fdc_dict_to_nutrition_facts(food_nutrients): Maps the given food nutrients list (or its FdcNutrientIndex) to a
+        NutritionFacts object
         map_off_dict_to_nutrition_facts(product_dict): Maps the given dictionary to a NutritionFacts object
+        fill_off_nutriments(nutriments, product_dicts): Fills the given NutrientMatrix with the nutrition facts of the
+        given OFF products
+        map_nutrient_matrix_to_nutrition_facts(nutriments, as_dicts): Maps each row of the given NutrientMatrix to a
+        NutritionFacts object or to its dictionary
     """
 
+    # The OFF nutriments per 100g and per serving, with the fields of the nutrition facts they are mapped to
+    off_nutriments_100g = {
+        "fat_100g": "fat_100g",
+        "salt_100g": "salt_100g",
+        "saturated-fat_100g": "saturated_fats_100g",
+        "sugars_100g": "sugar_100g",
+        "carbohydrates_100g": "carbohydrates_100g",
+        "energy-kcal_100g": "energy_kcal_100g",
+        "vitamin-a_100g": "vitamin_a_100g",
+        "proteins_100g": "proteins_100g",
+        "fiber_100g": "fibers_100g",
+        "sodium_100g": "sodium_100g",
+        "monounsaturated-fat_100g": "monounsaturated_fats_100g",
+        "polyunsaturated-fat_100g": "polyunsaturated_fats_100g",
+        "trans-fat_100g": "trans_fats_100g",
+        "cholesterol_100g": "cholesterol_100g",
+        "calcium_100g": "calcium_100g",
+        "iron_100g": "iron_100g",
+        "potassium_100g": "potassium_100g",
+        "vitamin-b1_100g": "vitamin_b1_100g",
+        "vitamin-b2_100g": "vitamin_b2_100g",
+        "vitamin-b6_100g": "vitamin_b6_100g",
+        "vitamin-b9_100g": "vitamin_b9_100g",
+        "vitamin-b12_100g": "vitamin_b12_100g",
+        "vitamin-c_100g": "vitamin_c_100g",
+        "vitamin-pp_100g": "vitamin_pp_100g",
+        "phosphorus_100g": "phosphorus_100g",
+        "magnesium_100g": "magnesium_100g",
+        "zinc_100g": "zinc_100g",
+        "folates_100g": "folates_100g",
+        "pantothenic-acid_100g": "pantothenic_acid_100g",
+        "soluble-fiber_100g": "soluble_fiber_100g",
+        "insoluble-fiber_100g": "insoluble_fiber_100g",
+        "copper_100g": "copper_100g",
+        "manganese_100g": "manganese_100g",
+        "polyols_100g": "polyols_100g",
+        "selenium_100g": "selenium_100g",
+        "phylloguinone_100g": "phylloguinone_100g",
+        "iodine_100g": "iodine_100g",
+        "biotin_100g": "biotin_100g",
+        "caffeine_100g": "caffeine_100g",
+        "molybdenum_100g": "molybdenum_100g",
+        "chromium_100g": "chromium_100g",
+    }
+    off_nutriments_serving = {
+        "fat_serving": "fat_serving",
+        "salt_serving": "salt_serving",
+        "saturated_fats_serving": "saturated_fats_serving",
+        "sugars_serving": "sugar_serving",
+        "carbohydrates_serving": "carbohydrates_serving",
+        "energy_serving": "energy_serving",
+        "energy-kcal_serving": "energy_kcal_serving",
+        "proteins_serving": "proteins_serving",
+        "fibers_serving": "fibers_serving",
+        "sodium_serving": "sodium_serving",
+        "trans_fats_serving": "trans_fats_serving",
+        "cholesterol_serving": "cholesterol_serving",
+        "calcium_serving": "calcium_serving",
+        "iron_serving": "iron_serving",
+        "potassium_serving": "potassium_serving",
+    }
+    off_nutriment_columns = (*off_nutriments_100g, *off_nutriments_serving)
+    section_100g = "nutrition_facts.nutrition_facts_per_hundred_grams"
+    section_serving = "nutrition_facts.nutrition_facts_per_serving"
+
     def __init__(self):
-        self.sodium_to_salt = Decimal(2.5)
+        self.sodium_to_salt = 2.5
         self.units_in_nutrition_table = {
             "fat": "g",
             "saturatedFat": "g",
@@ -42,13 +122,13 @@ class NutritionFactsMapper:
 
     def map_fdc_dict_to_nutrition_facts(
         self,
-        food_nutrients_per_100g: list[dict],
+        food_nutrients_per_100g: list[dict] | FdcNutrientIndex,
         food_nutrients_per_serving: dict,
         preparation_state_code: str,
     ) -> NutritionFacts:
 
         nutrition_facts_per_100g = self.__map_fdc_dict_to_nutrition_facts_per_100g(
-            food_nutrients_per_100g
+            FdcNutrientIndex.of(food_nutrients_per_100g)
         )
         nutrition_facts_per_serving = (
             self.__map_fdc_dict_to_nutrition_facts_per_serving(
@@ -56,129 +136,122 @@ class NutritionFactsMapper:
             )
         )
 
-        return NutritionFacts(
+        return NutritionFacts.build(
             nutrition_facts_per_hundred_grams=nutrition_facts_per_100g,
             nutrition_facts_per_serving=nutrition_facts_per_serving,
         )
 
     @staticmethod
     def map_off_dict_to_nutrition_facts(product_dict: dict) -> NutritionFacts:
-        """Maps the values in a given OFF (jsonl) product to a NutritionFacts object"""
+        """Maps the values in a given OFF (jsonl) product to a NutritionFacts object. The NaN nutriments (e.g. "nan")
+        are missing values (None), as in the NutrientMatrix of fill_off_nutriments"""
         nutriments = product_dict.get("nutriments", {})
 
-        fields_100g = [
-            "fat_100g",
-            "salt_100g",
-            "saturated-fat_100g",
-            "sugars_100g",
-            "carbohydrates_100g",
-            "energy-kcal_100g",
-            "vitamin-a_100g",
-            "proteins_100g",
-            "fiber_100g",
-            "sodium_100g",
-            "monounsaturated-fat_100g",
-            "polyunsaturated-fat_100g",
-            "trans-fat_100g",
-            "cholesterol_100g",
-            "calcium_100g",
-            "iron_100g",
-            "potassium_100g",
-            "vitamin-b1_100g",
-            "vitamin-b2_100g",
-            "vitamin-b6_100g",
-            "vitamin-b9_100g",
-            "vitamin-b12_100g",
-            "vitamin-c_100g",
-            "vitamin-pp_100g",
-            "phosphorus_100g",
-            "magnesium_100g",
-            "zinc_100g",
-            "folates_100g",
-            "pantothenic-acid_100g",
-            "soluble-fiber_100g",
-            "insoluble-fiber_100g",
-            "copper_100g",
-            "manganese_100g",
-            "polyols_100g",
-            "selenium_100g",
-            "phylloguinone_100g",
-            "iodine_100g",
-            "biotin_100g",
-            "caffeine_100g",
-            "molybdenum_100g",
-            "chromium_100g",
-        ]
-
-        field_mapping = {
-            "saturated-fat_100g": "saturated_fats_100g",
-            "sugars_100g": "sugar_100g",
-            "trans-fat_100g": "trans_fats_100g",
-            "fiber_100g": "fibers_100g",
-            "monounsaturated-fat_100g": "monounsaturated_fats_100g",
-            "polyunsaturated-fat_100g": "polyunsaturated_fats_100g",
-            "energy-kcal_100g": "energy_kcal_100g",
-            "vitamin-a_100g": "vitamin_a_100g",
-            "vitamin-b1_100g": "vitamin_b1_100g",
-            "vitamin-b2_100g": "vitamin_b2_100g",
-            "vitamin-b6_100g": "vitamin_b6_100g",
-            "vitamin-b9_100g": "vitamin_b9_100g",
-            "vitamin-b12_100g": "vitamin_b12_100g",
-            "vitamin-c_100g": "vitamin_c_100g",
-            "vitamin-pp_100g": "vitamin_pp_100g",
-            "pantothenic-acid_100g": "pantothenic_acid_100g",
-            "soluble-fiber_100g": "soluble_fiber_100g",
-            "insoluble-fiber_100g": "insoluble_fiber_100g",
-        }
-
         nutrition_facts_100g = {
-            field_mapping.get(field, field): (
-                float(nutriments[field]) if field in nutriments else None
+            field: (
+                Converter.none_if_nan(float(nutriments[nutriment]))
+                if nutriment in nutriments
+                else None
             )
-            for field in fields_100g
-        }
-
-        fields_serving = [
-            "fat_serving",
-            "salt_serving",
-            "saturated_fats_serving",
-            "sugars_serving",
-            "carbohydrates_serving",
-            "energy_serving",
-            "energy-kcal_serving",
-            "proteins_serving",
-            "fibers_serving",
-            "sodium_serving",
-            "trans_fats_serving",
-            "cholesterol_serving",
-            "calcium_serving",
-            "iron_serving",
-            "potassium_serving",
-        ]
-
-        serving_mapping = {
-            "energy-kcal_serving": "energy_kcal_serving",
-            "sugars_serving": "sugar_serving",
+            for nutriment, field in NutritionFactsMapper.off_nutriments_100g.items()
         }
-
         nutrition_facts_serving = {
-            serving_mapping.get(field, field): (
-                float(nutriments[field]) if field in nutriments else None
+            field: (
+                Converter.none_if_nan(float(nutriments[nutriment]))
+                if nutriment in nutriments
+                else None
             )
-            for field in fields_serving
+            for nutriment, field in NutritionFactsMapper.off_nutriments_serving.items()
         }
 
-        return NutritionFacts(
-            nutrition_facts_per_hundred_grams=NutritionFactsPerHundredGrams(
+        return NutritionFacts.build(
+            nutrition_facts_per_hundred_grams=NutritionFactsPerHundredGrams.build(
                 **nutrition_facts_100g
             ),
-            nutrition_facts_per_serving=NutritionFactsPerServing(
+            nutrition_facts_per_serving=NutritionFactsPerServing.build(
                 **nutrition_facts_serving
             ),
         )
 
+    @staticmethod
+    def fill_off_nutriments(
+        nutriments: NutrientMatrix, product_dicts: list[dict]
+    ) -> None:
+        """Fills the nutrition facts columns of the given NutrientMatrix with the nutriments of the given OFF (jsonl)
+        products, read in a single pass. Raises a ValueError or a TypeError, as the mapping of a single product, if a
+        nutriment is not a number
+        """
+        off_columns = NutritionFactsMapper.off_nutriment_columns
+        rows = []
+        for product_dict in product_dicts:
+            get_nutriment = product_dict.get("nutriments", {}).get
+            row = [get_nutriment(nutriment, math.nan) for nutriment in off_columns]
+            # NumPy would turn a null nutriment into NaN, which float() refuses
+            if None in row:
+                raise TypeError(
+                    f"Null nutriment {off_columns[row.index(None)]} in the product {product_dict.get('code')}"
+                )
+            rows.append(row)
+        values = np.array(rows, dtype=np.float64).reshape(len(rows), len(off_columns))
+
+        # The nutriments which are not fields of the models (energy_serving) are checked but not kept
+        columns = {
+            **{
+                f"{NutritionFactsMapper.section_100g}.{field}": index
+                for index, field in enumerate(
+                    NutritionFactsMapper.off_nutriments_100g.values()
+                )
+            },
+            **{
+                f"{NutritionFactsMapper.section_serving}.{field}": index
+                for index, field in enumerate(
+                    NutritionFactsMapper.off_nutriments_serving.values(),
+                    len(NutritionFactsMapper.off_nutriments_100g),
+                )
+            },
+        }
+        columns = {
+            column: index
+            for column, index in columns.items()
+            if column in NutrientMatrix.column_indexes
+        }
+        nutriments.fill(columns, values[:, list(columns.values())])
+
+    @staticmethod
+    def map_nutrient_matrix_to_nutrition_facts(
+        nutriments: NutrientMatrix, as_dicts: bool = False
+    ) -> list[NutritionFacts] | list[dict]:
+        """Maps the rows of the given NutrientMatrix to NutritionFacts objects, or directly to their dictionaries (as
+        given by model_dump) if as_dicts is True"""
+        values_100g = nutriments.section_dicts(NutritionFactsMapper.section_100g)
+        values_serving = nutriments.section_dicts(NutritionFactsMapper.section_serving)
+        if as_dicts:
+            return [
+                {
+                    "nutrition_facts_per_hundred_grams": product_values_100g,
+                    "nutrition_facts_per_serving": product_values_serving,
+                }
+                for product_values_100g, product_values_serving in zip(
+                    values_100g, values_serving
+                )
+            ]
+
+        return [
+            NutritionFacts.build(
+                nutrition_facts_per_hundred_grams=NutritionFactsPerHundredGrams.build(
+                    **product_values_100g
+                ),
+                nutrition_facts_per_serving=NutritionFactsPerServing.build(
+                    **product_values_serving
+                ),
+            )
+            for product_values_100g, product_values_serving in zip(
+                values_100g, values_serving
+            )
+        ]
+
     def __map_fdc_dict_to_nutrition_facts_per_100g(
-        self, food_nutrients: list[dict]
+        self, food_nutrients: FdcNutrientIndex
     ) -> NutritionFactsPerHundredGrams:
         nutrient_ids = {
             "fat_100g": 1004,
@@ -225,22 +298,20 @@ class NutritionFactsMapper:
 
         nutrition_facts_data = {}
         for field, nutrient_id in nutrient_ids.items():
-            value = self.__get_nutrient_level_per_100g(food_nutrients, nutrient_id)
-            unit = self.__get_nutrient_unit(food_nutrients, nutrient_id)
+            value = food_nutrients.amount_per_100g(nutrient_id)
+            unit = food_nutrients.unit(nutrient_id)
 
             if field == "sodium_100g" and value is not None:
-                nutrition_facts_data["salt_100g"] = NutrientAmountMapper().map_nutrient(
-                    value * self.sodium_to_salt, unit
+                nutrition_facts_data["salt_100g"] = UnitConverter.to_grams(
+                    float(value) * self.sodium_to_salt, unit
                 )
             if field == "energy_kcal_100g" and value is not None:
-                nutrition_facts_data["energy_kcal_100g"] = round(value)
+                nutrition_facts_data["energy_kcal_100g"] = float(round(value))
 
             if field != "energy_kcal_100g":
-                nutrition_facts_data[field] = NutrientAmountMapper().map_nutrient(
-                    value, unit
-                )
+                nutrition_facts_data[field] = UnitConverter.to_grams(value, unit)
 
-        return NutritionFactsPerHundredGrams(**nutrition_facts_data)
+        return NutritionFactsPerHundredGrams.build(**nutrition_facts_data)
 
     def __map_fdc_dict_to_nutrition_facts_per_serving(
         self, food_nutrients_per_serving: dict, preparation_state_code: str
@@ -262,12 +333,12 @@ class NutritionFactsMapper:
         )
 
         salt_serving = (
-            float(sodium_serving) * float(self.sodium_to_salt)
+            float(sodium_serving) * self.sodium_to_salt
             if sodium_serving is not None
             else None
         )
 
-        return NutritionFactsPerServing(
+        return NutritionFactsPerServing.build(
             is_for_prepared_food=is_for_prepared_food,
             fat_serving=self.__get_nutrient_level_per_serving(
                 food_nutrients_per_serving, "fat"
@@ -320,38 +391,7 @@ class NutritionFactsMapper:
             value = food_nutrients_per_serving.get(nutrient_name).get("value")
             if nutrient_name != "calories":
                 unit = self.units_in_nutrition_table.get(nutrient_name)
-                value = NutrientAmountMapper().map_nutrient(value, unit)
+                value = UnitConverter.to_grams(value, unit)
+            else:
+                value = Converter.optional_float(value)
         return value
-
-    @staticmethod
-    def __get_nutrient_level_per_100g(food_nutrients, searched_id):
-        """Returns the nutrient level of a nutrient by its id in a given food nutrients dictionary.
-        Returns None if the amount is greater than 100.
-
-        Args:
-            food_nutrients: the nutrients dictionary in which the specific nutrient level is searched
-            searched_id: the id of the wanted nutrient
-        """
-        return next(
-            (
-                item["amount"]
-                for item in food_nutrients
-                if item["nutrient"]["id"] == searched_id and item["amount"] <= 100
-            ),
-            None,
-        )
-
-    @staticmethod
-    def __get_nutrient_unit(food_nutrients, searched_id):
-        """Returns the nutrient unit of a nutrient by its id in a given food nutrients dictionary
-        Args:
-            food_nutrients: the nutrients dictionary in which the specific nutrient unit is searched
-            searched_id: the id of the wanted nutrient"""
-        return next(
-            (
-                item["nutrient"]["unitName"].lower()
-                for item in food_nutrients
-                if item["nutrient"]["id"] == searched_id
-            ),
-            None,
-        )
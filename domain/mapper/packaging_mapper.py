@@ -16,7 +16,7 @@ class PackagingMapper:
         - packaging: the list of materials used in the package"""
         packaging_tags_field = "packaging_tags"
 
-        return Packaging(
+        return Packaging.build(
             non_recyclable_and_non_biodegradable_materials=None,
             packaging=(
                 product_dict.get(packaging_tags_field)
@@ -1,3 +1,8 @@
+import itertools
+import logging
+
+import numpy as np
+
 from domain.mapper.brands_mapper import BrandsMapper
 from domain.mapper.ecoscore_data_mapper import EcoscoreDataMapper
 from domain.mapper.food_groups_mapper import FoodGroupsMapper
@@ -6,7 +11,13 @@ from domain.mapper.nova_data_mapper import NovaDataMapper
 from domain.mapper.nutriscore_data_mapper import NutriscoreDataMapper
 from domain.mapper.nutrition_facts_mapper import NutritionFactsMapper
 from domain.mapper.category_mapper import CategoryMapper
+from domain.product.complexFields.complex_field import ComplexField
+from domain.product.complexFields.nutrition_facts import NutritionFacts
+from domain.product.complexFields.score.nutriscore_data import NutriscoreData
 from domain.product.product import Product
+from domain.utils.converter import Converter
+from domain.utils.fdc_nutrient_index import FdcNutrientIndex
+from domain.utils.nutrient_matrix import NutrientMatrix
 from domain.validator.nova_data_validator import NovaDataValidator
 from domain.validator.product_validator import ProductValidator
 from datetime import datetime, timezone
@@ -15,10 +26,21 @@ from datetime import datetime, timezone
 class ProductMapper:
     """
     This is a class that maps objects dicts read from different files to Product objects.
+    In trusted construction mode (see ComplexField), set by the mapper for the products it maps, one product out of
+    validation_sample is also fully validated, the validated product replacing the mapped one if they differ, so that
+    a mapper giving values of the wrong types is detected.
+
+    Attributes:
+        trusted_construction (bool): Whether the models of the mapped products are built without validating them
+        validation_sample (int): The number of products mapped for each one validated in trusted construction mode (0
+        for none)
+        validation_mismatches (int): The number of validated products which differed from the mapped ones
 
     Methods:
         map_fdc_dict_to_product(product_dict): Maps the given dictionary to a Product object
         map_off_dict_to_product(product_dict): Maps the given dictionary to a Product object
+        map_off_dicts_to_products(product_dicts, as_dicts): Maps the given dictionaries to Product objects, or to their
+        dictionaries
     """
 
     def __init__(
@@ -27,14 +49,25 @@ class ProductMapper:
         nutriscore_data_mapper: NutriscoreDataMapper,
         nutrition_facts_mapper: NutritionFactsMapper,
         category_mapper: CategoryMapper,
+        validation_sample: int = 0,
+        trusted_construction: bool = False,
     ):
         self.ingredients_mapper = ingredients_mapper
         self.nutriscore_data_mapper = nutriscore_data_mapper
         self.nutrition_facts_mapper = nutrition_facts_mapper
         self.category_mapper = category_mapper
+        self.validation_sample = validation_sample
+        self.trusted_construction = trusted_construction
+        self.validation_mismatches = 0
+        self.__mapped_products = itertools.count(1)
 
     def map_fdc_dict_to_product(self, product_dict: dict) -> Product:
         """Maps a dictionary from an FDC json export to a product object"""
+        with ComplexField.construction_mode(self.trusted_construction):
+            return self.__map_fdc_dict(product_dict)
+
+    def __map_fdc_dict(self, product_dict: dict) -> Product:
+        """Maps a dictionary from an FDC json export to a product object in the current construction mode"""
         id_field = "gtinUpc"
         fdc_id_field = "fdcId"
         product_name_field = "description"
@@ -51,7 +84,10 @@ class ProductMapper:
             "brandedFoodCategory"  # TODO convert fdc categories to off food groups
         )
 
-        return Product(
+        # Indexed once for the nutrition facts and the nutriscore data
+        food_nutrients = FdcNutrientIndex(product_dict[food_nutrients_field])
+
+        product = Product.build(
             id_match=product_dict[id_field]
             .strip()
             .replace(" ", "")
@@ -94,23 +130,86 @@ class ProductMapper:
             ingredients=self.ingredients_mapper.map_fdc_dict_to_ingredients(
                 product_dict[ingredients_field]
             ),
-            serving_size=product_dict.get("servingSize"),
+            serving_size=Converter.optional_float(product_dict.get("servingSize")),
             serving_size_unit=product_dict.get("servingSizeUnit"),
             nutrition_facts=self.nutrition_facts_mapper.map_fdc_dict_to_nutrition_facts(
-                product_dict[food_nutrients_field],
+                food_nutrients,
                 product_dict.get("labelNutrients"),
                 product_dict.get("preparationStateCode"),
             ),
             nutriscore_data=self.nutriscore_data_mapper.map_fdc_dict_to_nutriscore_data(
-                product_dict[food_nutrients_field]
+                food_nutrients
             ),
             ecoscore_data=None,
             nova_data=None,
         )
+        return self.__validate_sample(product)
 
     def map_off_dict_to_product(self, product_dict: dict) -> Product | None:
         """Maps a dictionary from a jsonl export of OFF to a product object"""
+        with ComplexField.construction_mode(self.trusted_construction):
+            return self.__map_off_dict(
+                product_dict,
+                self.nutrition_facts_mapper.map_off_dict_to_nutrition_facts(
+                    product_dict
+                ),
+                self.nutriscore_data_mapper.map_off_dict_to_nutriscore_data(
+                    product_dict
+                ),
+            )
+
+    def map_off_dicts_to_products(
+        self, product_dicts: list[dict], as_dicts: bool = False
+    ) -> list[Product] | list[dict]:
+        """Maps a batch of dictionaries from a jsonl export of OFF to product objects, or to their dictionaries ready
+        to be written to MongoDB (as given by model_dump) if as_dicts is True. The nutriments of the whole batch are
+        extracted in a NutrientMatrix, from which the nutrition facts and the nutriscore data dictionaries are built
+        without models. The matrix is of float64, so that the values are stored with the precision of the mapping of a
+        single product (the float32 matrices, rounded to 6 significant digits, are for the analysis in memory).
+        Raises the error of the first product which cannot be mapped, as map_off_dict_to_product
+        """
+        with ComplexField.construction_mode(self.trusted_construction):
+            return self.__map_off_dicts(product_dicts, as_dicts)
+
+    def __map_off_dicts(
+        self, product_dicts: list[dict], as_dicts: bool
+    ) -> list[Product] | list[dict]:
+        """Maps a batch of dictionaries from a jsonl export of OFF in the current construction mode"""
+        nutriments = NutrientMatrix(len(product_dicts), np.float64)
+        self.nutrition_facts_mapper.fill_off_nutriments(nutriments, product_dicts)
+        self.nutriscore_data_mapper.fill_off_nutriments(nutriments, product_dicts)
+        nutrition_facts = (
+            self.nutrition_facts_mapper.map_nutrient_matrix_to_nutrition_facts(
+                nutriments, as_dicts
+            )
+        )
+        nutriscore_data = self.nutriscore_data_mapper.map_off_dicts_to_nutriscore_data(
+            product_dicts, nutriments, as_dicts
+        )
+        if not as_dicts:
+            return [
+                self.__map_off_dict(*mapped)
+                for mapped in zip(product_dicts, nutrition_facts, nutriscore_data)
+            ]
 
+        documents = []
+        for product_dict, product_nutrition_facts, product_nutriscore_data in zip(
+            product_dicts, nutrition_facts, nutriscore_data
+        ):
+            document = self.__map_off_dict(product_dict, None, None).model_dump()
+            document["nutrition_facts"] = product_nutrition_facts
+            document["nutriscore_data"] = product_nutriscore_data
+            documents.append(document)
+        return documents
+
+    def __map_off_dict(
+        self,
+        product_dict: dict,
+        nutrition_facts: NutritionFacts | None,
+        nutriscore_data: NutriscoreData | None,
+    ) -> Product:
+        """Maps a dictionary from a jsonl export of OFF, with its mapped nutrition facts and nutriscore data, to a
+        product object"""
         id_field = "code"
         product_name_field = "product_name"
         modified_date_field = "last_modified_t"
@@ -132,7 +231,7 @@ class ProductMapper:
 
         raw_categories = product_dict.get(category_field)
 
-        return Product(
+        product = Product.build(
             id_match=product_dict.get(id_field).strip().lstrip("0").replace("-", ""),
             id_original=product_dict.get(id_field).strip(),
             product_name=product_dict.get(product_name_field, "").strip().title()
@@ -159,20 +258,41 @@ class ProductMapper:
             ingredients=self.ingredients_mapper.map_off_dict_to_ingredients(
                 product_dict
             ),
-            serving_size=product_dict.get(serving_size_field),
+            serving_size=Converter.optional_float(product_dict.get(serving_size_field)),
             serving_size_unit=product_dict.get(serving_size_unit_field),
             nutrition_data_per=product_dict.get(nutrition_data_per_field),
-            nutrition_facts=self.nutrition_facts_mapper.map_off_dict_to_nutrition_facts(
-                product_dict
-            ),
-            nutriscore_data=self.nutriscore_data_mapper.map_off_dict_to_nutriscore_data(
-                product_dict
-            ),
+            nutrition_facts=nutrition_facts,
+            nutriscore_data=nutriscore_data,
             ecoscore_data=EcoscoreDataMapper.map_off_dict_to_ecoscore_data(
                 product_dict
             ),
             nova_data=NovaDataMapper.map_off_dict_to_nova_data(product_dict),
         )
+        return self.__validate_sample(product)
+
+    def __validate_sample(self, product: Product) -> Product:
+        """Returns the given product, or its validated copy if it is part of the validation sample of the trusted
+        construction mode and differs from it. Raises a ValidationError if the product is invalid
+        """
+        if (
+            not self.trusted_construction
+            or self.validation_sample <= 0
+            or next(self.__mapped_products) % self.validation_sample != 0
+        ):
+            return product
+
+        mapped = product.model_dump(warnings=False)
+        validated = Product.model_validate(mapped)
+        validated_fields = validated.model_dump()
+        if validated_fields != mapped:
+            self.validation_mismatches += 1
+            fields = [name for name in mapped if mapped[name] != validated_fields[name]]
+            logging.warning(
+                f"Product {product.id_match} mapped without validation differs from its validation on "
+                f"{', '.join(fields)}: a mapper gives values of the wrong types"
+            )
+            return validated
+        return product
 
     @staticmethod
     def __off_json_is_raw_aliment(product_dict: dict) -> bool:
@@ -17,7 +17,7 @@ class ProductionSystemMapper:
         - warning"""
         labels_field = "labels_tags"
 
-        return ProductionSystem(
+        return ProductionSystem.build(
             labels=(
                 product_dict.get(labels_field)
                 if product_dict.get(labels_field) is not None
@@ -1,7 +1,30 @@
+import contextlib
+import threading
+import typing
+from typing import Any, ClassVar, Iterator
+
 from pydantic import field_validator, BaseModel
 
 
 class ComplexField(BaseModel):
+    """
+    This is a class that is the base of the product models, whose fields are validated with empty strings turned into
+    None. The mappers build the models with build(), which skips the validation in trusted construction mode: the
+    values given by the mappers already have the types of the fields, and the empty strings of the string fields are
+    turned into None without a validator call per field.
+    The construction mode is set by the construction_mode() context for the current thread only, so that the mapping
+    threads and the other users of the models of a process do not change the mode of each other.
+
+    Methods:
+        build(**values): Builds the model from values given by a mapper, validated unless in trusted construction mode
+        trusted(**values): Builds the model from values of the types of its fields, without validating them
+        construction_mode(trusted): Returns a context in which build() uses the given construction mode
+        is_trusted_construction(): Indicates whether build() skips the validation in the current thread
+    """
+
+    __construction_mode: ClassVar[threading.local] = threading.local()
+    __string_fields: ClassVar[dict[type, tuple[str, ...]]] = {}
+
     @field_validator("*", mode="before")
     @classmethod
     def empty_string_to_none(cls, v):
@@ -9,3 +32,58 @@ class ComplexField(BaseModel):
         if v == "":
             return None
         return v
+
+    @classmethod
+    def build(cls, **values: Any) -> "ComplexField":
+        """Builds the model from values given by a mapper, without validating them in trusted construction mode"""
+        if ComplexField.is_trusted_construction():
+            return cls.__construct(values)
+        return cls(**values)
+
+    @classmethod
+    def trusted(cls, **values: Any) -> "ComplexField":
+        """Builds the model from values which already have the types of its fields, without validating them. The empty
+        strings of the string fields are turned into None and the missing fields take their default values, as with
+        the validation
+        """
+        return cls.__construct(values)
+
+    @staticmethod
+    @contextlib.contextmanager
+    def construction_mode(trusted: bool) -> Iterator[None]:
+        """Sets the construction mode (trusted or validated) of build() in the current thread within the context, the
+        previous mode being restored when it exits"""
+        previous = ComplexField.is_trusted_construction()
+        ComplexField.__construction_mode.trusted = trusted
+        try:
+            yield
+        finally:
+            ComplexField.__construction_mode.trusted = previous
+
+    @staticmethod
+    def is_trusted_construction() -> bool:
+        """Returns True if build() skips the validation in the current thread, False otherwise"""
+        return getattr(ComplexField.__construction_mode, "trusted", False)
+
+    @classmethod
+    def __construct(cls, values: dict) -> "ComplexField":
+        """Builds the model from the given dictionary of values, which it takes over, with the model_construct() of
+        pydantic: the unknown fields are ignored and the missing ones take their default values, as with the validation
+        """
+        for name in cls.__get_string_fields():
+            if values.get(name) == "":
+                values[name] = None
+        return cls.model_construct(**values)
+
+    @classmethod
+    def __get_string_fields(cls) -> tuple[str, ...]:
+        """Returns the names of the string fields of the model"""
+        string_fields = ComplexField.__string_fields.get(cls)
+        if string_fields is None:
+            string_fields = tuple(
+                name
+                for name, field in cls.model_fields.items()
+                if str in (field.annotation, *typing.get_args(field.annotation))
+            )
+            ComplexField.__string_fields[cls] = string_fields
+        return string_fields
@@ -1,8 +1,9 @@
 import re
 
-import ijson
 import unicodedata
 
+from domain.utils.ijson_backend import IjsonBackend
+
 
 class CategoryCreator:
     """
@@ -94,8 +95,8 @@ class CategoryCreator:
         """Returns the mapping of FDC to OFF categories from a json file"""
         mapping = {}
 
-        with open(file_path, "r", encoding="utf-8") as file:
-            for obj in ijson.items(file, "categories.item"):
+        with open(file_path, "rb") as file:
+            for obj in IjsonBackend.get_backend().items(file, "categories.item"):
                 matching_categories = obj.get("off")
                 if matching_categories is not None:
                     mapping[obj.get("fdc")] = [
@@ -5,6 +5,8 @@ class Converter:
     Methods:
         safe_int(string):  Converts a string to an integer if possible
         safe_float(string): Converts a string to a float if possible
+        optional_float(value): Converts a value to a float as the validation of a float field does
+        none_if_nan(value): Returns None for a NaN value, which is a missing value
     """
 
     @staticmethod
@@ -15,6 +17,20 @@ class Converter:
         except ValueError:
             return None
 
+    @staticmethod
+    def optional_float(value) -> float | None:
+        """Returns the value (number or numeric string) converted to a float, or None if it is None or an empty string,
+        as the validation of an optional float field of the product models does. Raises a ValueError otherwise
+        """
+        if value is None or value == "":
+            return None
+        return float(value)
+
+    @staticmethod
+    def none_if_nan(value: float | None) -> float | None:
+        """Returns None if the given float is NaN (a missing value, as in a NutrientMatrix), the given value otherwise"""
+        return None if value != value else value
+
     @staticmethod
     def safe_float(variable_to_convert: str) -> float | None:
         """Returns the string converted to a float if it is possible, None otherwise"""
@@ -0,0 +1,56 @@
+class FdcNutrientIndex:
+    """
+    This is a class that indexes the foodNutrients list of an FDC product by nutrient id, in a single pass over the
+    list, so that the mappers look each nutrient up instead of scanning the whole list for each one. For each nutrient
+    id, it keeps the values of the first entry with this id, and the first amount of at most 100 (the amounts above
+    100 being per serving or erroneous for the values per 100g). A missing foodNutrients list gives an empty index.
+
+    Attributes:
+        entries (dict[int, tuple]): The first amount, the unit name of the first entry and the first amount of at most
+        100 of each nutrient id
+
+    Methods:
+        of(food_nutrients): Returns the index of the given foodNutrients list, or the given index itself
+        amount(nutrient_id): Returns the amount of the first entry of the nutrient
+        amount_per_100g(nutrient_id): Returns the first amount of at most 100 of the nutrient
+        unit(nutrient_id): Returns the unit name of the first entry of the nutrient
+    """
+
+    def __init__(self, food_nutrients: list[dict] | None):
+        entries = {}
+        for item in food_nutrients or ():
+            nutrient_id = item["nutrient"]["id"]
+            amount = item["amount"]
+            within_100 = amount is not None and amount <= 100
+            entry = entries.get(nutrient_id)
+            if entry is None:
+                entries[nutrient_id] = (
+                    amount,
+                    item["nutrient"].get("unitName"),
+                    amount if within_100 else None,
+                )
+            elif entry[2] is None and within_100:
+                entries[nutrient_id] = (entry[0], entry[1], amount)
+        self.entries = entries
+
+    @classmethod
+    def of(cls, food_nutrients: "list[dict] | FdcNutrientIndex") -> "FdcNutrientIndex":
+        """Returns the index of the given foodNutrients list, or the given index if it is already indexed"""
+        return (
+            food_nutrients if isinstance(food_nutrients, cls) else cls(food_nutrients)
+        )
+
+    def amount(self, nutrient_id: int):
+        """Returns the amount of the first entry of the nutrient, None if there is no entry"""
+        entry = self.entries.get(nutrient_id)
+        return entry[0] if entry is not None else None
+
+    def amount_per_100g(self, nutrient_id: int):
+        """Returns the first amount of at most 100 of the nutrient, None if there is none"""
+        entry = self.entries.get(nutrient_id)
+        return entry[2] if entry is not None else None
+
+    def unit(self, nutrient_id: int) -> str | None:
+        """Returns the unit name of the first entry of the nutrient, None if there is no entry"""
+        entry = self.entries.get(nutrient_id)
+        return entry[1] if entry is not None else None
@@ -0,0 +1,42 @@
+import logging
+
+import ijson
+
+
+class IjsonBackend:
+    """
+    This is a class that selects the fastest available ijson backend to parse json files opened in binary mode.
+
+    Attributes:
+        preferred_backends (list[str]): The names of the ijson backends to try, from the fastest to the slowest
+        native_backends (list[str]): The names of the ijson backends building the objects in C
+
+    Methods:
+        get_backend(): Returns the fastest available ijson backend
+        builds_objects_natively(): Returns True if the selected backend builds the objects in C
+    """
+
+    preferred_backends = ["yajl2_c", "yajl2_cffi", "python"]
+    native_backends = ["yajl2_c"]
+    __backend = None
+
+    @classmethod
+    def get_backend(cls):
+        """Returns the fastest available ijson backend, which provides the same functions (items, parse...) as the ijson
+        module. The backend is selected and logged on the first call only"""
+        if cls.__backend is None:
+            for name in cls.preferred_backends:
+                try:
+                    cls.__backend = ijson.get_backend(name)
+                    break
+                except ImportError:
+                    continue
+            logging.info(f"Parsing json files with the {name} ijson backend")
+
+        return cls.__backend
+
+    @classmethod
+    def builds_objects_natively(cls) -> bool:
+        """Returns True if the selected backend builds the objects of items() in C, in which case building whole objects
+        is faster than handling the parsing events in Python"""
+        return cls.get_backend().backend_name in cls.native_backends
@@ -0,0 +1,49 @@
+import re
+
+NAME_PATTERN = re.compile(r"[^(\[]*")
+
+
+class IngredientNode:
+    """
+    This is a class that is a node of the sub-ingredient tree of an ingredients text: an ingredient with the
+    ingredients listed between its brackets, e.g. "Enriched Flour (Wheat Flour, Niacin)" has the name "Enriched Flour"
+    and the children "Wheat Flour" and "Niacin". The nodes are not modified once built, the trees being shared by the
+    callers of the cache of the IngredientNormalizer.
+
+    Attributes:
+        text (str): The ingredient with its brackets, as in the ingredients list
+        children (tuple[IngredientNode, ...]): The ingredients listed between the brackets of the ingredient
+
+    Methods:
+        name: The ingredient before its brackets (its whole text if it starts with a bracket)
+        to_dict(): Returns the node and its children as nested dictionaries
+    """
+
+    __slots__ = ("text", "children")
+
+    def __init__(self, text: str, children: tuple = ()):
+        self.text = text
+        self.children = children
+
+    @property
+    def name(self) -> str:
+        """The ingredient before its brackets, computed when needed as most nodes are only read for their text"""
+        return NAME_PATTERN.match(self.text).group().rstrip() or self.text
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, IngredientNode):
+            return NotImplemented
+        return (self.text, self.children) == (other.text, other.children)
+
+    def __hash__(self) -> int:
+        return hash((self.text, self.children))
+
+    def __repr__(self) -> str:
+        return f"IngredientNode({self.text!r}, {self.children!r})"
+
+    def to_dict(self) -> dict:
+        """Returns the name of the ingredient and the dictionaries of its children"""
+        return {
+            "name": self.name,
+            "children": [child.to_dict() for child in self.children],
+        }
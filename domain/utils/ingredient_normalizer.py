@@ -1,68 +1,152 @@
+import functools
 import re
 
+from domain.utils.ingredient_node import IngredientNode
+
+# The periods which are not the decimal point of a number separate the ingredients as the commas
+SEPARATOR_PERIOD_PATTERN = re.compile(r"\.(?:(?!\d)|(?<!\d\.))")
+SPECIAL_CHARACTER_PATTERN = re.compile(r"[,:()\[\]]")
+CONTAINS_PREFIX_PATTERN = re.compile(r"contains\b.*?\bof\b\s*", flags=re.IGNORECASE)
+CLOSING_BRACKETS = {"(": ")", "[": "]"}
+
 
 class IngredientNormalizer:
     """
-    This is a class that normalizes given ingredients strings to formatted lists.
+    This is a class that normalizes given ingredients strings to formatted lists and sub-ingredient trees. The text,
+    in title format, is read in a single pass by a state machine going from a comma, colon or bracket to the next one
+    and tracking the bracket depth: the ingredients are split on the commas (and periods) of their level, their
+    prefixes up to the last colon of their level (e.g. "Contains 2% Or Less Of:") are removed and the repeated ones
+    are skipped, at any depth of brackets.
+    The normalized texts are memoized in a bounded LRU cache keyed on the raw text, many products sharing the same
+    ingredients text (the same recipe sold under several brands or sizes). The cache is safe to share between the
+    mapping threads of an import.
+
+    Attributes:
+        cache_size (int): The maximum number of ingredients texts kept in the cache (0 to disable it)
 
     Methods:
-       normalise_ingredients_list(ingredients_text): Converts the given ingredients text to a formatted ingredients list
+        normalise_ingredients(ingredients_text): Returns the ingredients text in title format and its ingredients list
+        normalise_ingredients_list(ingredients_text): Converts the given ingredients text to a formatted ingredients list
+        ingredients_tree(ingredients_text): Returns the sub-ingredient tree of the given ingredients text
+        hits: The number of ingredients texts found in the cache
+        misses: The number of ingredients texts normalized and added to the cache
     """
 
+    def __init__(self, cache_size: int = 8192):
+        self.cache_size = cache_size
+        self.__normalise_cached = functools.lru_cache(maxsize=cache_size)(
+            self.__normalise
+        )
+
+    @property
+    def hits(self) -> int:
+        """The number of ingredients texts found in the cache"""
+        return self.__normalise_cached.cache_info().hits
+
+    @property
+    def misses(self) -> int:
+        """The number of ingredients texts normalized and added to the cache"""
+        return self.__normalise_cached.cache_info().misses
+
+    def normalise_ingredients(self, ingredients_text: str) -> tuple[str, list[str]]:
+        """Returns the given ingredients text in title format and its normalised ingredients list, from a single
+        cache entry. A missing or empty text gives an empty text and an empty list"""
+        if not ingredients_text:
+            return "", []
+
+        title_text, ingredients = self.__normalise_cached(ingredients_text)
+        # The cached list is a tuple of nodes, each caller getting its own list
+        return title_text, [ingredient.text for ingredient in ingredients]
+
     def normalise_ingredients_list(self, ingredients_text: str) -> list[str]:
         """Creates a normalised ingredients list based on a given text of ingredients.
         ingredients_text is an enumeration of the ingredients separated by a comma"""
+        return self.normalise_ingredients(ingredients_text)[1]
 
+    def ingredients_tree(self, ingredients_text: str) -> list[IngredientNode]:
+        """Returns the sub-ingredient tree of the given ingredients text: a node per ingredient of the normalised
+        ingredients list, whose children are the ingredients listed between its brackets
+        """
         if not ingredients_text:
             return []
 
-        ingredients_text = ingredients_text.title()
-        ingredients_text = self.__remove_unnecessary_text(ingredients_text)
-        ingredients_list = self.__segment_ingredients(ingredients_text)
-        ingredients_list = self.__clean_ingredients(ingredients_list)
-        ingredients_list = self.__remove_repetitions(ingredients_list)
+        return list(self.__normalise_cached(ingredients_text)[1])
 
-        return ingredients_list
-
-    @staticmethod
-    def __remove_unnecessary_text(ingredients_text: str) -> str:
-        """Removes text that is not essential information about the ingredients (e.g. "contains", ".", etc.)"""
-        cleaned_text = re.sub(
-            r"contains.*?of", "contains of", ingredients_text, flags=re.IGNORECASE
+    def __normalise(
+        self, ingredients_text: str
+    ) -> tuple[str, tuple[IngredientNode, ...]]:
+        """Returns the given non-empty ingredients text in title format and the nodes of its ingredients"""
+        title_text = ingredients_text.title()
+        return title_text, self.__tokenize(
+            SEPARATOR_PERIOD_PATTERN.sub(",", title_text)
         )
-        cleaned_text = cleaned_text.replace(".", ",")
-        return cleaned_text.strip()
 
-    @staticmethod
-    def __segment_ingredients(ingredients_text: str) -> list[str]:
-        """Splits the text by commas, excluding the ones between '(' or '[' and ']' or ')'"""
-        if ingredients_text.endswith(","):
-            ingredients_text = ingredients_text[:-1]
-
-        pattern = r"[^,()\[\]]+(?:\([^\(\)]*\))?(?:\[[^\[\]]*\])?"
-        ingredients_list = re.findall(pattern, ingredients_text)
+    def __tokenize(self, text: str) -> tuple[IngredientNode, ...]:
+        """Returns the nodes of the ingredients of the given text, read from a comma, colon or bracket to the next one.
+        The state of the current bracket level (its closing bracket, the start of its current ingredient, its
+        ingredients and the sub-ingredients of its current ingredient) is pushed on a stack at each opening bracket
+        and popped at the closing one. A closing bracket without opening bracket separates the ingredients as a comma,
+        and the brackets left open at the end of the text are closed"""
+        add_node = self.__add_node
+        stack = []
+        closing, start, nodes, seen, children = None, 0, [], set(), []
 
-        return ingredients_list
+        for match in SPECIAL_CHARACTER_PATTERN.finditer(text):
+            position = match.start()
+            character = text[position]
+            if character == ":":
+                # The prefix of the ingredient up to the colon is removed, with its sub-ingredients
+                start, children = position + 1, []
+            elif character in CLOSING_BRACKETS:
+                stack.append((closing, start, nodes, seen, children))
+                closing, start, nodes, seen, children = (
+                    CLOSING_BRACKETS[character],
+                    position + 1,
+                    [],
+                    set(),
+                    [],
+                )
+            elif character == "," or not stack:
+                add_node(nodes, seen, text[start:position], children)
+                start, children = position + 1, []
+            else:
+                add_node(nodes, seen, text[start:position], children)
+                sub_ingredients = nodes
+                closing, start, nodes, seen, children = stack.pop()
+                children.extend(sub_ingredients)
 
-    @staticmethod
-    def __clean_ingredients(ingredients_list: list[str]) -> list[str]:
-        """Removes everything before the last appearing colon for each ingredient in the list"""
-        cleaned_ingredients_list = []
-        for ingredient in ingredients_list:
-            ingredient = ingredient.strip()
-            ingredient = re.sub(r".*:(.*)", r"\1", ingredient).strip()
-            cleaned_ingredients_list.append(ingredient)
+        missing_brackets = ""
+        while stack:
+            add_node(nodes, seen, text[start:], children, missing_brackets)
+            missing_brackets += closing
+            sub_ingredients = nodes
+            closing, start, nodes, seen, children = stack.pop()
+            children.extend(sub_ingredients)
+        add_node(nodes, seen, text[start:], children, missing_brackets)
 
-        return cleaned_ingredients_list
+        return tuple(nodes)
 
     @staticmethod
-    def __remove_repetitions(ingredients_list: list[str]) -> list[str]:
-        """Removes repetitions in the list while keeping the order of the first occurrences"""
-        seen = set()
-        simplified_ingredients_list = []
-        for item in ingredients_list:
-            if item not in seen:
-                simplified_ingredients_list.append(item)
-                seen.add(item)
-
-        return simplified_ingredients_list
+    def __add_node(
+        nodes: list[IngredientNode],
+        seen: set[str],
+        ingredient: str,
+        children: list[IngredientNode],
+        missing_brackets: str = "",
+    ) -> None:
+        """Adds the node of the given ingredient to the nodes of its level, unless it is empty or already there. The
+        text that is not essential information about the ingredient (e.g. "Contains 2% Or Less Of") is removed
+        """
+        ingredient = ingredient.strip()
+        if ingredient.startswith("Contains"):
+            contains_prefix = CONTAINS_PREFIX_PATTERN.match(ingredient)
+            if contains_prefix:
+                ingredient = ingredient[contains_prefix.end() :]
+        if not ingredient:
+            return
+
+        ingredient += missing_brackets
+        if ingredient in seen:
+            return
+        seen.add(ingredient)
+        nodes.append(IngredientNode(ingredient, tuple(children) if children else ()))
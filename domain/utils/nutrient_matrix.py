@@ -0,0 +1,192 @@
+from typing import Any, Iterable, Optional
+
+import numpy as np
+
+from domain.product.complexFields.nutritionFactsPerHundredGrams import (
+    NutritionFactsPerHundredGrams,
+)
+from domain.product.complexFields.nutritionFactsPerServing import (
+    NutritionFactsPerServing,
+)
+from domain.product.complexFields.score.nutriscore_data import NutriscoreData
+
+
+class NutrientMatrix:
+    """
+    This is a class that stores the nutrient values of a batch of products in columns: a NumPy array of float32 with a
+    row per product and a column per nutrient, NaN for the missing values, instead of the three nutrient models of each
+    product. The columns are the float fields of the nutrient models of a product, named after their path in the
+    product (the column registry), and are the same for every matrix.
+    The float32 values keep 6 significant digits: the values read back as Python floats are rounded to them, so that a
+    value such as 63.78 is read back as 63.78.
+
+    Attributes:
+        sections (dict[str, type]): The nutrient model of each section (path in the product) of the columns
+        columns (tuple[str, ...]): The column registry, the path in the product of the field of each column
+        column_indexes (dict[str, int]): The index of each column
+        significant_digits (int): The number of significant digits kept by the float32 values
+        values (np.ndarray): The nutrient values, of shape (number of products, number of columns)
+
+    Methods:
+        index(column): Returns the index of the given column
+        column(column): Returns the values of the given column, as a writable view
+        fill(columns, values): Sets the values of the given columns
+        derive(target, source, factor): Fills the missing values of a column from the values of another one
+        validity: The validity bitmap, a bit per value set if the value is present
+        is_valid(row, column): Returns True if the given value is present
+        to_float64(columns): Returns the values of the given columns as float64, rounded to the significant digits
+        to_python(values): Returns the given float32 values as Python floats (None for NaN), rounded
+        section_dicts(section): Returns the dictionary of the model of the given section of each product
+        from_products(products): Returns the matrix of the given products or product dictionaries
+    """
+
+    sections = {
+        "nutrition_facts.nutrition_facts_per_hundred_grams": NutritionFactsPerHundredGrams,
+        "nutrition_facts.nutrition_facts_per_serving": NutritionFactsPerServing,
+        "nutriscore_data": NutriscoreData,
+    }
+    columns = tuple(
+        f"{section}.{name}"
+        for section, model in sections.items()
+        for name, field in model.model_fields.items()
+        if field.annotation == Optional[float]
+    )
+    column_indexes = {column: index for index, column in enumerate(columns)}
+    significant_digits = 6
+
+    def __init__(self, size: int, dtype: type = np.float32):
+        self.values = np.full((size, len(self.columns)), np.nan, dtype=dtype)
+
+    def __len__(self) -> int:
+        return self.values.shape[0]
+
+    @classmethod
+    def index(cls, column: str) -> int:
+        """Returns the index of the given column, raises a ValueError if it is not in the registry"""
+        try:
+            return cls.column_indexes[column]
+        except KeyError:
+            raise ValueError(f"Unknown nutrient column {column}") from None
+
+    def column(self, column: str) -> np.ndarray:
+        """Returns the values of the given column, as a view whose changes are made in the matrix"""
+        return self.values[:, self.index(column)]
+
+    def fill(self, columns: Iterable[str], values) -> None:
+        """Sets the values of the given columns from an array (or list of rows) of shape (number of products, number of
+        columns), the missing values being NaN or None"""
+        self.values[:, [self.index(column) for column in columns]] = np.asarray(
+            values, dtype=np.float64
+        )
+
+    def derive(self, target: str, source: str, factor: float) -> None:
+        """Fills the missing values of the target column with the values of the source column multiplied by the factor
+        (salt from sodium...), in a single vectorized operation"""
+        target_values = self.column(target)
+        missing = np.isnan(target_values)
+        target_values[missing] = self.column(source)[missing] * factor
+
+    @property
+    def validity(self) -> np.ndarray:
+        """The validity bitmap: an array of uint8 of a row per product, whose bit j (little endian bit order) is set if
+        the value of the column j is present"""
+        return np.packbits(~np.isnan(self.values), axis=1, bitorder="little")
+
+    def is_valid(self, row: int, column: str) -> bool:
+        """Returns True if the value of the given column is present for the product of the given row"""
+        return not np.isnan(self.values[row, self.index(column)])
+
+    def to_float64(self, columns: Iterable[str] = None) -> np.ndarray:
+        """Returns the values of the given columns (all the columns by default) as float64, rounded to the significant
+        digits of the matrix if it is of float32"""
+        values = (
+            self.values
+            if columns is None
+            else self.values[:, [self.index(column) for column in columns]]
+        )
+        if values.dtype == np.float64:
+            return values.copy()
+        return self.__round(values.astype(np.float64))
+
+    @classmethod
+    def to_python(cls, values: np.ndarray) -> list:
+        """Returns the given values (of any shape) as nested lists of Python floats, rounded to the significant digits
+        if they are float32, None for NaN"""
+        rounded = (
+            values
+            if values.dtype == np.float64
+            else cls.__round(values.astype(np.float64))
+        )
+        objects = rounded.astype(object)
+        objects[np.isnan(rounded)] = None
+        return objects.tolist()
+
+    def section_dicts(self, section: str) -> list[dict]:
+        """Returns the dictionary of the model of the given section of each product, as given by model_dump: the values
+        of the columns of the section (None if missing) and the default values of the other fields
+        """
+        defaults = self.sections[section]().model_dump()
+        prefix = f"{section}."
+        columns = [column for column in self.columns if column.startswith(prefix)]
+        names = [column[len(prefix) :] for column in columns]
+        indexes = [self.index(column) for column in columns]
+        return [
+            {**defaults, **dict(zip(names, row))}
+            for row in self.to_python(self.values[:, indexes])
+        ]
+
+    @classmethod
+    def from_products(
+        cls, products: list[Any], dtype: type = np.float32
+    ) -> "NutrientMatrix":
+        """Returns the matrix of the given products, Product objects or their dictionaries (as stored in MongoDB)"""
+        paths = [
+            (
+                section.split("."),
+                [
+                    column[len(section) + 1 :]
+                    for column in cls.columns
+                    if column.startswith(f"{section}.")
+                ],
+            )
+            for section in cls.sections
+        ]
+        rows = []
+        for product in products:
+            row = []
+            for path, names in paths:
+                section = product
+                for key in path:
+                    section = cls.__get(section, key)
+                row.extend(cls.__get(section, name) for name in names)
+            rows.append(row)
+
+        matrix = cls(len(products), dtype)
+        if rows:
+            matrix.values[:] = np.array(rows, dtype=np.float64)
+        return matrix
+
+    @staticmethod
+    def __get(value, key: str):
+        """Returns the given field of a model or a dictionary, None if the model or dictionary is None"""
+        if value is None:
+            return None
+        if isinstance(value, dict):
+            return value.get(key)
+        return getattr(value, key, None)
+
+    @classmethod
+    def __round(cls, values: np.ndarray) -> np.ndarray:
+        """Rounds the given float64 values to the significant digits of the float32 values"""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            magnitudes = np.floor(np.log10(np.abs(values)))
+        decimals = np.where(
+            np.isfinite(magnitudes), cls.significant_digits - 1 - magnitudes, 0
+        )
+        # Multiplying then dividing by an exact power of ten gives the float nearest to the rounded decimal value
+        scales = 10.0 ** np.abs(decimals)
+        return np.where(
+            decimals >= 0,
+            np.round(values * scales) / scales,
+            np.round(values / scales) * scales,
+        )
@@ -0,0 +1,84 @@
+from typing import Iterable
+
+import numpy as np
+
+
+class UnitConverter:
+    """
+    This is a class that converts nutrient amounts to grams with a precomputed table of the number of units per gram,
+    shared by all the mappers. The units are matched case-insensitively, ignoring the surrounding spaces, and the
+    amounts in another unit (kcal, ug...) have no value in grams.
+    The scalar conversion works on one amount, the batch conversion on NumPy arrays of amounts and unit codes.
+
+    Attributes:
+        units_per_gram (dict[str, float]): The number of units in a gram of each convertible unit
+        units (tuple[str, ...]): The convertible units, the code of a unit being its index
+
+    Methods:
+        to_grams(amount, unit): Returns the given amount converted to grams, or None
+        unit_code(unit): Returns the code of the given unit, or -1 if it cannot be converted
+        unit_codes(units): Returns the codes of the given units as a NumPy array
+        to_grams_batch(amounts, unit_codes): Returns the given NumPy amounts converted to grams, NaN if they cannot be
+    """
+
+    units_per_gram = {
+        "g": 1.0,
+        "dg": 10.0,
+        "cg": 100.0,
+        "mg": 1000.0,
+        "mcg": 1000000.0,
+        # 1 IU = 0.3 mcg (vitamin A as retinol)
+        "iu": 10000000.0 / 3,
+    }
+    units = tuple(units_per_gram)
+
+    # The units as written in the sources (lowercase or uppercase) are found without being normalized
+    __lookup = {
+        **units_per_gram,
+        **{unit.upper(): value for unit, value in units_per_gram.items()},
+    }
+    __codes = {
+        **{unit: code for code, unit in enumerate(units)},
+        **{unit.upper(): code for code, unit in enumerate(units)},
+    }
+    # The last divisor (NaN) is the one of the unknown units, whose code is -1
+    __divisors = np.array(list(units_per_gram.values()) + [np.nan])
+
+    @staticmethod
+    def to_grams(amount, unit: str | None) -> float | None:
+        """Returns the given amount (number, Decimal or numeric string) converted to grams, or None if the amount or the
+        unit is missing or if the unit cannot be converted"""
+        if amount is None or unit is None:
+            return None
+        divisor = UnitConverter.__lookup.get(unit)
+        if divisor is None:
+            divisor = UnitConverter.__lookup.get(unit.strip().lower())
+            if divisor is None:
+                return None
+        return float(amount) / divisor
+
+    @staticmethod
+    def unit_code(unit: str | None) -> int:
+        """Returns the code of the given unit (its index in units), or -1 if it is missing or cannot be converted"""
+        if unit is None:
+            return -1
+        code = UnitConverter.__codes.get(unit)
+        if code is None:
+            code = UnitConverter.__codes.get(unit.strip().lower(), -1)
+        return code
+
+    @staticmethod
+    def unit_codes(units: Iterable[str | None]) -> np.ndarray:
+        """Returns the codes of the given units as a NumPy array of int8, -1 for the units which cannot be converted"""
+        return np.fromiter(
+            (UnitConverter.unit_code(unit) for unit in units), dtype=np.int8
+        )
+
+    @staticmethod
+    def to_grams_batch(amounts: np.ndarray, unit_codes: np.ndarray) -> np.ndarray:
+        """Returns the given amounts converted to grams with their unit codes, as a NumPy array of float64. The amounts
+        which are NaN or whose unit cannot be converted give NaN"""
+        return (
+            np.asarray(amounts, dtype=np.float64)
+            / UnitConverter.__divisors[np.asarray(unit_codes, dtype=np.intp)]
+        )
@@ -0,0 +1,134 @@
+import logging
+import os
+
+
+class AdaptiveBatchController:
+    """
+    This is a class that chooses the number of records imported between two loads into MongoDB (the flush size of an
+    import), so that the memory of the process stays below a ceiling and each bulk_write stays close to a target
+    latency. After each load:
+        - the flush size is halved if the resident memory (RSS) of the process is above the ceiling
+        - it is reduced toward the target latency if the slowest bulk_write took longer
+        - it grows if the bulk_writes took less than half the target latency and the memory is well below the ceiling
+    A batch can also be loaded early when the memory goes above the ceiling before the flush size is reached.
+    Without a ceiling nor a target latency, the flush size is fixed.
+
+    Attributes:
+        batch_size (int): The current flush size
+        min_size (int): The smallest flush size
+        max_size (int): The largest flush size
+        max_rss (int | None): The ceiling of the resident memory of the process, in bytes
+        target_latency (float | None): The target latency of a bulk_write, in seconds
+        growth (float): The factor applied to the flush size when it grows
+
+    Methods:
+        fixed(size): Returns a controller keeping the given flush size
+        is_adaptive(): Returns True if the flush size can change
+        memory_exceeded(pending): Returns True if the pending records should be loaded early because of the memory
+        record(loaded, latency): Adjusts the flush size after a load
+        current_rss(): Returns the resident memory of the process in bytes, if it can be read
+    """
+
+    low_memory_share = 0.75
+
+    def __init__(
+        self,
+        batch_size: int,
+        min_size: int = 1000,
+        max_size: int = 200000,
+        max_rss: int = None,
+        target_latency: float = None,
+        growth: float = 1.5,
+    ):
+        if not 0 < min_size <= max_size:
+            raise ValueError(
+                f"Invalid flush size bounds [{min_size}, {max_size}], expected 0 < min_size <= max_size"
+            )
+        self.batch_size = min(max(batch_size, min_size), max_size)
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_rss = max_rss
+        self.target_latency = target_latency
+        self.growth = growth
+
+    def __repr__(self) -> str:
+        return (
+            f"AdaptiveBatchController(batch_size={self.batch_size}, bounds=[{self.min_size}, {self.max_size}], "
+            f"max_rss={self.max_rss}, target_latency={self.target_latency})"
+        )
+
+    @classmethod
+    def fixed(cls, size: int) -> "AdaptiveBatchController":
+        """Returns a controller keeping the given flush size"""
+        return cls(size, min_size=size, max_size=size)
+
+    def is_adaptive(self) -> bool:
+        """Returns True if the flush size can change, i.e. if it has bounds and a memory ceiling or a target latency"""
+        return self.min_size < self.max_size and (
+            self.max_rss is not None or self.target_latency is not None
+        )
+
+    def memory_exceeded(self, pending: int) -> bool:
+        """Returns True if the given number of pending records (at least min_size) should be loaded before the flush
+        size is reached, the resident memory of the process being above the ceiling"""
+        if self.max_rss is None or pending < self.min_size:
+            return False
+        rss = self.current_rss()
+        return rss is not None and rss > self.max_rss
+
+    def record(self, loaded: int, latency: float | None) -> None:
+        """Adjusts the flush size after the load of the given number of records, whose slowest bulk_write took the
+        given latency in seconds (None if nothing was written). Only full batches can make the flush size grow
+        """
+        if not self.is_adaptive():
+            return
+
+        rss = self.current_rss() if self.max_rss is not None else None
+        size = self.batch_size
+        if rss is not None and rss > self.max_rss:
+            size = size // 2
+            reason = f"RSS {rss / 1024 ** 2:.0f} MiB above {self.max_rss / 1024 ** 2:.0f} MiB"
+        elif (
+            self.target_latency is not None
+            and latency is not None
+            and latency > self.target_latency
+        ):
+            size = int(size * max(0.5, self.target_latency / latency))
+            reason = (
+                f"bulk_write latency {latency:.2f}s above {self.target_latency:.2f}s"
+            )
+        elif (
+            loaded >= self.batch_size
+            and (
+                self.target_latency is None
+                or (latency is not None and latency < self.target_latency / 2)
+            )
+            and (rss is None or rss < self.max_rss * self.low_memory_share)
+        ):
+            size = int(size * self.growth)
+            reason = (
+                f"bulk_write latency {latency:.2f}s"
+                if latency is not None
+                else "no bulk_write"
+            ) + (f", RSS {rss / 1024 ** 2:.0f} MiB" if rss is not None else "")
+        else:
+            return
+
+        size = min(max(size, self.min_size), self.max_size)
+        if size != self.batch_size:
+            logging.info(
+                f"Flush size {'reduced' if size < self.batch_size else 'increased'} from {self.batch_size} "
+                f"to {size} ({reason})"
+            )
+            self.batch_size = size
+
+    @staticmethod
+    def current_rss() -> int | None:
+        """Returns the resident memory of the process in bytes, read from /proc/self/statm, or None if it cannot be
+        read (outside Linux)"""
+        try:
+            with open("/proc/self/statm", "rb") as statm:
+                resident_pages = int(statm.read().split()[1])
+        except (OSError, IndexError, ValueError):
+            return None
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
@@ -1,9 +1,9 @@
 import logging
 import csv
-import json
-import ijson
 
+from domain.utils.ijson_backend import IjsonBackend
 from scripts.analysis.fields_types_analyzer import FieldsTypesAnalyzer
+from scripts.json_decoder import JsonDecoder
 
 
 def analyze_off_csv_data(
@@ -92,13 +92,14 @@ def analyze_off_jsonl_data(
         )
 
     n = 0
-    with open(filename, "r", encoding="utf-8") as file:
+    json_decoder = JsonDecoder()
+    with open(filename, "rb") as file:
         fields_types = {}
         fields_can_be_none = set()
 
         for line in file:
             try:
-                obj = json.loads(line.strip())
+                obj = json_decoder.loads(line)
 
                 fields_types, fields_can_be_none = __analyze_obj(
                     obj, fields_types, fields_can_be_none, nonetype_included
@@ -109,7 +110,7 @@ def analyze_off_jsonl_data(
                 if limit is not None and n >= limit:
                     break
 
-            except json.JSONDecodeError as e:
+            except json_decoder.decode_error as e:
                 logging.info(f"Error parsing line: {line}. Error: {e}")
 
     logging.info("OFF data analyzed.")
@@ -141,11 +142,11 @@ def analyze_fdc_data(
 
     n = 0
 
-    with open(filename, "r", encoding="utf-8") as file:
+    with open(filename, "rb") as file:
         fields_types = {}
         fields_can_be_none = set()
 
-        for obj in ijson.items(file, "BrandedFoods.item"):
+        for obj in IjsonBackend.get_backend().items(file, "BrandedFoods.item"):
             fields_types, fields_can_be_none = __analyze_obj(
                 obj, fields_types, fields_can_be_none, nonetype_included
             )
@@ -276,12 +277,13 @@ def __record_values_for_field_off_jsonl(
         )
 
     n = 0
-    with open(filename, "r", encoding="utf-8") as file:
+    json_decoder = JsonDecoder()
+    with open(filename, "rb") as file:
         hashable_values = set()
         non_hashable_values = []
         for line in file:
             try:
-                obj = json.loads(line.strip())
+                obj = json_decoder.loads(line)
                 if field_name in obj.keys():
                     value = obj[field_name]
                     if value != "" and value is not None:
@@ -296,7 +298,7 @@ def __record_values_for_field_off_jsonl(
                     if limit is not None and n > limit:
                         break
 
-            except json.JSONDecodeError as e:
+            except json_decoder.decode_error as e:
                 logging.info(f"Error parsing line: {line}. Error: {e}")
 
     if show_values:
@@ -320,10 +322,10 @@ def __record_values_for_field_fdc(
         )
 
     n = 0
-    with open(filename, "r", encoding="utf-8") as file:
+    with open(filename, "rb") as file:
         hashable_values = set()
         non_hashable_values = []
-        for obj in ijson.items(file, "BrandedFoods.item"):
+        for obj in IjsonBackend.get_backend().items(file, "BrandedFoods.item"):
             if field_name in obj.keys():
                 value = obj[field_name]
                 if value != "" and value is not None:
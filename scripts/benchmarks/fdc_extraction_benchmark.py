@@ -0,0 +1,144 @@
+import io
+import json
+import logging
+import random
+import time
+
+import ijson
+
+from domain.utils.ijson_backend import IjsonBackend
+from scripts.fdc_record_extractor import FdcRecordExtractor
+
+
+def create_synthetic_fdc_file(count: int, seed: int = 0) -> bytes:
+    """Creates a json file shaped like the Food Data Central branded food export (food attributes, update log, food
+    nutrients with their derivation...), with one record out of ten from another market country
+    """
+    generator = random.Random(seed)
+    records = []
+
+    for index in range(count):
+        records.append(
+            {
+                "foodClass": "Branded",
+                "description": f"SYNTHETIC PRODUCT {index}",
+                "foodAttributes": [
+                    {
+                        "id": generator.randrange(10**6),
+                        "name": "Added Package Weight",
+                        "value": "12 oz",
+                        "foodAttributeType": {
+                            "id": 1001,
+                            "name": "Attribute",
+                            "description": "Generic attributes",
+                        },
+                    }
+                ],
+                "modifiedDate": "8/18/2023",
+                "availableDate": "8/18/2023",
+                "marketCountry": "Canada" if index % 10 == 0 else "United States",
+                "brandOwner": "Synthetic Foods Inc.",
+                "gtinUpc": f"{generator.randrange(10**12):012d}",
+                "dataSource": "LI",
+                "ingredients": "WHEAT FLOUR, SUGAR, PALM OIL, COCOA, SALT, SOY LECITHIN",
+                "servingSize": 28.0,
+                "servingSizeUnit": "g",
+                "householdServingFullText": "1 oz",
+                "labelNutrients": {
+                    name: {"value": round(generator.uniform(0, 50), 2)}
+                    for name in ["fat", "saturatedFat", "sodium", "sugars", "protein"]
+                },
+                "brandedFoodCategory": "Cookies & Biscuits",
+                "fdcId": 1000000 + index,
+                "publicationDate": "8/18/2023",
+                "foodUpdateLog": [
+                    {
+                        "fdcId": 900000 + index,
+                        "description": f"SYNTHETIC PRODUCT {index}",
+                        "ingredients": "WHEAT FLOUR, SUGAR",
+                        "foodAttributes": [],
+                        "changes": "",
+                    }
+                ],
+                "foodNutrients": [
+                    {
+                        "type": "FoodNutrient",
+                        "id": generator.randrange(10**8),
+                        "nutrient": {
+                            "id": nutrient_id,
+                            "number": str(nutrient_id - 800),
+                            "name": f"Nutrient {nutrient_id}",
+                            "rank": 600,
+                            "unitName": "g",
+                        },
+                        "foodNutrientDerivation": {
+                            "code": "LCCS",
+                            "description": "Calculated from value per serving size measure",
+                            "foodNutrientSource": {
+                                "id": 9,
+                                "code": "12",
+                                "description": "Manufacturer's analytical; partial documentation",
+                            },
+                        },
+                        "amount": round(generator.uniform(0, 100), 2),
+                    }
+                    for nutrient_id in range(1003, 1018)
+                ],
+            }
+        )
+
+    return json.dumps({"BrandedFoods": records}).encode("utf-8")
+
+
+def benchmark_items(backend, data: bytes, repeat: int) -> float:
+    """Returns the best time (in seconds) taken to build whole records with items() and filter them on marketCountry"""
+    best_time = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for obj in backend.items(io.BytesIO(data), "BrandedFoods.item", use_float=True):
+            obj.get("marketCountry") == "United States"
+        best_time = min(best_time, time.perf_counter() - start)
+    return best_time
+
+
+def benchmark_extractor(backend, data: bytes, repeat: int) -> float:
+    """Returns the best time (in seconds) taken by the FdcRecordExtractor to build the projected records"""
+    best_time = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in FdcRecordExtractor(backend=backend).records(
+            io.BytesIO(data), use_float=True
+        ):
+            pass
+        best_time = min(best_time, time.perf_counter() - start)
+    return best_time
+
+
+def main(count: int = 5000, repeat: int = 3):
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+        handlers=[logging.StreamHandler()],
+    )
+
+    data = create_synthetic_fdc_file(count)
+    size_mib = len(data) / 1024**2
+    logging.info(f"Parsing {count} synthetic FDC records ({size_mib:.1f} MiB)...")
+
+    for name in IjsonBackend.preferred_backends:
+        try:
+            backend = ijson.get_backend(name)
+        except ImportError:
+            logging.info(f"{name}: unavailable")
+            continue
+
+        items_time = benchmark_items(backend, data, repeat)
+        extractor_time = benchmark_extractor(backend, data, repeat)
+        logging.info(
+            f"{name}: items() {count / items_time:,.0f} records/s, "
+            f"extractor {count / extractor_time:,.0f} records/s, x{items_time / extractor_time:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
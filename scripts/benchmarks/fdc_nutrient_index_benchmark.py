@@ -0,0 +1,135 @@
+import logging
+import random
+import time
+
+from domain.mapper.nutriscore_data_mapper import NutriscoreDataMapper
+from domain.mapper.nutrition_facts_mapper import NutritionFactsMapper
+from domain.mapper.number_mapper import NumberMapper
+from domain.utils.fdc_nutrient_index import FdcNutrientIndex
+
+# The nutrient ids looked up by the NutritionFactsMapper and the NutriscoreDataMapper
+NUTRITION_FACTS_IDS = [
+    1004, 1093, 1258, 2000, 1005, 1008, 1104, 1003, 1079, 1292, 1293, 1257, 1253, 1087, 1089, 1092, 1165, 1166, 1175,
+    1186, 1178, 1162, 1167, 1091, 1090, 1095, 1177, 1170, 1082, 1084, 1098, 1101, 1086, 1103, 1185, 1100, 1176, 1057,
+    1102, 1096,
+]  # fmt: skip
+NUTRISCORE_IDS = [1008, 1079, 1003, 1258, 1093, 2000]
+
+
+def create_food_nutrients(count: int, generator: random.Random) -> list[dict]:
+    """Creates a foodNutrients list shaped like the projected records of the Food Data Central export, with the given
+    number of nutrients drawn among the looked up ones and others"""
+    nutrient_ids = generator.sample(
+        NUTRITION_FACTS_IDS + list(range(1200, 1250)), count
+    )
+    return [
+        {
+            "nutrient": {
+                "id": nutrient_id,
+                "unitName": generator.choice(["G", "MG", "UG", "KCAL", "IU"]),
+            },
+            "amount": round(generator.uniform(0, 150), 2),
+        }
+        for nutrient_id in nutrient_ids
+    ]
+
+
+def scan_nutrients(food_nutrients: list[dict]) -> list:
+    """Looks the nutrients up as the mappers did before the index, with two scans of the list per nutrient and per
+    mapper"""
+    values = []
+    for nutrient_id in NUTRITION_FACTS_IDS:
+        values.append(
+            next(
+                (
+                    item["amount"]
+                    for item in food_nutrients
+                    if item["nutrient"]["id"] == nutrient_id and item["amount"] <= 100
+                ),
+                None,
+            )
+        )
+        values.append(
+            next(
+                (
+                    item["nutrient"]["unitName"].lower()
+                    for item in food_nutrients
+                    if item["nutrient"]["id"] == nutrient_id
+                ),
+                None,
+            )
+        )
+    for nutrient_id in NUTRISCORE_IDS:
+        for key in ("amount", "unitName"):
+            values.append(
+                next(
+                    (
+                        item["amount"] if key == "amount" else item["nutrient"][key]
+                        for item in food_nutrients
+                        if item["nutrient"]["id"] == nutrient_id
+                    ),
+                    None,
+                )
+            )
+    return values
+
+
+def index_nutrients(food_nutrients: list[dict]) -> list:
+    """Looks the same nutrients up in an index built once"""
+    index = FdcNutrientIndex(food_nutrients)
+    values = []
+    for nutrient_id in NUTRITION_FACTS_IDS:
+        values.append(index.amount_per_100g(nutrient_id))
+        values.append(index.unit(nutrient_id))
+    for nutrient_id in NUTRISCORE_IDS:
+        values.append(index.amount(nutrient_id))
+        values.append(index.unit(nutrient_id))
+    return values
+
+
+def benchmark(function, records: list, repeat: int) -> float:
+    """Returns the best time (in seconds) taken to apply the function to each record"""
+    best_time = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for record in records:
+            function(record)
+        best_time = min(best_time, time.perf_counter() - start)
+    return best_time
+
+
+def main(count: int = 2000, repeat: int = 5):
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+        handlers=[logging.StreamHandler()],
+    )
+
+    generator = random.Random(0)
+    nutrition_facts_mapper = NutritionFactsMapper()
+    nutriscore_data_mapper = NutriscoreDataMapper(NumberMapper())
+
+    def map_nutrients(food_nutrients) -> None:
+        nutrition_facts_mapper.map_fdc_dict_to_nutrition_facts(food_nutrients, {}, None)
+        nutriscore_data_mapper.map_fdc_dict_to_nutriscore_data(food_nutrients)
+
+    for nutrients in (15, 40, 80):
+        records = [
+            create_food_nutrients(min(nutrients, 90), generator) for _ in range(count)
+        ]
+        scan_time = benchmark(scan_nutrients, records, repeat)
+        index_time = benchmark(index_nutrients, records, repeat)
+        mappers_time = benchmark(
+            lambda food_nutrients: map_nutrients(FdcNutrientIndex(food_nutrients)),
+            records,
+            repeat,
+        )
+        logging.info(
+            f"{nutrients} nutrients per product: lookups {scan_time / count * 1e6:.1f} µs with scans, "
+            f"{index_time / count * 1e6:.1f} µs with the index (x{scan_time / index_time:.1f}), "
+            f"mappers with the shared index {mappers_time / count * 1e6:.1f} µs per product"
+        )
+
+
+if __name__ == "__main__":
+    main()
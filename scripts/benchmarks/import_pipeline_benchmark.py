@@ -0,0 +1,105 @@
+import logging
+import sys
+import time
+
+from scripts.benchmarks.json_decoder_benchmark import create_synthetic_off_lines
+from scripts.import_pipeline import ImportPipeline
+from scripts.json_decoder import JsonDecoder
+from scripts.product_mapper_factory import ProductMapperFactory
+
+
+class SimulatedLoader:
+    """
+    This is a class that stands for the MongoDB loader of an import, waiting for the latency of a bulk write of each
+    batch without holding the GIL, as the driver does while waiting for the server.
+
+    Attributes:
+        write_latency (float): The number of seconds waited for each thousand loaded products
+        loaded (int): The number of loaded products
+
+    Methods:
+        load(products): Waits for the latency of the bulk write of the given products
+    """
+
+    def __init__(self, write_latency: float):
+        self.write_latency = write_latency
+        self.loaded = 0
+
+    def load(self, products: list) -> None:
+        """Waits for the latency of the bulk write of the given products"""
+        time.sleep(self.write_latency * len(products) / 1000)
+        self.loaded += len(products)
+
+
+def run_loop(lines: list[bytes], batch_size: int, write_latency: float) -> float:
+    """Returns the time (in seconds) taken to import the lines with the loop run before the pipeline: each line is
+    decoded and mapped, and each full batch is loaded, one after the other in a single thread
+    """
+    decoder = JsonDecoder()
+    product_mapper = ProductMapperFactory.create_product_mapper()
+    loader = SimulatedLoader(write_latency)
+    products = []
+
+    start = time.perf_counter()
+    for line in lines:
+        products.append(product_mapper.map_off_dict_to_product(decoder.loads(line)))
+        if len(products) >= batch_size:
+            loader.load(products)
+            products = []
+    loader.load(products)
+    return time.perf_counter() - start
+
+
+def run_pipeline(
+    lines: list[bytes], batch_size: int, write_latency: float, mapping_workers: int
+) -> float:
+    """Returns the time (in seconds) taken to import the lines with an ImportPipeline, the lines being read, mapped and
+    loaded by its stages"""
+    decoder = JsonDecoder()
+    product_mapper = ProductMapperFactory.create_product_mapper()
+    loader = SimulatedLoader(write_latency)
+    products = []
+
+    def map_chunk(chunk: list[bytes]) -> list:
+        return [
+            product_mapper.map_off_dict_to_product(decoder.loads(line))
+            for line in chunk
+        ]
+
+    def load_chunk(mapped_chunk: list) -> None:
+        nonlocal products
+        products.extend(mapped_chunk)
+        if len(products) >= batch_size:
+            loader.load(products)
+            products = []
+
+    pipeline = ImportPipeline(map_chunk, load_chunk, mapping_workers=mapping_workers)
+    start = time.perf_counter()
+    pipeline.run(lines)
+    loader.load(products)
+    return time.perf_counter() - start
+
+
+def main(count: int = 20000, batch_size: int = 5000, mapping_workers: int = 2):
+    """Compares the import of synthetic OFF lines by the single threaded loop and by the pipeline, without write
+    latency (the mapping alone, bound to one core by the GIL) and with the latency of MongoDB bulk writes
+    """
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+        handlers=[logging.StreamHandler()],
+    )
+
+    lines = create_synthetic_off_lines(count)
+    for write_latency in (0.0, 0.05, 0.2):
+        loop_time = run_loop(lines, batch_size, write_latency)
+        pipeline_time = run_pipeline(lines, batch_size, write_latency, mapping_workers)
+        logging.info(
+            f"{count} lines, {write_latency * 1000:.0f} ms of write latency per 1000 products: "
+            f"loop {count / loop_time:,.0f} lines/s, pipeline {count / pipeline_time:,.0f} lines/s "
+            f"(x{loop_time / pipeline_time:.2f})"
+        )
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:4]))
@@ -0,0 +1,141 @@
+import logging
+import re
+import sys
+import time
+
+from domain.utils.ingredient_normalizer import IngredientNormalizer
+from scripts.fdc_record_extractor import FdcRecordExtractor
+
+# Ingredients texts as written in the Food Data Central branded food export, used without an export file
+FDC_INGREDIENTS_TEXTS = [
+    "WATER, SUGAR, CORN SYRUP, CONTAINS 2% OR LESS OF: CITRIC ACID, NATURAL FLAVORS, SODIUM CITRATE, RED 40.",
+    "ENRICHED FLOUR (WHEAT FLOUR, NIACIN, REDUCED IRON, THIAMINE MONONITRATE [VITAMIN B1], RIBOFLAVIN [VITAMIN B2], "
+    "FOLIC ACID), SUGAR, PALM OIL, COCOA (PROCESSED WITH ALKALI), HIGH FRUCTOSE CORN SYRUP, LEAVENING (BAKING SODA, "
+    "CALCIUM PHOSPHATE), SALT, SOY LECITHIN, VANILLIN - AN ARTIFICIAL FLAVOR, CHOCOLATE.",
+    "MILK CHOCOLATE (SUGAR, COCOA BUTTER, CHOCOLATE, SKIM MILK, LACTOSE, MILKFAT, SOY LECITHIN, SALT, ARTIFICIAL "
+    "FLAVOR), PEANUTS, CORN SYRUP, SUGAR, PALM OIL, SKIM MILK, LESS THAN 2% - LACTOSE, SALT, EGG WHITES, CHOCOLATE, "
+    "ARTIFICIAL FLAVOR.",
+    "CHICKEN BROTH, CARROTS, POTATOES, CHICKEN MEAT, CELERY, CONTAINS LESS THAN 2% OF: MODIFIED FOOD STARCH, SALT, "
+    "CHICKEN FAT, MONOSODIUM GLUTAMATE, CORN PROTEIN (HYDROLYZED), YEAST EXTRACT, FLAVORING, SOY PROTEIN ISOLATE, "
+    "SODIUM PHOSPHATE, BETA CAROTENE FOR COLOR.",
+    "CHEESE SAUCE (WATER, CHEDDAR CHEESE [PASTEURIZED MILK, CHEESE CULTURE, SALT, ENZYMES, ANNATTO (COLOR)], "
+    "MODIFIED CORN STARCH, BUTTER [CREAM, SALT], SODIUM PHOSPHATE), COOKED ENRICHED MACARONI PRODUCT (WATER, "
+    "ENRICHED MACARONI [SEMOLINA (WHEAT), DURUM FLOUR (WHEAT), NIACIN, IRON, THIAMINE MONONITRATE, RIBOFLAVIN, FOLIC "
+    "ACID]).",
+    "ORGANIC ROLLED OATS, ORGANIC CANE SUGAR, ORGANIC SUNFLOWER OIL, ORGANIC RICE FLOUR, SEA SALT, ORGANIC "
+    "MOLASSES, BAKING SODA, NATURAL FLAVOR, MIXED TOCOPHEROLS (VITAMIN E) TO MAINTAIN FRESHNESS.",
+    "INGREDIENTS: TOMATO PUREE (WATER, TOMATO PASTE), DICED TOMATOES IN TOMATO JUICE, SUGAR, SALT, 1.5% OLIVE OIL, "
+    "ONION POWDER, SPICES, GARLIC POWDER, CITRIC ACID.",
+    "PORK, WATER, SALT, CONTAINS 2% OR LESS OF DEXTROSE, SODIUM LACTATE, SODIUM PHOSPHATE, SODIUM DIACETATE, SODIUM "
+    "ERYTHORBATE, SODIUM NITRITE, FLAVORINGS.",
+    "YOGURT (CULTURED PASTEURIZED GRADE A NONFAT MILK), STRAWBERRY PREPARATION (STRAWBERRIES, SUGAR, WATER, CORN "
+    "STARCH, NATURAL FLAVORS, PECTIN, LEMON JUICE CONCENTRATE, BLACK CARROT JUICE CONCENTRATE (FOR COLOR)), SUGAR.",
+    "SALT.",
+]
+
+
+class RegexIngredientNormalizer:
+    """
+    This is a class that normalizes the ingredients texts as the IngredientNormalizer did before its single pass
+    tokenizer, with four passes of regular expressions and a single level of brackets, to compare them.
+
+    Methods:
+        normalise_ingredients_list(ingredients_text): Converts the given ingredients text to a formatted ingredients list
+    """
+
+    contains_pattern = re.compile(r"contains.*?of", flags=re.IGNORECASE)
+    segment_pattern = re.compile(r"[^,()\[\]]+(?:\([^\(\)]*\))?(?:\[[^\[\]]*\])?")
+    prefix_pattern = re.compile(r".*:(.*)")
+
+    def normalise_ingredients_list(self, ingredients_text: str) -> list[str]:
+        """Creates a normalised ingredients list with the regular expressions of the former normalizer"""
+        if not ingredients_text:
+            return []
+
+        ingredients_text = self.contains_pattern.sub(
+            "contains of", ingredients_text.title()
+        )
+        ingredients_text = ingredients_text.replace(".", ",").strip()
+        if ingredients_text.endswith(","):
+            ingredients_text = ingredients_text[:-1]
+
+        ingredients_list, seen = [], set()
+        for ingredient in self.segment_pattern.findall(ingredients_text):
+            ingredient = self.prefix_pattern.sub(r"\1", ingredient.strip()).strip()
+            if ingredient not in seen:
+                ingredients_list.append(ingredient)
+                seen.add(ingredient)
+        return ingredients_list
+
+
+def read_fdc_ingredients_texts(fdc_json_file: str, count: int) -> list[str]:
+    """Returns the ingredients texts of the first products of the given Food Data Central json export"""
+    extractor = FdcRecordExtractor(fields=frozenset({"ingredients"}))
+    texts = []
+    with open(fdc_json_file, "rb") as file:
+        for _, record in extractor.records(file):
+            if record.get("ingredients"):
+                texts.append(record["ingredients"])
+                if len(texts) == count:
+                    break
+    return texts
+
+
+def benchmark(function, texts: list[str], repeat: int) -> float:
+    """Returns the best time (in seconds) taken to apply the function to each text"""
+    best_time = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            function(text)
+        best_time = min(best_time, time.perf_counter() - start)
+    return best_time
+
+
+def main(fdc_json_file: str | None = None, count: int = 20000, repeat: int = 5):
+    """Compares the normalizers on the ingredients texts of the given decompressed Food Data Central json export, or on
+    the sample texts if there is none"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+        handlers=[logging.StreamHandler()],
+    )
+
+    if fdc_json_file:
+        texts = read_fdc_ingredients_texts(fdc_json_file, count)
+        logging.info(f"Normalizing {len(texts)} ingredients texts of {fdc_json_file}")
+    else:
+        # Distinct texts, so that the uncached normalizations are measured
+        texts = [
+            f"{FDC_INGREDIENTS_TEXTS[index % len(FDC_INGREDIENTS_TEXTS)]} BATCH {index}"
+            for index in range(count)
+        ]
+        logging.info(f"Normalizing {len(texts)} sample FDC ingredients texts")
+
+    regex_normalizer = RegexIngredientNormalizer()
+    uncached_normalizer = IngredientNormalizer(cache_size=0)
+    regex_time = benchmark(regex_normalizer.normalise_ingredients_list, texts, repeat)
+    tokenizer_time = benchmark(
+        uncached_normalizer.normalise_ingredients_list, texts, repeat
+    )
+    cached_normalizer = IngredientNormalizer(cache_size=len(set(texts)))
+    cached_time = benchmark(cached_normalizer.normalise_ingredients_list, texts, repeat)
+
+    same_lists = sum(
+        regex_normalizer.normalise_ingredients_list(text)
+        == uncached_normalizer.normalise_ingredients_list(text)
+        for text in texts
+    )
+    logging.info(
+        f"Regular expressions {regex_time / len(texts) * 1e6:.1f} µs per text, "
+        f"single pass tokenizer {tokenizer_time / len(texts) * 1e6:.1f} µs (x{regex_time / tokenizer_time:.2f}), "
+        f"with the cache {cached_time / len(texts) * 1e6:.1f} µs once filled"
+    )
+    logging.info(
+        f"Same ingredients lists for {same_lists / len(texts):.1%} of the texts "
+        f"(the others have nested brackets, colons between brackets or decimal numbers)"
+    )
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2])
@@ -0,0 +1,117 @@
+import json
+import logging
+import random
+import time
+
+from scripts.json_decoder import JsonDecoder
+
+
+def create_synthetic_off_lines(count: int, seed: int = 0) -> list[bytes]:
+    """Creates jsonl lines shaped like Open Food Facts products (nutriments, tags, ingredients, images...)"""
+    generator = random.Random(seed)
+    nutrient_names = [
+        "energy-kcal",
+        "fat",
+        "saturated-fat",
+        "carbohydrates",
+        "sugars",
+        "fiber",
+        "proteins",
+        "salt",
+        "sodium",
+        "calcium",
+        "iron",
+        "potassium",
+        "vitamin-a",
+        "vitamin-c",
+        "cholesterol",
+        "trans-fat",
+    ]
+    lines = []
+
+    for index in range(count):
+        nutriments = {}
+        for name in nutrient_names:
+            value = round(generator.uniform(0, 100), 2)
+            nutriments[f"{name}_100g"] = value
+            nutriments[f"{name}_serving"] = round(value / 3, 2)
+            nutriments[f"{name}_unit"] = "g"
+            nutriments[f"{name}_value"] = value
+
+        product = {
+            "code": f"{generator.randrange(10 ** 12):013d}",
+            "product_name": f"Synthetic product {index}",
+            "brands": "Brand A, Brand B",
+            "categories": "Snacks, Sweet snacks, Biscuits and cakes, Biscuits",
+            "categories_tags": ["en:snacks", "en:sweet-snacks", "en:biscuits"],
+            "countries_tags": generator.choice(
+                [["en:canada"], ["en:france"], ["en:united-states", "en:canada"]]
+            ),
+            "ingredients_text": "Wheat flour, sugar, palm oil, cocoa (4.5%), salt, "
+            "emulsifier (soy lecithin), raising agents (ammonium carbonates)",
+            "labels_tags": ["en:no-preservatives", "en:vegetarian"],
+            "packaging_tags": ["en:plastic", "en:bag"],
+            "nova_group": generator.randint(1, 4),
+            "nutriscore_grade": generator.choice("abcde"),
+            "last_modified_t": 1600000000 + generator.randrange(10**8),
+            "nutriments": nutriments,
+            "images": {
+                str(i): {"uploaded_t": 1600000000 + i, "sizes": {"100": {"h": 100}}}
+                for i in range(5)
+            },
+        }
+        lines.append(json.dumps(product).encode("utf-8") + b"\n")
+
+    return lines
+
+
+def benchmark_decoder(decoder: JsonDecoder, lines: list[bytes], repeat: int) -> float:
+    """Returns the best time (in seconds) taken by the decoder to decode all the given lines"""
+    best_time = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for line in lines:
+            decoder.loads(line)
+        best_time = min(best_time, time.perf_counter() - start)
+    return best_time
+
+
+def benchmark_text_lines(lines: list[bytes], repeat: int) -> float:
+    """Returns the best time (in seconds) taken by the former path: utf-8 decoding, strip and json.loads of each line"""
+    text_lines = [line.decode("utf-8") for line in lines]
+    best_time = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for line in text_lines:
+            json.loads(line.strip())
+        best_time = min(best_time, time.perf_counter() - start)
+    return best_time
+
+
+def main(count: int = 20000, repeat: int = 3):
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+        handlers=[logging.StreamHandler()],
+    )
+
+    lines = create_synthetic_off_lines(count)
+    size_mib = sum(len(line) for line in lines) / 1024**2
+    logging.info(f"Decoding {count} synthetic OFF lines ({size_mib:.1f} MiB)...")
+
+    results = {"json (str + strip)": benchmark_text_lines(lines, repeat)}
+    for backend in JsonDecoder.available_backends():
+        results[f"{backend} (bytes)"] = benchmark_decoder(
+            JsonDecoder(backend), lines, repeat
+        )
+
+    reference_time = results["json (str + strip)"]
+    for name, elapsed in results.items():
+        logging.info(
+            f"{name}: {count / elapsed:,.0f} lines/s, {size_mib / elapsed:.1f} MiB/s, "
+            f"x{reference_time / elapsed:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
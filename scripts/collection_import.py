@@ -1,28 +1,40 @@
+import argparse
+import concurrent.futures
 import os
 import logging
 from datetime import datetime
+from typing import Any, Callable, Iterator
 
-from domain.mapper.ingredients_mapper import IngredientsMapper
-from domain.mapper.number_mapper import NumberMapper
-from domain.mapper.nutriscore_data_mapper import NutriscoreDataMapper
-from domain.mapper.nutrition_facts_mapper import NutritionFactsMapper
-from domain.mapper.product_mapper import ProductMapper
-from domain.mapper.category_mapper import CategoryMapper
-from domain.utils.category_creator import CategoryCreator
-from domain.utils.ingredient_normalizer import IngredientNormalizer
+from scripts.adaptive_batch_controller import AdaptiveBatchController
 from scripts.config import Config
 from scripts.csv_creator import CsvCreator
 from scripts.data_downloader import DataDownloader
+from scripts.download_manifest import DownloadManifest
 from scripts.data_importer import DataImporter
+from scripts.import_checkpoint import ImportCheckpoint
+from scripts.import_sampler import ImportSampler
+from scripts.import_watermark import ImportWatermark
+from scripts.mapped_product_cache import MappedProductCache
+from scripts.off_line_filter import OffLineFilter
+from scripts.off_watermark_filter import OffWatermarkFilter
 from scripts.product_completer import ProductCompleter
+from scripts.product_mapper_factory import ProductMapperFactory
 from scripts.product_matcher import ProductMatcher
+from scripts.quarantine_writer import QuarantineWriter
 
 off_jsonl_url = "https://static.openfoodfacts.org/data/openfoodfacts-products.jsonl.gz"
 
 fdc_json_url = "https://fdc.nal.usda.gov/fdc-datasets/FoodData_Central_branded_food_json_2025-04-24.zip"
 
 
-def main():
+def main(resume: bool = False, full_import: bool = False, sample: str = None):
+    """Downloads and imports the Open Food Facts and Food Data Central products, matches them and creates the csv files.
+    If resume is True, the interrupted imports continue from their last checkpoint instead of restarting.
+    If full_import is True, all the Open Food Facts products are imported, even those unchanged since the last import.
+    If a sample ("mode:value", see ImportSampler) is given, or set in the config, only a sample of the products of both
+    sources is imported, whether they have changed or not. A sampled import is neither checkpointed nor recorded.
+    The two sources are downloaded and imported concurrently if the config says so, and matched once both are imported
+    """
     logging.basicConfig(
         level=logging.INFO,
         format="%(asctime)s - %(levelname)s - %(message)s",
@@ -34,45 +46,184 @@ def main():
     data_dir = "../data"
     os.makedirs(data_dir, exist_ok=True)
 
-    data_downloader = DataDownloader()
-
     script_dir = os.path.dirname(os.path.abspath(__file__))
     parent_dir = os.path.dirname(script_dir)
 
-    off_jsonl_gz_file = os.path.join(
-        parent_dir, "data", config.off_compressed_jsonl_file_name
+    manifest = DownloadManifest(
+        os.path.join(parent_dir, "data", config.download_manifest_file_name)
     )
-    off_jsonl_file = os.path.join(parent_dir, "data", config.off_jsonl_file_name)
 
-    data_downloader.download_and_decompress_data(
-        off_jsonl_url, off_jsonl_gz_file, ".gz", off_jsonl_file
+    data_downloader = DataDownloader(
+        segments=config.download_segments,
+        segment_retries=config.download_segment_retries,
+        manifest=manifest,
     )
 
-    fdc_zip_file = os.path.join(
-        parent_dir, "data", config.fdc_compressed_json_file_name
+    downloads = dict(
+        run_source_tasks(
+            {
+                "off": (download_off_data, (config, data_downloader, parent_dir)),
+                "fdc": (download_fdc_data, (config, data_downloader, parent_dir)),
+            },
+            concurrent.futures.ThreadPoolExecutor,
+            config.process_sources_concurrently,
+        )
     )
-    fdc_file = os.path.join(parent_dir, "data", config.fdc_json_file_name)
+    off_changed, off_import_file, off_decompressed_copy_file = downloads["off"]
+    fdc_changed, fdc_import_file = downloads["fdc"]
 
-    data_downloader.download_and_decompress_data(
-        config.fdc_json_url, fdc_zip_file, ".zip", fdc_file
+    off_product_cache, fdc_product_cache = (
+        create_product_caches(config, parent_dir)
+        if config.use_mapped_product_cache
+        else (None, None)
     )
 
-    categories_taxonomy_file = os.path.join(parent_dir, config.categories_taxonomy_file)
-    category_mapping_file = os.path.join(parent_dir, config.category_mapping_file)
+    off_checkpoint = ImportCheckpoint(
+        os.path.join(parent_dir, "data", config.off_import_checkpoint_file_name),
+        (manifest.get_entry(config.off_compressed_jsonl_file_name) or {}).get("sha256"),
+    )
+    fdc_checkpoint = ImportCheckpoint(
+        os.path.join(parent_dir, "data", config.fdc_import_checkpoint_file_name),
+        (manifest.get_entry(config.fdc_compressed_json_file_name) or {}).get("sha256"),
+    )
+
+    watermarks = ImportWatermark(
+        os.path.join(parent_dir, "data", config.import_watermark_file_name)
+    )
+    # The watermark only covers the products kept by the country filter of the import
+    off_watermark_source = config.off_compressed_jsonl_file_name + (
+        f":{config.off_import_country_tag}"
+        if config.off_import_country_tag is not None
+        else ""
+    )
+    off_watermark = None
 
-    data_importer = DataImporter(
-        ProductMapper(
-            IngredientsMapper(IngredientNormalizer()),
-            NutriscoreDataMapper(NumberMapper()),
-            NutritionFactsMapper(),
-            CategoryMapper(
-                CategoryCreator(), categories_taxonomy_file, category_mapping_file
+    off_quarantine, fdc_quarantine = (
+        (
+            QuarantineWriter(
+                os.path.join(parent_dir, "data", config.off_quarantine_file_name)
+            ),
+            QuarantineWriter(
+                os.path.join(parent_dir, "data", config.fdc_quarantine_file_name)
             ),
         )
+        if config.quarantine_bad_records
+        else (None, None)
+    )
+
+    sample = sample if sample is not None else config.import_sample
+    sampler = (
+        ImportSampler.parse(sample, config.import_sample_seed)
+        if sample is not None
+        else None
     )
+    if sampler is not None:
+        logging.info(f"Importing a sample of the products with {sampler}")
+
+    import_tasks = {}
+    if (
+        sampler is not None
+        or off_changed
+        or not manifest.is_imported(config.off_compressed_jsonl_file_name)
+    ):
+        if sampler is None and (off_changed or not resume):
+            off_checkpoint.clear()
+        # A resumed import appends to the quarantine of its interrupted run
+        if off_quarantine is not None and (
+            sampler is not None or off_changed or not resume
+        ):
+            off_quarantine.clear()
+        off_line_filter = (
+            OffLineFilter(config.off_import_country_tag)
+            if config.off_import_country_tag is not None
+            else None
+        )
+        off_watermark = (
+            watermarks.get(off_watermark_source)
+            if config.incremental_off_import and not full_import and sampler is None
+            else None
+        )
+        off_watermark_filter = (
+            OffWatermarkFilter(off_watermark, config.off_watermark_byte_scan)
+            if off_watermark is not None
+            else None
+        )
+        import_tasks["off"] = (
+            import_off_data,
+            (
+                config,
+                off_product_cache,
+                off_import_file,
+                off_decompressed_copy_file,
+                off_line_filter,
+                off_checkpoint if sampler is None else None,
+                off_watermark_filter,
+                sampler,
+                off_quarantine,
+            ),
+        )
+    else:
+        logging.info(
+            "Open Food Facts data unchanged since its import. Skipping import."
+        )
+
+    if (
+        sampler is not None
+        or fdc_changed
+        or not manifest.is_imported(config.fdc_compressed_json_file_name)
+    ):
+        if sampler is None and (fdc_changed or not resume):
+            fdc_checkpoint.clear()
+        if fdc_quarantine is not None and (
+            sampler is not None or fdc_changed or not resume
+        ):
+            fdc_quarantine.clear()
+        import_tasks["fdc"] = (
+            import_fdc_data,
+            (
+                config,
+                fdc_product_cache,
+                fdc_import_file,
+                fdc_checkpoint if sampler is None else None,
+                sampler,
+                fdc_quarantine,
+            ),
+        )
+    else:
+        logging.info(
+            "Food Data Central data unchanged since its import. Skipping import."
+        )
+
+    # The imports write to different collections, the products are only matched once both are done
+    for source, counts in run_source_tasks(
+        import_tasks,
+        concurrent.futures.ProcessPoolExecutor,
+        config.process_sources_concurrently,
+    ):
+        if sampler is not None:
+            # A sampled import must not prevent the next complete import of the source
+            continue
+        if source == "off":
+            manifest.mark_imported(config.off_compressed_jsonl_file_name)
+            off_checkpoint.clear()
 
-    data_importer.import_jsonl_off_data(off_jsonl_file, 50000)
-    data_importer.import_json_fdc_data(fdc_file, 50000)
+            new_off_watermark = max(
+                (
+                    watermark
+                    for watermark in (off_watermark, counts["max_last_modified_t"])
+                    if watermark is not None
+                ),
+                default=None,
+            )
+            if new_off_watermark is not None:
+                watermarks.save(off_watermark_source, new_off_watermark)
+        else:
+            manifest.mark_imported(config.fdc_compressed_json_file_name)
+            fdc_checkpoint.clear()
+
+    for product_cache in (off_product_cache, fdc_product_cache):
+        if product_cache is not None:
+            product_cache.close()
 
     product_matcher = ProductMatcher()
 
@@ -99,5 +250,212 @@ def main():
     )
 
 
+def download_off_data(
+    config: Config, data_downloader: DataDownloader, parent_dir: str
+) -> tuple[bool, str, str | None]:
+    """Downloads the Open Food Facts jsonl file, decompressing it unless it is imported as a stream.
+    Returns whether the file has changed, the file to import and the file where the streamed lines are also written
+    """
+    off_jsonl_gz_file = os.path.join(
+        parent_dir, "data", config.off_compressed_jsonl_file_name
+    )
+    off_jsonl_file = os.path.join(parent_dir, "data", config.off_jsonl_file_name)
+
+    if config.stream_off_import and config.off_import_workers <= 1:
+        off_changed = data_downloader.download_data(off_jsonl_url, off_jsonl_gz_file)
+        return (
+            off_changed,
+            off_jsonl_gz_file,
+            off_jsonl_file if config.keep_decompressed_off_file else None,
+        )
+
+    off_changed = data_downloader.download_and_decompress_data(
+        off_jsonl_url, off_jsonl_gz_file, ".gz", off_jsonl_file
+    )
+    return off_changed, off_jsonl_file, None
+
+
+def download_fdc_data(
+    config: Config, data_downloader: DataDownloader, parent_dir: str
+) -> tuple[bool, str]:
+    """Downloads the Food Data Central zip file, extracting it unless it is imported as a stream.
+    Returns whether the file has changed and the file to import"""
+    fdc_zip_file = os.path.join(
+        parent_dir, "data", config.fdc_compressed_json_file_name
+    )
+    fdc_file = os.path.join(parent_dir, "data", config.fdc_json_file_name)
+
+    if config.stream_fdc_import:
+        fdc_changed = data_downloader.download_data(config.fdc_json_url, fdc_zip_file)
+        return fdc_changed, fdc_zip_file
+
+    fdc_changed = data_downloader.download_and_decompress_data(
+        config.fdc_json_url, fdc_zip_file, ".zip", fdc_file
+    )
+    return fdc_changed, fdc_file
+
+
+def create_product_caches(
+    config: Config, parent_dir: str
+) -> tuple[MappedProductCache, MappedProductCache]:
+    """Creates the mapped product caches of the Open Food Facts and Food Data Central imports, stored with the downloaded
+    files. Each source has its own cache, so that the eviction of the products of a source never evicts the products of
+    the other one"""
+    # The categories of the products also depend on the category files
+    version = MappedProductCache.source_version(
+        [os.path.join(parent_dir, "domain")],
+        [
+            os.path.join(parent_dir, config.categories_taxonomy_file),
+            os.path.join(parent_dir, config.category_mapping_file),
+        ],
+    )
+    return tuple(
+        MappedProductCache(
+            os.path.join(parent_dir, "data", cache_file_name),
+            config.mapped_product_cache_max_entries,
+            version,
+        )
+        for cache_file_name in (
+            config.off_mapped_product_cache_file_name,
+            config.fdc_mapped_product_cache_file_name,
+        )
+    )
+
+
+def create_data_importer(
+    config: Config, product_cache: MappedProductCache = None
+) -> DataImporter:
+    """Creates a DataImporter with its own ProductMapper and the import settings of the config"""
+    return DataImporter(
+        ProductMapperFactory.create_product_mapper(),
+        mapping_workers=config.import_mapping_workers,
+        queue_size=config.import_queue_size,
+        chunk_size=config.import_chunk_size,
+        product_cache=product_cache,
+        skip_cached_upserts=config.skip_cached_product_upserts,
+    )
+
+
+def create_batch_size(config: Config) -> int | AdaptiveBatchController:
+    """Returns the fixed flush size of the imports, or the controller adjusting it if the config says so"""
+    if not config.adaptive_import_batch_size:
+        return config.import_batch_size
+    return AdaptiveBatchController(
+        config.import_batch_size,
+        min_size=config.import_batch_min_size,
+        max_size=config.import_batch_max_size,
+        max_rss=(
+            config.import_max_rss_mb * 1024**2
+            if config.import_max_rss_mb is not None
+            else None
+        ),
+        target_latency=config.import_target_write_latency,
+    )
+
+
+def import_off_data(
+    config: Config,
+    product_cache: MappedProductCache,
+    off_import_file: str,
+    off_decompressed_copy_file: str | None,
+    line_filter: OffLineFilter | None,
+    checkpoint: ImportCheckpoint | None,
+    watermark_filter: OffWatermarkFilter | None,
+    sampler: ImportSampler | None = None,
+    quarantine: QuarantineWriter | None = None,
+) -> dict:
+    """Imports the Open Food Facts products (or a sample of them), with several worker processes if the config says so.
+    The lines which cannot be decoded or mapped are written to the quarantine, if any. Returns the counts of the import
+    """
+    data_importer = create_data_importer(config, product_cache)
+    if config.off_import_workers > 1:
+        return data_importer.import_jsonl_off_data_in_parallel(
+            off_import_file,
+            create_batch_size(config),
+            config.off_import_workers,
+            line_filter=line_filter,
+            checkpoint=checkpoint,
+            watermark_filter=watermark_filter,
+            sampler=sampler,
+            quarantine=quarantine,
+        )
+    return data_importer.import_jsonl_off_data(
+        off_import_file,
+        create_batch_size(config),
+        decompressed_copy_file=off_decompressed_copy_file,
+        line_filter=line_filter,
+        checkpoint=checkpoint,
+        watermark_filter=watermark_filter,
+        sampler=sampler,
+        quarantine=quarantine,
+    )
+
+
+def import_fdc_data(
+    config: Config,
+    product_cache: MappedProductCache,
+    fdc_import_file: str,
+    checkpoint: ImportCheckpoint | None,
+    sampler: ImportSampler | None = None,
+    quarantine: QuarantineWriter | None = None,
+) -> None:
+    """Imports the Food Data Central products (or a sample of them). The records which cannot be mapped are written to
+    the quarantine, if any"""
+    create_data_importer(config, product_cache).import_json_fdc_data(
+        fdc_import_file,
+        create_batch_size(config),
+        checkpoint=checkpoint,
+        sampler=sampler,
+        quarantine=quarantine,
+    )
+
+
+def run_source_tasks(
+    tasks: dict[str, tuple[Callable, tuple]],
+    executor_class: type[concurrent.futures.Executor],
+    concurrently: bool,
+) -> Iterator[tuple[str, Any]]:
+    """Runs the function of each source with its arguments, one after the other or concurrently in the threads or
+    processes of the given executor class. Yields the name of each source and the result of its function once done
+    """
+    if not concurrently or len(tasks) <= 1:
+        for source, (function, args) in tasks.items():
+            yield source, function(*args)
+        return
+
+    with executor_class(max_workers=len(tasks)) as executor:
+        futures = {
+            executor.submit(function, *args): source
+            for source, (function, args) in tasks.items()
+        }
+        for future in concurrent.futures.as_completed(futures):
+            yield futures[future], future.result()
+
+
+def parse_arguments() -> argparse.Namespace:
+    """Returns the command line arguments of the script"""
+    parser = argparse.ArgumentParser(
+        description="Imports the Open Food Facts and Food Data Central products, matches them and creates the csv files"
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="resume the interrupted imports from their last checkpoint instead of restarting them",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="import all the Open Food Facts products, even those unchanged since the last import",
+    )
+    parser.add_argument(
+        "--sample",
+        metavar="MODE:VALUE",
+        help="only import a sample of the products: head:N (first N products), every:K (one record out of K) "
+        "or hash:FRACTION (the same share of the barcodes in both sources, e.g. hash:0.01)",
+    )
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    main()
+    arguments = parse_arguments()
+    main(arguments.resume, arguments.full, arguments.sample)
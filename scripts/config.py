@@ -12,6 +12,59 @@ class Config:
         fdc_json_file_name(str): The name of the decompressed Food Data Central json file
         categories_taxonomy_file(str): The path from the root of the project to the Open Food Facts categories taxonomy file
         category_mapping_file(str): The path from the root of the project to the mapping of Food Data Central categories to Open Food Facts categories
+        stream_off_import(bool): A boolean indicating if the Open Food Facts jsonl file is imported directly from the compressed file
+        keep_decompressed_off_file(bool): A boolean indicating if the decompressed Open Food Facts jsonl file is also written when streaming the import
+        off_import_workers(int): The number of worker processes importing shards of the decompressed Open Food Facts jsonl file
+        (1 for a sequential import, which can read the compressed file)
+        off_import_country_tag(str | None): The country tag (e.g. "en:canada") of the only Open Food Facts products to import,
+        checked on the raw lines before decoding them (None to import the products of all countries)
+        import_mapping_workers(int): The number of threads mapping the products of an import, between the reader thread and the loading
+        stage. The threads share a single core (GIL), overlapping the mapping with the reading and the writes: off_import_workers maps the
+        Open Food Facts products on several cores
+        import_queue_size(int): The maximum number of chunks of products waiting between two stages of an import
+        import_chunk_size(int): The number of products passed at once from a stage of an import to the next one
+        import_batch_size(int): The number of products of an import loaded at once into MongoDB, i.e. the initial flush size when it is adaptive
+        adaptive_import_batch_size(bool): A boolean indicating if the flush size of the imports is adjusted to the memory of the process and
+        the latency of the bulk writes (False to keep import_batch_size)
+        import_batch_min_size(int): The smallest adaptive flush size
+        import_batch_max_size(int): The largest adaptive flush size
+        import_max_rss_mb(int | None): The ceiling of the resident memory of each import process in MiB, above which the flush size is
+        reduced and the pending products are loaded early (None for no ceiling)
+        import_target_write_latency(float | None): The target latency of a MongoDB bulk write in seconds (None for no target)
+        stream_fdc_import(bool): A boolean indicating if the Food Data Central json file is imported directly from the zip archive
+        download_segments(int): The number of byte ranges of a file downloaded concurrently (1 for a single stream)
+        download_segment_retries(int): The number of attempts made to download each byte range of a file
+        download_manifest_file_name(str): The name of the manifest of the downloaded files, stored with them
+        off_import_checkpoint_file_name(str): The name of the checkpoint of the Open Food Facts import, stored with the downloaded files
+        fdc_import_checkpoint_file_name(str): The name of the checkpoint of the Food Data Central import, stored with the downloaded files
+        incremental_off_import(bool): A boolean indicating if the Open Food Facts products not modified since the last import (according to the
+        last_modified_t watermark of that import) are skipped
+        off_watermark_byte_scan(bool): A boolean indicating if the last_modified_t of the Open Food Facts lines is checked before decoding them
+        import_watermark_file_name(str): The name of the file of the import watermarks, stored with the downloaded files
+        use_mapped_product_cache(bool): A boolean indicating if the products mapped from raw records unchanged since a previous import are
+        taken from a cache instead of being mapped again
+        off_mapped_product_cache_file_name(str): The name of the SQLite file of the mapped product cache of the Open Food Facts import,
+        stored with the downloaded files
+        fdc_mapped_product_cache_file_name(str): The name of the SQLite file of the mapped product cache of the Food Data Central import,
+        stored with the downloaded files
+        mapped_product_cache_max_entries(int): The maximum number of products kept in the mapped product cache of each source after each
+        import
+        skip_cached_product_upserts(bool): A boolean indicating if the products found in the cache are not loaded again into MongoDB. Only
+        safe if the MongoDB collections still contain the products of the previous imports
+        process_sources_concurrently(bool): A boolean indicating if the Open Food Facts and Food Data Central files are downloaded in
+        parallel threads and imported in parallel processes
+        import_sample(str): The sample of the products to import ("head:N", "every:K" or "hash:FRACTION"), None to import them all
+        import_sample_seed(int): The seed of the barcode hash of the hash samples
+        trusted_product_construction(bool): A boolean indicating if the products built by the mappers skip the validation of their fields,
+        the mappers giving values of the right types
+        trusted_product_validation_sample(int): The number of products mapped for each one fully validated in trusted construction mode
+        (0 for none)
+        ingredient_cache_size(int): The maximum number of ingredients texts whose normalization is kept in memory by each mapper, many
+        products sharing the same ingredients text (0 to disable the cache)
+        quarantine_bad_records(bool): A boolean indicating if the records which cannot be decoded or mapped are written to a quarantine
+        file, the import continuing without them, instead of stopping the import
+        off_quarantine_file_name(str): The name of the gzip compressed jsonl file of the bad Open Food Facts lines, stored with the downloaded files
+        fdc_quarantine_file_name(str): The name of the gzip compressed jsonl file of the bad Food Data Central records, stored with the downloaded files
     """
 
     def __init__(self):
@@ -33,3 +86,41 @@ class Config:
 
         self.categories_taxonomy_file: str = "source_files/categories_taxonomy.txt"
         self.category_mapping_file: str = "source_files/categories_mapping_fdc_off.json"
+
+        self.stream_off_import: bool = True
+        self.keep_decompressed_off_file: bool = False
+        self.stream_fdc_import: bool = True
+        self.off_import_workers: int = 1
+        self.off_import_country_tag: str | None = None
+        self.import_mapping_workers: int = 2
+        self.import_queue_size: int = 8
+        self.import_chunk_size: int = 1000
+        self.import_batch_size: int = 50000
+        self.adaptive_import_batch_size: bool = True
+        self.import_batch_min_size: int = 5000
+        self.import_batch_max_size: int = 200000
+        self.import_max_rss_mb: int | None = 2048
+        self.import_target_write_latency: float | None = 2.0
+
+        self.download_segments: int = 8
+        self.download_segment_retries: int = 5
+        self.download_manifest_file_name: str = "download_manifest.json"
+        self.off_import_checkpoint_file_name: str = "off_import_checkpoint.json"
+        self.fdc_import_checkpoint_file_name: str = "fdc_import_checkpoint.json"
+        self.incremental_off_import: bool = False
+        self.off_watermark_byte_scan: bool = True
+        self.import_watermark_file_name: str = "import_watermarks.json"
+        self.use_mapped_product_cache: bool = False
+        self.off_mapped_product_cache_file_name: str = "off_mapped_product_cache.sqlite"
+        self.fdc_mapped_product_cache_file_name: str = "fdc_mapped_product_cache.sqlite"
+        self.mapped_product_cache_max_entries: int = 1000000
+        self.skip_cached_product_upserts: bool = False
+        self.process_sources_concurrently: bool = True
+        self.import_sample: str = None
+        self.import_sample_seed: int = 0
+        self.trusted_product_construction: bool = False
+        self.trusted_product_validation_sample: int = 1000
+        self.ingredient_cache_size: int = 8192
+        self.quarantine_bad_records: bool = True
+        self.off_quarantine_file_name: str = "off_quarantine.jsonl.gz"
+        self.fdc_quarantine_file_name: str = "fdc_quarantine.jsonl.gz"
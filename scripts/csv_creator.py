@@ -6,11 +6,17 @@ from decimal import Decimal
 from pymongo import MongoClient
 
 from domain.product.product import Product
+from domain.utils.nutrient_matrix import NutrientMatrix
+
+HUNDRED_GRAMS_SECTION = "nutrition_facts.nutrition_facts_per_hundred_grams"
+SERVING_SECTION = "nutrition_facts.nutrition_facts_per_serving"
 
 
 class CsvCreator:
     def __init__(self, csv_files_base_names):
         self.csv_files_base_names = csv_files_base_names
+        self.sodium_to_salt = 2.5
+        self.energy_kcal_to_kj = 4.1868
         self.mandatory_columns = [
             "Barcode",
             "Main language",
@@ -310,8 +316,19 @@ class CsvCreator:
 
             filewriter.writerow(columns)
 
-            for product in products:
+            derived_values = self.__derive_nutrient_values(
+                NutrientMatrix.from_products(products)
+            )
+
+            for row, product in enumerate(products):
                 list_to_write = self.__create_csv_line_for_product(product, columns)
+                self.__add_derived_nutrient_values(
+                    columns,
+                    list_to_write,
+                    derived_values,
+                    row,
+                    getattr(product, "nutrition_data_per", None),
+                )
                 filewriter.writerow(list_to_write)
 
                 empty_mandatory_columns = self.__check_fields_not_empty(
@@ -362,14 +379,77 @@ class CsvCreator:
 
         return line
 
+    def __derive_nutrient_values(
+        self, nutriments: NutrientMatrix
+    ) -> dict[str, tuple[str, list]]:
+        """Returns the nutrient values derived from others for the products of the given NutrientMatrix, computed
+        column by column: the salt from the sodium when it is missing, and the energy in kJ from the energy in kcal.
+        Each csv column is given with the nutrient key deciding if it is written and with the value of each product
+        """
+        nutriments.derive(
+            f"{HUNDRED_GRAMS_SECTION}.salt_100g",
+            f"{HUNDRED_GRAMS_SECTION}.sodium_100g",
+            self.sodium_to_salt,
+        )
+        nutriments.derive(
+            f"{SERVING_SECTION}.salt_serving",
+            f"{SERVING_SECTION}.sodium_serving",
+            self.sodium_to_salt,
+        )
+        return {
+            "Salt for 100 g / 100 ml": (
+                "salt_100g",
+                NutrientMatrix.to_python(
+                    nutriments.column(f"{HUNDRED_GRAMS_SECTION}.salt_100g")
+                ),
+            ),
+            "Salt per serving": (
+                "salt_serving",
+                NutrientMatrix.to_python(
+                    nutriments.column(f"{SERVING_SECTION}.salt_serving")
+                ),
+            ),
+            "Energy (kJ) for 100 g / 100 ml": (
+                "energy_kj_100g",
+                NutrientMatrix.to_python(
+                    nutriments.column(f"{HUNDRED_GRAMS_SECTION}.energy_kcal_100g")
+                    * self.energy_kcal_to_kj
+                ),
+            ),
+            "Energy (kJ) per serving": (
+                "energy_kj_serving",
+                NutrientMatrix.to_python(
+                    nutriments.column(f"{SERVING_SECTION}.energy_kcal_serving")
+                    * self.energy_kcal_to_kj
+                ),
+            ),
+        }
+
+    def __add_derived_nutrient_values(
+        self, columns, line, derived_values, row, nutrition_data_per
+    ):
+        """Writes the derived nutrient values of the product of the given row in the csv columns left empty"""
+        for column, (key, values) in derived_values.items():
+            column_id = columns.index(column)
+            if (
+                values[row] is not None
+                and line[column_id] == ""
+                and not self.__is_skipped_nutrient(key, nutrition_data_per)
+            ):
+                line[column_id] = self.__format_value(values[row])
+
+    @staticmethod
+    def __is_skipped_nutrient(key_name, nutrition_data_per) -> bool:
+        return (
+            (nutrition_data_per is None and "_100g" in key_name)
+            or (nutrition_data_per == "100g" and "_serving" in key_name)
+            or (nutrition_data_per == "serving" and "_100g" in key_name)
+        )
+
     def __add_values(self, columns, line, key, value, old_key_name, nutrition_data_per):
         current_key_name = old_key_name + "." + key if old_key_name != "" else key
 
-        if (
-            (nutrition_data_per is None and "_100g" in current_key_name)
-            or (nutrition_data_per == "100g" and "_serving" in current_key_name)
-            or (nutrition_data_per == "serving" and "_100g" in current_key_name)
-        ):
+        if self.__is_skipped_nutrient(current_key_name, nutrition_data_per):
             return
 
         if self.__is_simple_field(value):
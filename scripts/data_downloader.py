@@ -1,62 +1,229 @@
+import concurrent.futures
 import gzip
+import hashlib
+import json
 import logging
 import os
+import re
 import zipfile
 
 import requests
 from tenacity import retry, stop_after_attempt, wait_fixed
 
+from scripts.download_manifest import DownloadManifest
+
 
 class DataDownloader:
     """
     This is a class that downloads files.
 
+    Attributes:
+        max_retries (int): The number of attempts made to download a file
+        retry_wait (float): The number of seconds waited between two attempts
+        resume (bool): A boolean indicating if a retried download resumes from the already downloaded bytes
+        segments (int): The number of byte ranges downloaded concurrently when the server supports range requests (1 for a single stream)
+        segment_retries (int): The number of attempts made to download each byte range
+        manifest (DownloadManifest | None): The manifest of the downloaded files, used to download a file again only when its source changed
+
     Methods:
+        download_data(source_url, compressed_file): Downloads the compressed file at a given url without decompressing it
         download_and_decompress_data(source_url, compressed_file, compressed_file_extension, decompressed_file): Downloads and decompresses the file at a
         given url
     """
 
+    def __init__(
+        self,
+        max_retries: int = 5,
+        retry_wait: float = 5,
+        resume: bool = True,
+        segments: int = 1,
+        segment_retries: int = 5,
+        manifest: DownloadManifest = None,
+    ):
+        self.max_retries = max_retries
+        self.retry_wait = retry_wait
+        self.resume = resume
+        self.segments = segments
+        self.segment_retries = segment_retries
+        self.manifest = manifest
+
+    def download_data(self, source_url: str, compressed_file: str) -> bool:
+        """Downloads the compressed file at a given url, to be read later without being decompressed on disk.
+        With a manifest, the file is downloaded again only if the source changed since the last download.
+        Args:
+            source_url: the url to download the file from
+            compressed_file: the path to the downloaded compressed file
+        Returns:
+            bool: True if the file was downloaded, False if the existing file was kept
+        """
+        if self.__is_up_to_date(source_url, compressed_file):
+            logging.info(f"File {compressed_file} is up to date. Skipping download.")
+            return False
+
+        download_info = self.__download_file(source_url, compressed_file)
+        if self.manifest is not None:
+            self.manifest.update_entry(
+                os.path.basename(compressed_file), source_url, **download_info
+            )
+        return True
+
     def download_and_decompress_data(
         self,
         source_url: str,
         compressed_file: str,
         compressed_file_extension: str,
         decompressed_file: str,
-    ) -> None:
-        """Downloads and decompresses the file at a given url
+    ) -> bool:
+        """Downloads and decompresses the file at a given url.
+        With a manifest, the file is downloaded and decompressed again only if the source changed since the last download.
         Args:
             source_url: the url to download the file from
             compressed_file: the path to the downloaded compressed file
             compressed_file_extension: the extension of the downloaded compressed file
-            decompressed_file: the path to the decompressed file"""
-        if os.path.exists(decompressed_file):
+            decompressed_file: the path to the decompressed file
+        Returns:
+            bool: True if the file was downloaded, False if the existing file was kept
+        """
+        if self.manifest is None and os.path.exists(decompressed_file):
             logging.info(f"File {decompressed_file} already exists. Skipping download.")
-            return
+            return False
 
-        self.__download_file(source_url, compressed_file)
-        self.__decompress_file(
-            compressed_file, compressed_file_extension, decompressed_file
-        )
+        changed = self.download_data(source_url, compressed_file)
+
+        if changed or not os.path.exists(decompressed_file):
+            self.__decompress_file(
+                compressed_file, compressed_file_extension, decompressed_file
+            )
+        else:
+            logging.info(
+                f"File {decompressed_file} is up to date. Skipping decompression."
+            )
+        return changed
+
+    def __is_up_to_date(self, source_url: str, compressed_file: str) -> bool:
+        """Returns True if the downloaded file exists and, with a manifest, if it matches the manifest entry and the source
+        did not change since its download"""
+        if not os.path.exists(compressed_file):
+            return False
+        if self.manifest is None:
+            return True
+
+        entry = self.manifest.get_entry(os.path.basename(compressed_file))
+        if (
+            entry is None
+            or entry.get("url") != source_url
+            or entry.get("size") != os.path.getsize(compressed_file)
+        ):
+            return False
+        return self.__is_source_unchanged(source_url, entry)
 
     @staticmethod
+    def __is_source_unchanged(url: str, entry: dict, timeout: int = 60) -> bool:
+        """Sends a conditional request for the file at the given url and returns True if it did not change since the
+        download recorded in the given manifest entry"""
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        if not headers:
+            return False
+
+        try:
+            response = requests.head(
+                url, headers=headers, allow_redirects=True, timeout=timeout
+            )
+        except requests.exceptions.RequestException as exc:
+            logging.warning(
+                f"Could not check if {url} changed, keeping the downloaded file: {exc}"
+            )
+            return True
+
+        if response.status_code == 304:
+            return True
+        if not response.ok:
+            return False
+
+        etag = response.headers.get("ETag")
+        if etag is not None and entry.get("etag") is not None:
+            return etag == entry["etag"]
+        last_modified = response.headers.get("Last-Modified")
+        return last_modified is not None and last_modified == entry.get("last_modified")
+
     def __download_file(
+        self,
         url: str,
         download_path: str,
         chunk_size: int = 1024 * 1024,
-        max_retries: int = 5,
         timeout: int = 60,
-    ) -> None:
-        """Downloads a file from a given url into a given download path"""
+    ) -> dict:
+        """Downloads a file from a given url into a given download path.
+        The file is first written to a .part file, and a retried download resumes from the size of the .part file
+        when the server supports range requests. The validator of the download (its strong ETag or Last-Modified date)
+        is saved next to the .part file, so that the download left by an interrupted run is resumed too.
+        Returns the ETag, Last-Modified date, size and SHA-256 digest of the downloaded file
+        """
         logging.info(f"Downloading file from {url}...")
+        part_path = download_path + ".part"
+        validator_path = part_path + ".json"
+        validator = self.__load_validator(validator_path) if self.resume else {}
+        download_info = {}
+
+        if self.segments > 1:
+            ranges_support = self.__probe_ranges_support(url, timeout)
+            if ranges_support is not None:
+                return self.__download_file_in_segments(
+                    *ranges_support, download_path, chunk_size, timeout
+                )
+            logging.info(
+                f"Server does not support range requests for {url}, downloading it in a single stream"
+            )
 
-        @retry(stop=stop_after_attempt(max_retries), wait=wait_fixed(5))
+        @retry(
+            stop=stop_after_attempt(self.max_retries), wait=wait_fixed(self.retry_wait)
+        )
         def download():
             try:
-                with requests.get(url, stream=True, timeout=timeout) as response:
-                    response.raise_for_status()
-                    with open(download_path, "wb") as f:
+                downloaded_size = (
+                    os.path.getsize(part_path)
+                    if self.resume and validator and os.path.exists(part_path)
+                    else 0
+                )
+                response, downloaded_size = self.__request_file(
+                    url, downloaded_size, validator, timeout
+                )
+
+                with response:
+                    mode = "ab" if downloaded_size > 0 else "wb"
+                    expected_size = self.__get_expected_size(response, downloaded_size)
+                    self.__record_validator(response, validator)
+                    if self.resume:
+                        self.__save_validator(validator_path, validator)
+
+                    sha256 = hashlib.sha256()
+                    if mode == "ab":
+                        self.__hash_file(part_path, sha256, chunk_size)
+
+                    with open(part_path, mode) as f:
                         for chunk in response.iter_content(chunk_size=chunk_size):
                             f.write(chunk)
+                            sha256.update(chunk)
+
+                actual_size = os.path.getsize(part_path)
+                if expected_size is not None and actual_size != expected_size:
+                    raise requests.exceptions.RequestException(
+                        f"Incomplete download: {actual_size} bytes out of {expected_size}"
+                    )
+
+                os.replace(part_path, download_path)
+                if os.path.exists(validator_path):
+                    os.remove(validator_path)
+                download_info.update(
+                    etag=response.headers.get("ETag"),
+                    last_modified=response.headers.get("Last-Modified"),
+                    size=actual_size,
+                    sha256=sha256.hexdigest(),
+                )
                 logging.info(f"Download complete: {download_path}")
             except requests.exceptions.RequestException as exc:
                 logging.error(f"Error downloading file {exc}")
@@ -65,9 +232,276 @@ class DataDownloader:
         try:
             download()
         except Exception as e:
-            logging.error(f"Download failed after {max_retries} attempts: {e}")
+            logging.error(f"Download failed after {self.max_retries} attempts: {e}")
+            raise
+
+        return download_info
+
+    def __request_file(
+        self, url: str, downloaded_size: int, validator: dict, timeout: int
+    ) -> tuple[requests.Response, int]:
+        """Sends the request for the file at the given url, with a range request resuming from the given downloaded size.
+        A partial response which is not the continuation of the downloaded bytes (e.g. the file changed) is closed and the
+        whole file is requested again. Returns the response and the number of downloaded bytes it continues
+        """
+        headers = {}
+        if downloaded_size > 0:
+            headers["Range"] = f"bytes={downloaded_size}-"
+            headers["If-Range"] = validator["value"]
+
+        response = requests.get(url, stream=True, timeout=timeout, headers=headers)
+        try:
+            response.raise_for_status()
+        except requests.exceptions.RequestException:
+            response.close()
             raise
 
+        if downloaded_size == 0:
+            return response, 0
+        if self.__is_consistent_partial_response(response, downloaded_size, validator):
+            logging.info(f"Resuming download of {url} from byte {downloaded_size}")
+            return response, downloaded_size
+        if response.status_code != 206:
+            logging.warning(
+                f"Server did not resume the download of {url}, downloading the whole file again"
+            )
+            return response, 0
+
+        logging.warning(
+            f"Server sent another range of {url} than the downloaded one, requesting the whole file again"
+        )
+        response.close()
+        return self.__request_file(url, 0, validator, timeout)
+
+    @staticmethod
+    def __load_validator(validator_path: str) -> dict:
+        """Returns the validator saved next to the .part file of an interrupted download, or an empty dictionary"""
+        if not os.path.exists(validator_path):
+            return {}
+        try:
+            with open(validator_path, "r", encoding="utf-8") as file:
+                validator = json.load(file)
+        except (OSError, json.JSONDecodeError) as e:
+            logging.warning(f"Could not read download validator {validator_path}: {e}")
+            return {}
+        return validator if isinstance(validator, dict) and "value" in validator else {}
+
+    @staticmethod
+    def __save_validator(validator_path: str, validator: dict) -> None:
+        """Saves the validator of the download next to its .part file, so that a later run can resume it"""
+        if not validator:
+            if os.path.exists(validator_path):
+                os.remove(validator_path)
+            return
+        with open(validator_path, "w", encoding="utf-8") as file:
+            json.dump(validator, file)
+
+    @staticmethod
+    def __probe_ranges_support(url: str, timeout: int) -> tuple | None:
+        """Returns the final url, the size and the response headers of the file at the given url if the server supports
+        range requests for it, None otherwise"""
+        try:
+            response = requests.head(url, allow_redirects=True, timeout=timeout)
+            response.raise_for_status()
+        except requests.exceptions.RequestException as exc:
+            logging.warning(f"Could not check range requests support of {url}: {exc}")
+            return None
+
+        content_length = response.headers.get("Content-Length")
+        if (
+            response.headers.get("Accept-Ranges", "").lower() != "bytes"
+            or not content_length
+            or int(content_length) == 0
+            or "Content-Encoding" in response.headers
+        ):
+            return None
+
+        return response.url, int(content_length), response.headers
+
+    def __download_file_in_segments(
+        self,
+        url: str,
+        size: int,
+        headers: requests.structures.CaseInsensitiveDict,
+        download_path: str,
+        chunk_size: int,
+        timeout: int,
+    ) -> dict:
+        """Downloads a file of a known size by fetching byte ranges concurrently into a preallocated .part file.
+        Returns the ETag, Last-Modified date, size and SHA-256 digest of the downloaded file
+        """
+        part_path = download_path + ".part"
+        etag = headers.get("ETag")
+        validator = (
+            etag
+            if etag is not None and not etag.startswith("W/")
+            else headers.get("Last-Modified")
+        )
+        segment_size = -(-size // self.segments)
+        ranges = [
+            (start, min(start + segment_size, size) - 1)
+            for start in range(0, size, segment_size)
+        ]
+        logging.info(
+            f"Downloading {size} bytes in {len(ranges)} segments of up to {segment_size} bytes..."
+        )
+
+        with open(part_path, "wb") as f:
+            f.truncate(size)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(ranges)) as executor:
+            futures = [
+                executor.submit(
+                    self.__download_segment,
+                    url,
+                    part_path,
+                    start,
+                    end,
+                    validator,
+                    chunk_size,
+                    timeout,
+                )
+                for start, end in ranges
+            ]
+            written = sum(future.result() for future in futures)
+
+        if written != size or os.path.getsize(part_path) != size:
+            raise requests.exceptions.RequestException(
+                f"Incomplete segmented download: {written} bytes out of {size}"
+            )
+
+        sha256 = hashlib.sha256()
+        self.__hash_file(part_path, sha256, chunk_size)
+
+        os.replace(part_path, download_path)
+        logging.info(f"Download complete: {download_path}")
+        return {
+            "etag": etag,
+            "last_modified": headers.get("Last-Modified"),
+            "size": size,
+            "sha256": sha256.hexdigest(),
+        }
+
+    def __download_segment(
+        self,
+        url: str,
+        part_path: str,
+        start: int,
+        end: int,
+        validator: str | None,
+        chunk_size: int,
+        timeout: int,
+    ) -> int:
+        """Downloads the byte range [start, end] of the file at the given url into the same range of the .part file.
+        A retried attempt resumes from the last written byte. Returns the number of bytes written
+        """
+        position = start
+
+        @retry(
+            stop=stop_after_attempt(self.segment_retries),
+            wait=wait_fixed(self.retry_wait),
+            reraise=True,
+        )
+        def download():
+            nonlocal position
+            headers = {"Range": f"bytes={position}-{end}"}
+            if validator is not None:
+                headers["If-Range"] = validator
+
+            try:
+                with requests.get(
+                    url, stream=True, timeout=timeout, headers=headers
+                ) as response:
+                    response.raise_for_status()
+                    content_range = response.headers.get("Content-Range", "")
+                    if response.status_code != 206 or not content_range.startswith(
+                        f"bytes {position}-"
+                    ):
+                        raise requests.exceptions.RequestException(
+                            f"Server did not return the range {position}-{end} of {url}, the file may have changed"
+                        )
+
+                    fd = os.open(part_path, os.O_WRONLY | getattr(os, "O_BINARY", 0))
+                    try:
+                        for chunk in response.iter_content(chunk_size=chunk_size):
+                            chunk = chunk[: end + 1 - position]
+                            self.__write_at(fd, chunk, position)
+                            position += len(chunk)
+                    finally:
+                        os.close(fd)
+
+                if position != end + 1:
+                    raise requests.exceptions.RequestException(
+                        f"Incomplete segment {start}-{end}: stopped at byte {position}"
+                    )
+            except requests.exceptions.RequestException as exc:
+                logging.error(f"Error downloading segment {start}-{end}: {exc}")
+                raise
+
+        download()
+        return position - start
+
+    @staticmethod
+    def __hash_file(file: str, sha256, chunk_size: int) -> None:
+        """Updates the given SHA-256 hash with the content of the given file"""
+        with open(file, "rb") as f:
+            while chunk := f.read(chunk_size):
+                sha256.update(chunk)
+
+    @staticmethod
+    def __write_at(fd: int, data: bytes, position: int) -> None:
+        """Writes the given data at the given position of a file descriptor"""
+        view = memoryview(data)
+        while view:
+            if hasattr(os, "pwrite"):
+                written = os.pwrite(fd, view, position)
+            else:
+                os.lseek(fd, position, os.SEEK_SET)
+                written = os.write(fd, view)
+            view = view[written:]
+            position += written
+
+    @staticmethod
+    def __is_consistent_partial_response(
+        response: requests.Response, downloaded_size: int, validator: dict
+    ) -> bool:
+        """Returns True if the response is the continuation of the partially downloaded file, False otherwise"""
+        if response.status_code != 206:
+            return False
+
+        content_range = response.headers.get("Content-Range", "")
+        match = re.fullmatch(r"bytes (\d+)-(\d+)/(\d+|\*)", content_range.strip())
+        if match is None or int(match.group(1)) != downloaded_size:
+            return False
+
+        etag = response.headers.get("ETag")
+        if validator.get("etag") is not None and etag is not None:
+            return etag == validator["etag"]
+        return True
+
+    @staticmethod
+    def __get_expected_size(
+        response: requests.Response, downloaded_size: int
+    ) -> int | None:
+        """Returns the expected size of the whole file once the response is written, or None if it is unknown"""
+        content_length = response.headers.get("Content-Length")
+        if content_length is None or "Content-Encoding" in response.headers:
+            return None
+        return downloaded_size + int(content_length)
+
+    @staticmethod
+    def __record_validator(response: requests.Response, validator: dict) -> None:
+        """Records the strong ETag (or else the Last-Modified date) of the downloaded file, used to resume the download"""
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        validator.clear()
+
+        if etag is not None and not etag.startswith("W/"):
+            validator["etag"] = etag
+            validator["value"] = etag
+        elif last_modified is not None:
+            validator["value"] = last_modified
+
     def __decompress_file(
         self,
         compressed_file: str,
@@ -1,112 +1,776 @@
+import concurrent.futures
+import itertools
 import json
 import logging
-
-import ijson
+import zipfile
+from contextlib import contextmanager
+from typing import Callable, Iterable, Iterator
 
 from domain.mapper.product_mapper import ProductMapper
+from domain.product.product import Product
+from domain.utils.ijson_backend import IjsonBackend
 from scripts.data_loader import DataLoader
+from scripts.adaptive_batch_controller import AdaptiveBatchController
 from scripts.config import Config
+from scripts.fdc_record_extractor import FdcRecordExtractor
+from scripts.import_checkpoint import ImportCheckpoint
+from scripts.import_pipeline import ImportPipeline
+from scripts.import_sampler import ImportSampler
+from scripts.json_decoder import JsonDecoder
+from scripts.jsonl_reader import JsonlReader
+from scripts.mapped_product_cache import MappedProductCache
+from scripts.off_line_filter import OffLineFilter
+from scripts.off_watermark_filter import OffWatermarkFilter
+from scripts.product_mapper_factory import ProductMapperFactory
+from scripts.quarantine_writer import QuarantineWriter
 
 
 class DataImporter:
     """
     This is a class that imports data on products.
+    Each import runs as an ImportPipeline: a reader thread, mapping threads and the loading of the products by batch
+    into MongoDB, connected by bounded queues. An import given an ImportCheckpoint records its position after each
+    loaded batch, and resumes from the recorded position if there is one.
 
     Attributes:
         product_mapper (ProductMapper)
+        json_decoder (JsonDecoder): The decoder of the Open Food Facts jsonl lines
+        mapping_workers (int): The number of threads mapping the read products
+        queue_size (int): The maximum number of chunks of products waiting between two stages of the import
+        chunk_size (int): The number of read products passed at once from a stage of the import to the next one
+        product_cache (MappedProductCache | None): The cache of the products mapped from unchanged raw records
+        skip_cached_upserts (bool): Whether the cached products are not loaded again into MongoDB
 
     Methods:
-        import_json_fdc_data(filename): Imports the data of branded food in a json file into a list of strings for each branded food
-        import_jsonl_off_data(filename, limit): Imports the data of canadian food in a json file into a list of products
+        import_json_fdc_data(filename, batch_size, use_float, checkpoint, project_records, sampler, quarantine): Imports the data
+        of branded food in a json file (plain or inside a .zip archive) into a list of strings for each branded food
+        import_jsonl_off_data(filename, batch_size, limit, decompressed_copy_file, line_filter, checkpoint, watermark_filter,
+        sampler, quarantine): Imports the data of canadian food in a jsonl file (plain or compressed with gzip) into a list
+        of products
+        import_jsonl_off_data_in_parallel(filename, batch_size, workers, product_mapper_factory, line_filter, checkpoint,
+        watermark_filter, sampler, quarantine): Imports the data of a jsonl file with several worker processes, each one
+        importing a shard of the file
+        import_jsonl_off_shard(filename, start, end, batch_size, line_filter, checkpoint, watermark_filter, sampler,
+        quarantine): Imports the lines of a jsonl file between two byte offsets
     """
 
-    def __init__(self, product_mapper: ProductMapper):
+    def __init__(
+        self,
+        product_mapper: ProductMapper,
+        mapping_workers: int = 2,
+        queue_size: int = 8,
+        chunk_size: int = 1000,
+        product_cache: MappedProductCache = None,
+        skip_cached_upserts: bool = False,
+    ):
         self.product_mapper = product_mapper
         self.data_loader = DataLoader()
         self.config = Config()
+        self.json_decoder = JsonDecoder()
+        self.mapping_workers = mapping_workers
+        self.queue_size = queue_size
+        self.chunk_size = chunk_size
+        self.product_cache = product_cache
+        self.skip_cached_upserts = skip_cached_upserts
 
-    def import_json_fdc_data(self, filename: str, batch_size: int):
+    def import_json_fdc_data(
+        self,
+        filename: str,
+        batch_size: int | AdaptiveBatchController,
+        use_float: bool = True,
+        checkpoint: ImportCheckpoint = None,
+        project_records: bool = None,
+        sampler: ImportSampler = None,
+        quarantine: QuarantineWriter = None,
+    ):
         """Imports the data of branded food in a json file into a list of strings for each branded food
 
         Args:
-            filename: The path to the imported Food Data Central json file
-            batch_size: The amount of rows treated by batch. Helps keeping RAM consumption in check.
+            filename: The path to the imported Food Data Central json file. A .zip file is read without being extracted.
+            batch_size: The amount of rows treated by batch. Helps keeping RAM consumption in check. Can be an
+            AdaptiveBatchController adjusting it to the memory of the process and the latency of the loads.
+            use_float: Whether the non-integer numbers are parsed as floats instead of Decimal objects.
+            checkpoint (ImportCheckpoint, optional): The checkpoint recording the index of the last loaded item. Defaults to None.
+            project_records (bool, optional): Whether the records are extracted from the parsing events with only the
+            fields used by the mapper. Defaults to None, in which case they are projected unless the ijson backend
+            builds whole objects in C, which is faster than handling the events in Python.
+            sampler (ImportSampler, optional): The sampler selecting the products to import. Defaults to None.
+            quarantine (QuarantineWriter, optional): The quarantine of the records which cannot be mapped, the import
+            stopping at the first of them if there is none. Defaults to None.
         Returns:
             list[Product]: A list of Product objects extracted from the dataset.
         """
-        products = []
-        count = 0
-        batch = batch_size
+        position, batches = self.__get_resume_point(checkpoint, filename)
+        if project_records is None:
+            project_records = not IjsonBackend.builds_objects_natively()
 
-        with open(filename, "r", encoding="utf-8") as file:
+        with self.__open_fdc_file(filename) as file:
             logging.info("Extracting Food Data Central products...")
-            for obj in ijson.items(file, "BrandedFoods.item"):
-                if obj.get("marketCountry") == "United States":
-                    prod = self.product_mapper.map_fdc_dict_to_product(obj)
-                    products.append(prod)
-                    count += 1
-                    if count % 10000 == 0:
-                        logging.info(f"{count} products imported so far...")
-                    if count >= batch:
-                        self.data_loader.load_products_to_mongo(
-                            products,
-                            collection_name="fdc_products",
-                            use_docker=self.config.use_docker,
-                        )
-                        batch = batch_size + batch
-                        products = []
-        logging.info(f"FDC data imported, total: {count}")
-        self.data_loader.load_products_to_mongo(
-            products, collection_name="fdc_products", use_docker=self.config.use_docker
+            record_extractor = None
+            if project_records:
+                record_extractor = FdcRecordExtractor()
+                us_objects = (
+                    (obj, index + 1)
+                    for index, obj in record_extractor.records(
+                        file, use_float=use_float, start=position
+                    )
+                )
+            else:
+                items = IjsonBackend.get_backend().items(
+                    file, "BrandedFoods.item", use_float=use_float
+                )
+                # The skipped items are still parsed, but neither mapped nor loaded
+                us_objects = (
+                    (obj, index + 1)
+                    for index, obj in enumerate(
+                        itertools.islice(items, position, None), start=position
+                    )
+                    if obj.get("marketCountry") == "United States"
+                )
+            if sampler is not None:
+                logging.info(f"Sampling Food Data Central products with {sampler}")
+                us_objects = self.__sample_fdc_objects(us_objects, sampler)
+            try:
+                counts = self.__run_import_pipeline(
+                    us_objects,
+                    lambda chunk: self.__map_fdc_chunk(chunk, quarantine),
+                    "fdc_products",
+                    batch_size,
+                    limit=sampler.limit() if sampler is not None else None,
+                    checkpoint=checkpoint,
+                    batches=batches,
+                    quarantine=quarantine,
+                )
+            finally:
+                if quarantine is not None:
+                    quarantine.close()
+                    quarantine.log_counts()
+        if record_extractor is not None:
+            record_extractor.log_counts()
+        self.__finish_product_cache()
+        logging.info(
+            f"FDC data imported, total: {counts['imported']}, {counts['errors']} records in error"
         )
 
-    def import_jsonl_off_data(self, filename: str, batch_size: int, limit: int = None):
+    def import_jsonl_off_data(
+        self,
+        filename: str,
+        batch_size: int | AdaptiveBatchController,
+        limit: int = None,
+        decompressed_copy_file: str = None,
+        line_filter: OffLineFilter = None,
+        checkpoint: ImportCheckpoint = None,
+        watermark_filter: OffWatermarkFilter = None,
+        sampler: ImportSampler = None,
+        quarantine: QuarantineWriter = None,
+    ) -> dict:
         """Imports the data of canadian food in a json file into a list of products
 
         Args:
-            filename: The path to the imported Open Food Facts jsonl file
-            batch_size: The amount of rows treated by batch. Helps keeping RAM consumption in check.
-            limit (int, optional): The number of objects to read from the dataset. Defaults to None.
+            filename: The path to the imported Open Food Facts jsonl file. A .gz file is decompressed on the fly.
+            batch_size: The amount of rows treated by batch. Helps keeping RAM consumption in check. Can be an
+            AdaptiveBatchController adjusting it to the memory of the process and the latency of the loads.
+            limit (int, optional): The number of objects to read from the dataset, i.e. a head sampler. Defaults to None.
+            decompressed_copy_file (str, optional): The path where the decompressed lines of a .gz file are also written. Defaults to None.
+            line_filter (OffLineFilter, optional): The filter of the lines to import, applied before decoding them. Defaults to None.
+            checkpoint (ImportCheckpoint, optional): The checkpoint recording the offset following the last loaded line. Defaults to None.
+            watermark_filter (OffWatermarkFilter, optional): The filter skipping the products unchanged since the previous import. Defaults to None.
+            sampler (ImportSampler, optional): The sampler selecting the products to import, replacing the limit. Defaults to None.
+            quarantine (QuarantineWriter, optional): The quarantine of the lines which cannot be decoded or mapped, the import
+            stopping at the first mapping error if there is none. Defaults to None.
         Returns:
-            list[Product]: A list of Product objects extracted from the dataset.
+            dict: The number of lines read, products mapped, lines in error, unchanged products skipped and products found in
+            the cache, and the highest last_modified_t of the imported products (the watermark of the next import)
         """
-        if limit is not None:
+        if sampler is None and limit is not None:
+            sampler = ImportSampler("head", limit)
+        if sampler is not None:
             logging.info(
-                f"Extracting {limit} products from Open Food Facts csv dataset..."
+                f"Extracting a sample of the products from Open Food Facts jsonl dataset with {sampler}..."
             )
         else:
             logging.info(
                 "Extracting all products from Open Food Facts jsonl dataset..."
             )
 
-        products = []
-        count = 0
-        batch = batch_size
+        reader = JsonlReader(decompressed_copy_file)
+        counts = self.__import_off_lines(
+            reader,
+            filename,
+            batch_size,
+            line_filter=line_filter,
+            checkpoint=checkpoint,
+            watermark_filter=watermark_filter,
+            sampler=sampler,
+            quarantine=quarantine,
+        )
+        self.__finish_product_cache()
+
+        logging.info(
+            f"OFF data imported: {counts['lines']} lines read, {counts['products']} products mapped, "
+            f"{counts['errors']} lines in error"
+        )
+        return counts
+
+    def import_jsonl_off_data_in_parallel(
+        self,
+        filename: str,
+        batch_size: int | AdaptiveBatchController,
+        workers: int,
+        product_mapper_factory: Callable[
+            [], ProductMapper
+        ] = ProductMapperFactory.create_product_mapper,
+        line_filter: OffLineFilter = None,
+        checkpoint: ImportCheckpoint = None,
+        watermark_filter: OffWatermarkFilter = None,
+        sampler: ImportSampler = None,
+        quarantine: QuarantineWriter = None,
+    ) -> dict:
+        """Imports the data of a plain Open Food Facts jsonl file by splitting it into byte ranges aligned on lines,
+        each one being mapped and loaded by a worker process
+
+        Args:
+            filename: The path to the imported Open Food Facts jsonl file. It cannot be compressed.
+            batch_size: The amount of rows treated by batch in each worker. Helps keeping RAM consumption in check. Can be an
+            AdaptiveBatchController adjusting it to the memory of the process and the latency of the loads.
+            workers: The number of worker processes
+            product_mapper_factory (Callable, optional): The picklable function creating the ProductMapper of each worker.
+            Defaults to ProductMapperFactory.create_product_mapper.
+            line_filter (OffLineFilter, optional): The filter of the lines to import, copied in each worker. Defaults to None.
+            checkpoint (ImportCheckpoint, optional): The checkpoint of the import, of which each shard has its own checkpoint.
+            Defaults to None.
+            watermark_filter (OffWatermarkFilter, optional): The filter skipping the products unchanged since the previous
+            import, copied in each worker. Defaults to None.
+            sampler (ImportSampler, optional): The sampler selecting the products to import, applied to each shard (a head
+            sample being split between the shards). Defaults to None.
+            quarantine (QuarantineWriter, optional): The quarantine of the import, of which each shard has its own file.
+            Defaults to None.
+        Returns:
+            dict: The counts of all the shards, as returned by import_jsonl_off_data
+        """
+        shards = JsonlReader.split_into_shards(filename, workers)
+        logging.info(
+            f"Extracting all products from Open Food Facts jsonl dataset with {len(shards)} worker processes..."
+        )
+
+        total_counts = {
+            "lines": 0,
+            "products": 0,
+            "errors": 0,
+            "skipped": 0,
+            "cached": 0,
+            "max_last_modified_t": None,
+        }
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=len(shards)
+        ) as executor:
+            futures = [
+                executor.submit(
+                    _import_off_shard,
+                    product_mapper_factory,
+                    filename,
+                    start,
+                    end,
+                    batch_size,
+                    line_filter,
+                    (
+                        checkpoint.for_shard(start, end)
+                        if checkpoint is not None
+                        else None
+                    ),
+                    watermark_filter,
+                    sampler.for_shards(len(shards)) if sampler is not None else None,
+                    (
+                        quarantine.for_shard(start, end)
+                        if quarantine is not None
+                        else None
+                    ),
+                    {
+                        "mapping_workers": self.mapping_workers,
+                        "queue_size": self.queue_size,
+                        "chunk_size": self.chunk_size,
+                        "product_cache": self.product_cache,
+                        "skip_cached_upserts": self.skip_cached_upserts,
+                    },
+                )
+                for start, end in shards
+            ]
+            for shard_index, future in enumerate(futures):
+                counts = future.result()
+                logging.info(f"Shard {shard_index} imported: {counts}")
+                for key in ("lines", "products", "errors", "skipped", "cached"):
+                    total_counts[key] += counts[key]
+                total_counts["max_last_modified_t"] = self.__max_timestamp(
+                    total_counts["max_last_modified_t"], counts["max_last_modified_t"]
+                )
+        if self.product_cache is not None:
+            # Each worker logs the statistics of its own lookups
+            self.product_cache.evict()
+
+        logging.info(
+            f"OFF data imported by {len(shards)} workers: {total_counts['lines']} lines read, "
+            f"{total_counts['products']} products mapped, {total_counts['errors']} lines in error"
+        )
+        return total_counts
+
+    def import_jsonl_off_shard(
+        self,
+        filename: str,
+        start: int,
+        end: int,
+        batch_size: int | AdaptiveBatchController,
+        line_filter: OffLineFilter = None,
+        checkpoint: ImportCheckpoint = None,
+        watermark_filter: OffWatermarkFilter = None,
+        sampler: ImportSampler = None,
+        quarantine: QuarantineWriter = None,
+    ) -> dict:
+        """Imports the lines of a plain Open Food Facts jsonl file between the given byte offsets
+
+        Args:
+            filename: The path to the imported Open Food Facts jsonl file
+            start: The offset of the first line of the shard
+            end: The offset following the last line of the shard
+            batch_size: The amount of rows treated by batch. Helps keeping RAM consumption in check. Can be an
+            AdaptiveBatchController adjusting it to the memory of the process and the latency of the loads.
+            line_filter (OffLineFilter, optional): The filter of the lines to import, applied before decoding them. Defaults to None.
+            checkpoint (ImportCheckpoint, optional): The checkpoint of the shard. Defaults to None.
+            watermark_filter (OffWatermarkFilter, optional): The filter skipping the products unchanged since the previous import. Defaults to None.
+            sampler (ImportSampler, optional): The sampler selecting the products of the shard to import. Defaults to None.
+            quarantine (QuarantineWriter, optional): The quarantine of the shard. Defaults to None.
+        Returns:
+            dict: The counts of the shard, as returned by import_jsonl_off_data
+        """
+        counts = self.__import_off_lines(
+            JsonlReader(),
+            filename,
+            batch_size,
+            start,
+            end,
+            line_filter=line_filter,
+            checkpoint=checkpoint,
+            watermark_filter=watermark_filter,
+            sampler=sampler,
+            quarantine=quarantine,
+        )
+        if self.product_cache is not None:
+            self.product_cache.log_stats()
+        return counts
+
+    def __import_off_lines(
+        self,
+        reader: JsonlReader,
+        filename: str,
+        batch_size: int | AdaptiveBatchController,
+        start: int = 0,
+        end: int = None,
+        line_filter: OffLineFilter = None,
+        checkpoint: ImportCheckpoint = None,
+        watermark_filter: OffWatermarkFilter = None,
+        sampler: ImportSampler = None,
+        quarantine: QuarantineWriter = None,
+    ) -> dict:
+        """Maps the Open Food Facts jsonl lines read between the start and end offsets to products and loads them by
+        batch into MongoDB, starting from the offset recorded in the checkpoint if there is one.
+        The lines rejected by the filter, skipped by the watermark filter or left out of the sample (if any) are neither
+        mapped nor counted as products.
+        The lines which cannot be decoded or mapped are set aside in the quarantine (if any), which is closed at the end.
+        Returns the number of lines read, products mapped, lines in error, unchanged products skipped and products found
+        in the cache, and the highest last_modified_t of the imported products"""
+        position, batches = self.__get_resume_point(checkpoint, filename)
+        start = max(start, position)
+
+        def read_positioned_lines() -> Iterator[tuple[bytes, int]]:
+            """Yields each line with the offset following it. The raw lines are pre-filtered here, in the reader
+            thread, before being passed to the mapping threads"""
+            candidate_index = -1
+            for line in reader.read_lines(filename, start, end):
+                if line_filter is not None and not line_filter.might_match(line):
+                    continue
+                if (
+                    watermark_filter is not None
+                    and not watermark_filter.might_be_newer(line)
+                ):
+                    continue
+                candidate_index += 1
+                if sampler is not None and not sampler.keeps_index(candidate_index):
+                    continue
+                yield line, start + reader.bytes_read
+
+        try:
+            counts = self.__run_import_pipeline(
+                read_positioned_lines(),
+                lambda chunk: self.__map_off_chunk(
+                    chunk, line_filter, watermark_filter, sampler, quarantine
+                ),
+                "off_products",
+                batch_size,
+                sampler.limit() if sampler is not None else None,
+                lambda: f" ({reader.get_throughput() / 1024 ** 2:.1f} MiB/s)",
+                checkpoint,
+                batches,
+                quarantine,
+            )
+        finally:
+            if quarantine is not None:
+                quarantine.close()
+                quarantine.log_counts()
+
+        if line_filter is not None:
+            line_filter.record_confirmed(counts["imported"])
+            line_filter.log_counts()
+        if watermark_filter is not None:
+            watermark_filter.log_counts(counts["outdated"], counts["imported"])
+        return {
+            "lines": reader.lines_read,
+            "products": counts["products"],
+            "errors": counts["errors"],
+            "skipped": counts["outdated"]
+            + (watermark_filter.pre_skipped if watermark_filter is not None else 0),
+            "cached": counts.get("cached", 0),
+            "max_last_modified_t": counts["max_modified"],
+        }
+
+    def __map_off_chunk(
+        self,
+        lines: list[tuple[bytes, int]],
+        line_filter: OffLineFilter = None,
+        watermark_filter: OffWatermarkFilter = None,
+        sampler: ImportSampler = None,
+        quarantine: QuarantineWriter = None,
+    ) -> tuple[list, dict]:
+        """Decodes and maps a chunk of Open Food Facts jsonl lines (with their following offsets) in a mapping thread.
+        The decoded lines are mapped in a single batch, to the dictionaries of the products unless there is a product
+        cache. The lines which cannot be decoded or mapped are set aside in the quarantine, if any.
+        Returns the mapped product (or None), the offset and the last_modified_t of each line kept by the filters, and
+        the number of lines in error, of unchanged products skipped and of products found in the cache
+        """
+        kept_lines = []
+        errors = 0
+        outdated = 0
+
+        for line, position in lines:
+            try:
+                obj = self.json_decoder.loads(line)
+            except self.json_decoder.decode_error as e:
+                errors += 1
+                if quarantine is not None:
+                    quarantine.write(e, position - len(line), line)
+                else:
+                    logging.info(
+                        f"Error parsing line at offset {position - len(line)}: {line[:200]}... Error: {e}"
+                    )
+                continue
+            if line_filter is not None and not line_filter.matches(obj):
+                continue
+            if sampler is not None and not sampler.keeps_barcode(obj.get("code")):
+                continue
+            if watermark_filter is not None and not watermark_filter.is_newer(obj):
+                outdated += 1
+                continue
+            kept_lines.append((line, obj, position))
+
+        products, failed, mapping_counts = self.__map_with_cache(
+            [(line, obj, position - len(line)) for line, obj, position in kept_lines],
+            self.product_mapper.map_off_dict_to_product,
+            quarantine,
+            # The cached products are Product objects, the others are mapped to the dictionaries loaded into MongoDB
+            lambda objects: self.product_mapper.map_off_dicts_to_products(
+                objects, as_dicts=self.product_cache is None
+            ),
+        )
+        entries = []
+        for product, (line, obj, position) in zip(products, kept_lines):
+            last_modified = obj.get("last_modified_t")
+            # A quarantined product is not imported, the watermark must not move past it
+            if not isinstance(last_modified, int) or position - len(line) in failed:
+                last_modified = None
+            entries.append((product, position, last_modified))
 
-        with open(filename, "r", encoding="utf-8") as file:
-            for line in file:
+        return entries, {
+            "errors": errors + mapping_counts["errors"],
+            "outdated": outdated,
+            "cached": mapping_counts["cached"],
+        }
+
+    def __map_fdc_chunk(
+        self, objects: list[tuple[dict, int]], quarantine: QuarantineWriter = None
+    ) -> tuple[list, dict]:
+        """Maps a chunk of Food Data Central objects (with their following item indexes) in a mapping thread.
+        The objects which cannot be mapped are set aside in the quarantine, if any.
+        Returns the mapped product (or None) and the index of each object, and the number of objects in error and of
+        products found in the cache
+        """
+        products, _, mapping_counts = self.__map_with_cache(
+            [
+                (
+                    (
+                        json.dumps(
+                            obj, sort_keys=True, separators=(",", ":"), default=str
+                        ).encode("utf-8")
+                        if self.product_cache is not None
+                        else None
+                    ),
+                    obj,
+                    position - 1,
+                )
+                for obj, position in objects
+            ],
+            self.product_mapper.map_fdc_dict_to_product,
+            quarantine,
+        )
+        return [
+            (product, position, None)
+            for product, (_, position) in zip(products, objects)
+        ], mapping_counts
+
+    @staticmethod
+    def __sample_fdc_objects(
+        objects: Iterable[tuple[dict, int]], sampler: ImportSampler
+    ) -> Iterator[tuple[dict, int]]:
+        """Yields the Food Data Central objects (with their following item indexes) kept by the sampler, the index of
+        the every mode being the one of the object among the given objects"""
+        for index, (obj, position) in enumerate(objects):
+            if sampler.keeps_index(index) and sampler.keeps_barcode(obj.get("gtinUpc")):
+                yield obj, position
+
+    def __map_with_cache(
+        self,
+        records: list[tuple[bytes, dict, int]],
+        map_record: Callable[[dict], Product],
+        quarantine: QuarantineWriter = None,
+        map_records: Callable[[list[dict]], list] = None,
+    ) -> tuple[list, set, dict]:
+        """Maps the given decoded records (with their raw bytes and their positions) with map_record, reusing the
+        products cached for the same raw bytes if there is a product cache. A cached product is not loaded again (None)
+        if the upserts of the cached products are skipped, since the product was loaded by a previous import.
+        If map_records is given, the records to map are mapped with it in a single batch, and one by one with
+        map_record only if the batch fails, to find the records in error.
+        If there is a quarantine, the records whose mapping fails are set aside in it (None) instead of stopping the
+        import.
+        Returns the product (or None) of each record, the positions of the quarantined records, and the number of records
+        in error and of products found in the cache
+        """
+        failed = set()
+
+        def map_or_quarantine(obj: dict, position: int) -> Product | None:
+            if quarantine is None:
+                return map_record(obj)
+            try:
+                return map_record(obj)
+            except Exception as e:
+                failed.add(position)
+                quarantine.write(e, position, obj)
+                return None
+
+        def map_all(objects: list[tuple[dict, int]]) -> list:
+            if map_records is not None and objects:
                 try:
-                    obj = json.loads(line.strip())
-                    prod = self.product_mapper.map_off_dict_to_product(obj)
-                    if prod is not None:
-                        products.append(prod)
-                    count += 1
-                    if count % 10000 == 0:
-                        logging.info(f"{count} products imported so far...")
-                    if limit is not None and count >= limit:
-                        break
-                    if count >= batch:
-                        self.data_loader.load_products_to_mongo(
-                            products,
-                            collection_name="off_products",
-                            use_docker=self.config.use_docker,
-                        )
-                        batch = batch_size + batch
-                        products = []
-                except json.JSONDecodeError as e:
-                    logging.info(f"Error parsing line: {line}. Error: {e}")
-
-        logging.info("OFF data imported")
-        self.data_loader.load_products_to_mongo(
-            products, collection_name="off_products", use_docker=self.config.use_docker
+                    return map_records([obj for obj, _ in objects])
+                except Exception:
+                    # The records in error are raised or quarantined by the mapping one by one
+                    pass
+            return [map_or_quarantine(obj, position) for obj, position in objects]
+
+        if self.product_cache is None:
+            return (
+                map_all([(obj, position) for _, obj, position in records]),
+                failed,
+                {"errors": len(failed), "cached": 0},
+            )
+
+        keys = [self.product_cache.key_of(raw_record) for raw_record, _, _ in records]
+        documents = self.product_cache.get_many(keys)
+        products = [None] * len(records)
+        unmapped = []
+        for index, (key, (_, obj, position)) in enumerate(zip(keys, records)):
+            document = documents.get(key)
+            if document is None:
+                unmapped.append(index)
+            elif not self.skip_cached_upserts:
+                try:
+                    products[index] = self.product_cache.to_product(document)
+                except ValueError as e:
+                    logging.warning(f"Invalid cached product, mapping it again: {e}")
+                    unmapped.append(index)
+
+        new_products = []
+        mapped = map_all([(records[index][1], records[index][2]) for index in unmapped])
+        for index, product in zip(unmapped, mapped):
+            products[index] = product
+            if keys[index] not in documents:
+                new_products.append((keys[index], product))
+
+        self.product_cache.put_many(new_products)
+        return (
+            products,
+            failed,
+            {"errors": len(failed), "cached": sum(key in documents for key in keys)},
+        )
+
+    def __finish_product_cache(self) -> None:
+        """Evicts the least recently used products of the product cache, if any, and logs its statistics"""
+        if self.product_cache is not None:
+            self.product_cache.evict()
+            self.product_cache.log_stats()
+
+    @staticmethod
+    def __max_timestamp(first: int | None, second: int | None) -> int | None:
+        """Returns the highest of two timestamps, ignoring the unknown (None) ones"""
+        if first is None or second is None:
+            return first if second is None else second
+        return max(first, second)
+
+    @staticmethod
+    def __get_resume_point(
+        checkpoint: ImportCheckpoint | None, filename: str
+    ) -> tuple[int, int]:
+        """Returns the position in the source file and the number of loaded batches recorded by the checkpoint, or
+        (0, 0) if there is no checkpoint to resume from"""
+        recorded = checkpoint.load() if checkpoint is not None else None
+        if recorded is None:
+            return 0, 0
+
+        logging.info(
+            f"Resuming the import of {filename} at position {recorded['position']}, "
+            f"after {recorded['batches']} loaded batches..."
+        )
+        return recorded["position"], recorded["batches"]
+
+    def __run_import_pipeline(
+        self,
+        items: Iterable,
+        map_chunk: Callable[[list], tuple[list, dict]],
+        collection_name: str,
+        batch_size: int | AdaptiveBatchController,
+        limit: int = None,
+        describe_progress: Callable[[], str] = lambda: "",
+        checkpoint: ImportCheckpoint = None,
+        batches: int = 0,
+        quarantine: QuarantineWriter = None,
+    ) -> dict:
+        """Runs an ImportPipeline reading the given items, mapping them by chunks with map_chunk in the mapping
+        threads, and loading the mapped products by batch into the given MongoDB collection.
+        map_chunk returns the mapped product (or None), the position following and the modification timestamp (or None)
+        of each item of the chunk to import, and counts (errors...) added to the counts of the import. The checkpoint, if
+        any, records the position of the last item of each loaded batch, after the flush of the quarantine, if any. The
+        batches have a fixed size, or the size
+        chosen by the given AdaptiveBatchController from the memory of the process and the latency of the loads.
+        Returns the number of items imported and products mapped, the added counts, and the highest modification
+        timestamp of the imported items"""
+        counts = {"imported": 0, "products": 0, "errors": 0, "max_modified": None}
+        products = []
+        pending = 0
+        last_position = None
+        controller = (
+            batch_size
+            if isinstance(batch_size, AdaptiveBatchController)
+            else AdaptiveBatchController.fixed(batch_size)
         )
+
+        def load_products() -> None:
+            nonlocal products, pending, batches
+            latency = self.data_loader.load_products_to_mongo(
+                products,
+                collection_name=collection_name,
+                use_docker=self.config.use_docker,
+            )
+            controller.record(pending, latency)
+            batches += 1
+            if quarantine is not None:
+                # The bad records read before the checkpoint are on disk when an import resumes from it
+                quarantine.flush()
+            if checkpoint is not None and last_position is not None:
+                checkpoint.save(last_position, batches)
+            products = []
+            pending = 0
+
+        def load_chunk(mapped_chunk: tuple[list, dict]) -> bool:
+            nonlocal pending, last_position
+            entries, chunk_counts = mapped_chunk
+            for key, value in chunk_counts.items():
+                counts[key] = counts.get(key, 0) + value
+
+            for product, position, modified in entries:
+                last_position = position
+                counts["max_modified"] = self.__max_timestamp(
+                    counts["max_modified"], modified
+                )
+                if product is not None:
+                    products.append(product)
+                    counts["products"] += 1
+                counts["imported"] += 1
+                pending += 1
+                if counts["imported"] % 10000 == 0:
+                    logging.info(
+                        f"{counts['imported']} products imported so far{describe_progress()}..."
+                    )
+                if limit is not None and counts["imported"] >= limit:
+                    return False
+                if pending >= controller.batch_size:
+                    load_products()
+            if controller.memory_exceeded(pending):
+                logging.info(
+                    f"Loading {pending} records before the flush size of {controller.batch_size}: "
+                    f"memory above {controller.max_rss / 1024 ** 2:.0f} MiB"
+                )
+                load_products()
+            return True
+
+        pipeline = ImportPipeline(
+            map_chunk,
+            load_chunk,
+            mapping_workers=self.mapping_workers,
+            queue_size=self.queue_size,
+            chunk_size=self.chunk_size,
+        )
+        pipeline.run(items)
+
+        load_products()
+        return counts
+
+    @staticmethod
+    @contextmanager
+    def __open_fdc_file(filename: str):
+        """Opens the Food Data Central json file in binary mode, or the json file inside a .zip archive without
+        extracting it"""
+        if not filename.endswith(".zip"):
+            with open(filename, "rb") as file:
+                yield file
+            return
+
+        with zipfile.ZipFile(filename, "r") as zip_ref:
+            member = zip_ref.namelist()[0]
+            logging.info(f"Reading {member} from {filename}...")
+            with zip_ref.open(member, "r") as file:
+                yield file
+
+
+def _import_off_shard(
+    product_mapper_factory: Callable[[], ProductMapper],
+    filename: str,
+    start: int,
+    end: int,
+    batch_size: int | AdaptiveBatchController,
+    line_filter: OffLineFilter = None,
+    checkpoint: ImportCheckpoint = None,
+    watermark_filter: OffWatermarkFilter = None,
+    sampler: ImportSampler = None,
+    quarantine: QuarantineWriter = None,
+    importer_settings: dict = None,
+) -> dict:
+    """Imports a shard of an Open Food Facts jsonl file in a worker process, with the worker's own ProductMapper and
+    the given settings of the DataImporter (mapping_workers, queue_size, chunk_size, product_cache...)
+    """
+    data_importer = DataImporter(product_mapper_factory(), **(importer_settings or {}))
+    return data_importer.import_jsonl_off_shard(
+        filename,
+        start,
+        end,
+        batch_size,
+        line_filter,
+        checkpoint,
+        watermark_filter,
+        sampler,
+        quarantine,
+    )
@@ -1,4 +1,6 @@
 import logging
+import math
+import time
 import concurrent.futures
 from pymongo import MongoClient, UpdateOne, ASCENDING
 from typing import List, Iterator
@@ -10,19 +12,23 @@ class DataLoader:
     This is a class that loads data into MongoDB.
 
     Methods:
-        load_products_to_mongo(products, db_name, collection_name, use_docker, batch_size, max_workers): Loads given products into the MongoDB database
+        load_products_to_mongo(products, db_name, collection_name, use_docker, batch_size, max_workers): Loads given products (or their
+        dictionaries) into the MongoDB database and returns the latency of the slowest bulk_write
     """
 
     @staticmethod
     def load_products_to_mongo(
-        products: List[Product] | Iterator[Product],
+        products: List[Product | dict] | Iterator[Product | dict],
         db_name: str = "openfoodfacts",
         collection_name: str = "products",
         use_docker: bool = True,
         batch_size: int = 5000,
         max_workers: int = 5,
-    ) -> None:
-        """Loads given products into the MongoDB database"""
+    ) -> float | None:
+        """Loads given products (Product objects or their dictionaries, as given by model_dump) into the MongoDB
+        database, split between the workers into bulk_writes of at most batch_size products. Returns the latency in
+        seconds of the slowest bulk_write, or None if nothing was written
+        """
         try:
             logging.info(
                 f"Loading products into MongoDB ({db_name}.{collection_name})..."
@@ -49,17 +55,19 @@ class DataLoader:
 
                 operations = {}
                 for product in batch:
-                    if not product.id_match:
+                    product_data = (
+                        product if isinstance(product, dict) else product.model_dump()
+                    )
+                    if not product_data["id_match"]:
                         continue
 
-                    product_data = product.model_dump()
-                    existing = operations.get(product.id_match)
+                    existing = operations.get(product_data["id_match"])
 
                     if (
                         not existing
-                        or product.publication_date > existing["modified_date"]
+                        or product_data["publication_date"] > existing["modified_date"]
                     ):
-                        operations[product.id_match] = product_data
+                        operations[product_data["id_match"]] = product_data
 
                 bulk_operations = [
                     UpdateOne(
@@ -68,29 +76,33 @@ class DataLoader:
                     for data in operations.values()
                 ]
 
-                if bulk_operations:
-                    batch_collection.bulk_write(bulk_operations, ordered=False)
-                batch_client.close()
-
-            batches = []
-            current_batch = []
-
-            for product in products:
-                current_batch.append(product)
-                if len(current_batch) >= batch_size:
-                    batches.append(current_batch)
-                    current_batch = []
-
-            if current_batch:
-                batches.append(current_batch)
+                try:
+                    if bulk_operations:
+                        start = time.perf_counter()
+                        batch_collection.bulk_write(bulk_operations, ordered=False)
+                        latencies.append(time.perf_counter() - start)
+                finally:
+                    batch_client.close()
+
+            products = list(products)
+            latencies = []
+            # Each worker gets its share of the products, so that the latency follows the number of products loaded
+            write_size = min(batch_size, max(1, math.ceil(len(products) / max_workers)))
+            batches = [
+                products[start : start + write_size]
+                for start in range(0, len(products), write_size)
+            ]
 
             with concurrent.futures.ThreadPoolExecutor(
                 max_workers=max_workers
             ) as executor:
-                executor.map(process_batch, batches)
+                # The results are read so that a failed bulk_write raises here, before the batch is recorded as loaded
+                for _ in executor.map(process_batch, batches):
+                    pass
 
             logging.info("Data loading complete")
             client.close()
+            return max(latencies, default=None)
         except Exception as e:
             logging.error(f"Error loading products in {db_name}.{collection_name}: {e}")
             raise
@@ -0,0 +1,91 @@
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timezone
+
+
+class DownloadManifest:
+    """
+    This is a class that keeps track of the downloaded source files in a json manifest.
+    Each entry is identified by the name of the downloaded file and stores:
+        - url: the url the file was downloaded from
+        - etag: the ETag sent by the server for the file
+        - last_modified: the Last-Modified date sent by the server for the file
+        - size: the size of the downloaded file in bytes
+        - sha256: the SHA-256 digest of the downloaded file
+        - downloaded_at: the date of the download
+        - imported: whether the downloaded file has been fully imported
+
+    Attributes:
+        manifest_file (str): The path to the json manifest
+
+    Methods:
+        get_entry(file_name): Returns the entry of the given downloaded file
+        update_entry(file_name, url, etag, last_modified, size, sha256): Records a new download of the given file
+        mark_imported(file_name): Records that the given downloaded file has been fully imported
+        is_imported(file_name): Indicates whether the given downloaded file has been fully imported since its last download
+    """
+
+    def __init__(self, manifest_file: str):
+        self.manifest_file = manifest_file
+        self.__lock = threading.Lock()
+
+    def get_entry(self, file_name: str) -> dict | None:
+        """Returns the entry of the given downloaded file, or None if the file is not in the manifest"""
+        with self.__lock:
+            return self.__read().get(file_name)
+
+    def update_entry(
+        self,
+        file_name: str,
+        url: str,
+        etag: str | None,
+        last_modified: str | None,
+        size: int,
+        sha256: str,
+    ) -> None:
+        """Records a new download of the given file, which is then considered as not imported"""
+        with self.__lock:
+            entries = self.__read()
+            entries[file_name] = {
+                "url": url,
+                "etag": etag,
+                "last_modified": last_modified,
+                "size": size,
+                "sha256": sha256,
+                "downloaded_at": datetime.now(timezone.utc).isoformat(),
+                "imported": False,
+            }
+            self.__write(entries)
+
+    def mark_imported(self, file_name: str) -> None:
+        """Records that the given downloaded file has been fully imported"""
+        with self.__lock:
+            entries = self.__read()
+            if file_name in entries:
+                entries[file_name]["imported"] = True
+                self.__write(entries)
+
+    def is_imported(self, file_name: str) -> bool:
+        """Returns True if the given downloaded file has been fully imported since its last download, False otherwise"""
+        entry = self.get_entry(file_name)
+        return entry is not None and entry.get("imported", False)
+
+    def __read(self) -> dict:
+        """Returns the entries of the manifest"""
+        if not os.path.exists(self.manifest_file):
+            return {}
+        try:
+            with open(self.manifest_file, "r", encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, json.JSONDecodeError) as e:
+            logging.warning(f"Could not read manifest {self.manifest_file}: {e}")
+            return {}
+
+    def __write(self, entries: dict) -> None:
+        """Atomically replaces the manifest with the given entries"""
+        temporary_file = self.manifest_file + ".tmp"
+        with open(temporary_file, "w", encoding="utf-8") as file:
+            json.dump(entries, file, indent=2)
+        os.replace(temporary_file, self.manifest_file)
@@ -0,0 +1,215 @@
+import logging
+from typing import BinaryIO, Iterator
+
+import ijson
+
+from domain.utils.ijson_backend import IjsonBackend
+
+CONTAINER_START_EVENTS = ("start_map", "start_array")
+CONTAINER_END_EVENTS = ("end_map", "end_array")
+
+
+class FdcRecordExtractor:
+    """
+    This is a class that extracts the branded food records of a Food Data Central json file from the events of the ijson
+    parser, only building the fields used by the product mapper. The other fields (foodAttributes, foodUpdateLog...)
+    are skipped without being built, each foodNutrients entry is reduced to its nutrient id, unit name and amount, and
+    the records of another market country are dropped as soon as their marketCountry is read.
+
+    Attributes:
+        fields (frozenset[str]): The names of the record fields to build
+        market_country (str | None): The market country of the records to keep, or None to keep every record
+        backend (module): The ijson backend generating the parsing events
+        records_read (int): The number of records read
+        records_skipped (int): The number of records skipped before the resume index or for their market country
+
+    Methods:
+        records(file, use_float, start): Yields the index and the projected record of each kept record of the file
+        log_counts(): Logs the number of records read and skipped
+    """
+
+    default_fields = frozenset(
+        {
+            "gtinUpc",
+            "fdcId",
+            "description",
+            "dataSource",
+            "modifiedDate",
+            "availableDate",
+            "publicationDate",
+            "packageWeight",
+            "householdServingFullText",
+            "brandedFoodCategory",
+            "brandName",
+            "brandOwner",
+            "ingredients",
+            "servingSize",
+            "servingSizeUnit",
+            "foodNutrients",
+            "labelNutrients",
+            "preparationStateCode",
+            "marketCountry",
+        }
+    )
+
+    def __init__(
+        self,
+        fields: frozenset[str] = default_fields,
+        market_country: str | None = "United States",
+        array_key: str = "BrandedFoods",
+        backend=None,
+    ):
+        self.fields = fields
+        self.market_country = market_country
+        self.backend = backend if backend is not None else IjsonBackend.get_backend()
+        self.records_read = 0
+        self.records_skipped = 0
+        self.__array_key = array_key
+
+    def records(
+        self, file: BinaryIO, use_float: bool = True, start: int = 0
+    ) -> Iterator[tuple[int, dict]]:
+        """Yields the index (in the array of records) and the projected record of each kept record of the given json
+        file opened in binary mode. The records before the start index are skipped without being built
+        """
+        events = self.backend.basic_parse(file, use_float=use_float)
+        if not self.__find_records_array(events):
+            return
+
+        index = 0
+        for event, _ in events:
+            if event == "end_array":
+                return
+            record = self.__read_record(events, index >= start)
+            self.records_read += 1
+            if record is None:
+                self.records_skipped += 1
+            else:
+                yield index, record
+            index += 1
+
+    def log_counts(self) -> None:
+        """Logs the number of records read and skipped"""
+        logging.info(
+            f"FDC records: {self.records_read} read, {self.records_skipped} skipped without being built"
+        )
+
+    def __find_records_array(self, events: Iterator[tuple]) -> bool:
+        """Consumes the events up to the start of the array of records at the top level of the file.
+        Returns False if the file has no such array"""
+        depth = 0
+        for event, value in events:
+            if event in CONTAINER_START_EVENTS:
+                depth += 1
+            elif event in CONTAINER_END_EVENTS:
+                depth -= 1
+            elif depth == 1 and event == "map_key" and value == self.__array_key:
+                event, _ = next(events)
+                if event == "start_array":
+                    return True
+                if event in CONTAINER_START_EVENTS:
+                    self.__skip_container(events)
+        return False
+
+    def __read_record(self, events: Iterator[tuple], build: bool) -> dict | None:
+        """Reads the events of a record up to its end. Returns the projected record, or None if it is not built"""
+        record = {}
+        for event, key in events:
+            if event == "end_map":
+                break
+            if not build or key not in self.fields:
+                self.__skip_value(events)
+            elif key == "foodNutrients":
+                record[key] = self.__read_food_nutrients(events)
+            else:
+                record[key] = self.__read_value(events)
+                if key == "marketCountry" and self.market_country is not None:
+                    build = record[key] == self.market_country
+
+        if not build or (
+            self.market_country is not None
+            and record.get("marketCountry") != self.market_country
+        ):
+            return None
+        return record
+
+    def __read_food_nutrients(self, events: Iterator[tuple]) -> list[dict] | None:
+        """Reads a foodNutrients array, reducing each entry to {"nutrient": {"id", "unitName"}, "amount"}"""
+        event, value = next(events)
+        if event != "start_array":
+            return self.__build_value(events, event, value)
+
+        food_nutrients = []
+        for event, _ in events:
+            if event == "end_array":
+                break
+            food_nutrient = {}
+            for event, key in events:
+                if event == "end_map":
+                    break
+                if key == "amount":
+                    food_nutrient[key] = self.__read_value(events)
+                elif key == "nutrient":
+                    food_nutrient[key] = self.__read_nutrient(events)
+                else:
+                    self.__skip_value(events)
+            food_nutrients.append(food_nutrient)
+        return food_nutrients
+
+    def __read_nutrient(self, events: Iterator[tuple]) -> dict | None:
+        """Reads the nutrient of a foodNutrients entry, only keeping its id and unit name"""
+        event, value = next(events)
+        if event != "start_map":
+            return self.__build_value(events, event, value)
+
+        nutrient = {}
+        for event, key in events:
+            if event == "end_map":
+                break
+            if key == "id" or key == "unitName":
+                nutrient[key] = self.__read_value(events)
+            else:
+                self.__skip_value(events)
+        return nutrient
+
+    def __read_value(self, events: Iterator[tuple]):
+        """Reads and builds the next value"""
+        event, value = next(events)
+        return self.__build_value(events, event, value)
+
+    @staticmethod
+    def __build_value(events: Iterator[tuple], event: str, value):
+        """Builds the value starting with the given event, reading the events of its content if it is a container"""
+        if event not in CONTAINER_START_EVENTS:
+            return value
+
+        builder = ijson.ObjectBuilder()
+        builder.event(event, value)
+        depth = 1
+        for event, value in events:
+            builder.event(event, value)
+            if event in CONTAINER_START_EVENTS:
+                depth += 1
+            elif event in CONTAINER_END_EVENTS:
+                depth -= 1
+                if depth == 0:
+                    break
+        return builder.value
+
+    def __skip_value(self, events: Iterator[tuple]) -> None:
+        """Skips the next value without building it"""
+        event, _ = next(events)
+        if event in CONTAINER_START_EVENTS:
+            self.__skip_container(events)
+
+    @staticmethod
+    def __skip_container(events: Iterator[tuple]) -> None:
+        """Skips the events of a container up to its end, its start event having been read"""
+        depth = 1
+        for event, _ in events:
+            if event in CONTAINER_START_EVENTS:
+                depth += 1
+            elif event in CONTAINER_END_EVENTS:
+                depth -= 1
+                if depth == 0:
+                    return
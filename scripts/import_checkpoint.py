@@ -0,0 +1,78 @@
+import glob
+import json
+import logging
+import os
+from datetime import datetime, timezone
+
+
+class ImportCheckpoint:
+    """
+    This is a class that records the progress of an import in a json file, so that an interrupted import can be resumed.
+    The checkpoint is written after each batch of products loaded into MongoDB and stores:
+        - source_version: the version (SHA-256 digest) of the imported source file
+        - position: the position following the last loaded item in the source file, which is a byte offset in the
+        decompressed jsonl file for Open Food Facts and an item index for Food Data Central
+        - batches: the number of batches of products loaded
+        - updated_at: the date of the checkpoint
+
+    Attributes:
+        checkpoint_file (str): The path to the json checkpoint
+        source_version (str | None): The version of the imported source file. A checkpoint recorded for another version
+        is ignored.
+
+    Methods:
+        load(): Returns the recorded checkpoint if it belongs to the current version of the source file
+        save(position, batches): Records the position following the last loaded item and the number of loaded batches
+        clear(): Removes the checkpoint and the checkpoints of its shards
+        for_shard(start, end): Returns the checkpoint of the shard of the source file between two byte offsets
+    """
+
+    def __init__(self, checkpoint_file: str, source_version: str = None):
+        self.checkpoint_file = checkpoint_file
+        self.source_version = source_version
+
+    def load(self) -> dict | None:
+        """Returns the recorded checkpoint, or None if there is none or if it was recorded for another version of the
+        source file"""
+        if not os.path.exists(self.checkpoint_file):
+            return None
+        try:
+            with open(self.checkpoint_file, "r", encoding="utf-8") as file:
+                checkpoint = json.load(file)
+        except (OSError, json.JSONDecodeError) as e:
+            logging.warning(f"Could not read checkpoint {self.checkpoint_file}: {e}")
+            return None
+
+        if checkpoint.get("source_version") != self.source_version:
+            logging.info(
+                f"Ignoring checkpoint {self.checkpoint_file}: the source file has changed since it was recorded"
+            )
+            return None
+        return checkpoint
+
+    def save(self, position: int, batches: int) -> None:
+        """Atomically records the position following the last loaded item and the number of loaded batches"""
+        checkpoint = {
+            "source_version": self.source_version,
+            "position": position,
+            "batches": batches,
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+        }
+        temporary_file = self.checkpoint_file + ".tmp"
+        with open(temporary_file, "w", encoding="utf-8") as file:
+            json.dump(checkpoint, file, indent=2)
+        os.replace(temporary_file, self.checkpoint_file)
+
+    def clear(self) -> None:
+        """Removes the checkpoint and the checkpoints of its shards"""
+        for file in [self.checkpoint_file] + glob.glob(
+            glob.escape(self.checkpoint_file) + ".shard-*"
+        ):
+            if os.path.exists(file):
+                os.remove(file)
+
+    def for_shard(self, start: int, end: int) -> "ImportCheckpoint":
+        """Returns the checkpoint of the shard of the source file between the given byte offsets"""
+        return ImportCheckpoint(
+            f"{self.checkpoint_file}.shard-{start}-{end}", self.source_version
+        )
@@ -0,0 +1,253 @@
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Iterable
+
+_END = object()
+
+
+class ImportPipeline:
+    """
+    This is a class that runs an import as a pipeline of three stages connected by bounded queues:
+    - a reader thread, which groups the read items into numbered chunks
+    - a pool of mapping threads, which map the chunks
+    - the loading stage, run by the calling thread, which loads the mapped chunks in the order of the read items
+    A full queue blocks the stage filling it, so a slow stage slows down the stages before it (backpressure) instead of
+    letting the read items pile up in memory.
+    The mapping is pure python code holding the GIL, so the mapping threads use a single core between them: the
+    pipeline overlaps the mapping with the I/O of the other stages (reading and decompressing the source file, waiting
+    for the MongoDB writes), and does not map faster than one thread. The imports are mapped on several cores by worker
+    processes (see DataImporter.import_jsonl_off_data_in_parallel), each one running its own pipeline.
+    scripts/benchmarks/import_pipeline_benchmark.py compares it with the single threaded loop.
+
+    Attributes:
+        map_chunk (Callable[[list], Any]): The function mapping a chunk of read items, called by the mapping threads
+        load_chunk (Callable[[Any], bool | None]): The function loading a mapped chunk, which returns False to stop the
+        import
+        mapping_workers (int): The number of mapping threads
+        queue_size (int): The maximum number of chunks waiting in each queue
+        chunk_size (int): The number of read items in each chunk
+        report_interval (float): The minimum number of seconds between two logs of the pipeline statistics
+        stats (dict): For each stage ("read", "map", "load"), the number of items processed, the seconds spent by its
+        threads waiting on the queues, and the seconds spent by its finished threads
+
+    Methods:
+        run(items): Runs the pipeline on the given items, until they are all loaded or the loading stage stops it
+        log_stats(): Logs the depth of the queues, and the throughput and busy time of each stage
+    """
+
+    def __init__(
+        self,
+        map_chunk: Callable[[list], Any],
+        load_chunk: Callable[[Any], bool | None],
+        mapping_workers: int = 2,
+        queue_size: int = 8,
+        chunk_size: int = 1000,
+        report_interval: float = 30.0,
+    ):
+        self.map_chunk = map_chunk
+        self.load_chunk = load_chunk
+        self.mapping_workers = max(1, mapping_workers)
+        self.queue_size = queue_size
+        self.chunk_size = chunk_size
+        self.report_interval = report_interval
+        self.stats = {}
+        self.__stats_lock = threading.Lock()
+        self.__stop = threading.Event()
+        self.__errors = []
+        self.__read_queue = None
+        self.__mapped_queue = None
+        self.__start_time = None
+
+    def run(self, items: Iterable) -> None:
+        """Runs the pipeline on the given items, until they are all loaded or the loading stage stops it.
+        An exception raised by any stage stops the pipeline and is raised again in the calling thread.
+        """
+        self.stats = {
+            stage: {"items": 0, "waiting": 0.0, "elapsed": 0.0}
+            for stage in ("read", "map", "load")
+        }
+        self.__stop.clear()
+        self.__errors = []
+        self.__read_queue = queue.Queue(self.queue_size)
+        self.__mapped_queue = queue.Queue(self.queue_size)
+        self.__start_time = time.perf_counter()
+
+        threads = [
+            threading.Thread(
+                target=self.__run_stage,
+                args=("read", self.__read, items),
+                name="import-reader",
+                daemon=True,
+            )
+        ] + [
+            threading.Thread(
+                target=self.__run_stage,
+                args=("map", self.__map),
+                name=f"import-mapper-{index}",
+                daemon=True,
+            )
+            for index in range(self.mapping_workers)
+        ]
+        for thread in threads:
+            thread.start()
+
+        start_time = time.perf_counter()
+        try:
+            self.__load()
+        finally:
+            self.__add_stats("load", elapsed=time.perf_counter() - start_time)
+            self.__stop.set()
+            for thread in threads:
+                thread.join()
+
+        if self.__errors:
+            raise self.__errors[0]
+        self.log_stats()
+
+    def log_stats(self) -> None:
+        """Logs the depth of the queues, and the throughput and busy time of each stage.
+        A stage that is busy most of the time while the others wait is the bottleneck of the import.
+        """
+        elapsed = time.perf_counter() - self.__start_time
+        threads_count = {"read": 1, "map": self.mapping_workers, "load": 1}
+
+        stages_report = []
+        for stage, stats in self.stats.items():
+            # The threads still running have spent the whole elapsed time in the stage
+            stage_elapsed = stats["elapsed"] or elapsed * threads_count[stage]
+            busy = 1 - stats["waiting"] / stage_elapsed if stage_elapsed > 0 else 0.0
+            throughput = stats["items"] / elapsed if elapsed > 0 else 0.0
+            stages_report.append(
+                f"{stage}: {stats['items']} items ({throughput:.0f}/s, busy {busy:.0%})"
+            )
+
+        logging.info(
+            f"Import pipeline after {elapsed:.0f}s - queues: read {self.__read_queue.qsize()}/{self.queue_size}, "
+            f"mapped {self.__mapped_queue.qsize()}/{self.queue_size} - "
+            + ", ".join(stages_report)
+        )
+
+    def __run_stage(self, stage: str, target: Callable, *args) -> None:
+        """Runs the target function of a stage in a thread, recording its elapsed time. An exception raised by the
+        thread stops the pipeline and is kept to be raised again in the calling thread
+        """
+        start_time = time.perf_counter()
+        try:
+            target(*args)
+        except BaseException as e:
+            self.__errors.append(e)
+            self.__stop.set()
+        finally:
+            self.__add_stats(stage, elapsed=time.perf_counter() - start_time)
+
+    def __read(self, items: Iterable) -> None:
+        """Groups the items into numbered chunks and puts them in the read queue, followed by an end marker for each
+        mapping thread"""
+        iterator = iter(items)
+        sequence = 0
+        chunk = []
+
+        try:
+            for item in iterator:
+                chunk.append(item)
+                if len(chunk) >= self.chunk_size:
+                    if not self.__put(self.__read_queue, (sequence, chunk), "read"):
+                        return
+                    self.__add_stats("read", items=len(chunk))
+                    sequence += 1
+                    chunk = []
+
+            if chunk:
+                if not self.__put(self.__read_queue, (sequence, chunk), "read"):
+                    return
+                self.__add_stats("read", items=len(chunk))
+            for _ in range(self.mapping_workers):
+                if not self.__put(self.__read_queue, _END, "read"):
+                    return
+        finally:
+            # A generator stopped before its end has to be closed by the thread iterating it
+            if hasattr(iterator, "close"):
+                iterator.close()
+
+    def __map(self) -> None:
+        """Maps the chunks of the read queue and puts them in the mapped queue, until getting an end marker"""
+        while True:
+            task = self.__get(self.__read_queue, "map")
+            if task is None:
+                return
+            if task is _END:
+                self.__put(self.__mapped_queue, _END, "map")
+                return
+
+            sequence, chunk = task
+            mapped_chunk = self.map_chunk(chunk)
+            self.__add_stats("map", items=len(chunk))
+            if not self.__put(
+                self.__mapped_queue, (sequence, len(chunk), mapped_chunk), "map"
+            ):
+                return
+
+    def __load(self) -> None:
+        """Loads the mapped chunks in the order of their numbers, until all the mapping threads have ended or a
+        chunk loading returns False"""
+        pending_chunks = {}
+        next_sequence = 0
+        ended_mappers = 0
+        last_report_time = time.perf_counter()
+
+        while ended_mappers < self.mapping_workers:
+            task = self.__get(self.__mapped_queue, "load")
+            if task is None:
+                return
+            if task is _END:
+                ended_mappers += 1
+                continue
+
+            sequence, size, mapped_chunk = task
+            pending_chunks[sequence] = (size, mapped_chunk)
+            while next_sequence in pending_chunks:
+                size, mapped_chunk = pending_chunks.pop(next_sequence)
+                next_sequence += 1
+                if self.load_chunk(mapped_chunk) is False:
+                    return
+                self.__add_stats("load", items=size)
+
+            if time.perf_counter() - last_report_time >= self.report_interval:
+                self.log_stats()
+                last_report_time = time.perf_counter()
+
+    def __put(self, target_queue: queue.Queue, item, stage: str) -> bool:
+        """Puts the item in the queue, waiting while it is full. Returns False if the pipeline is stopped meanwhile"""
+        start_time = time.perf_counter()
+        while not self.__stop.is_set():
+            try:
+                target_queue.put(item, timeout=0.1)
+            except queue.Full:
+                continue
+            self.__add_stats(stage, waiting=time.perf_counter() - start_time)
+            return True
+        return False
+
+    def __get(self, source_queue: queue.Queue, stage: str):
+        """Returns the next item of the queue, waiting while it is empty. Returns None if the pipeline is stopped
+        meanwhile"""
+        start_time = time.perf_counter()
+        while not self.__stop.is_set():
+            try:
+                item = source_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            self.__add_stats(stage, waiting=time.perf_counter() - start_time)
+            return item
+        return None
+
+    def __add_stats(
+        self, stage: str, items: int = 0, waiting: float = 0.0, elapsed: float = 0.0
+    ) -> None:
+        """Adds the given values to the statistics of a stage, shared by its threads"""
+        with self.__stats_lock:
+            self.stats[stage]["items"] += items
+            self.stats[stage]["waiting"] += waiting
+            self.stats[stage]["elapsed"] += elapsed
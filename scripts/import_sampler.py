@@ -0,0 +1,90 @@
+import hashlib
+import math
+
+
+class ImportSampler:
+    """
+    This is a class that selects a deterministic sample of the products of an import, to run the whole pipeline on a
+    small but representative slice of the sources. The sampling modes are:
+        - head: the first N products imported
+        - every: every k-th record read (after the byte-level filters of the import)
+        - hash: the share of the products whose barcode hash is below the given fraction. The barcodes are normalized
+        as in the id_match of the products and hashed with a seed, so that the Open Food Facts and Food Data Central
+        samples contain the same barcodes and still produce matches.
+
+    Attributes:
+        mode (str): The sampling mode (head, every or hash)
+        value (float): The number of products (head), the step (every) or the fraction of the barcodes (hash)
+        seed (int): The seed of the barcode hash
+
+    Methods:
+        parse(sample, seed): Creates a sampler from a "mode:value" string (e.g. "hash:0.01")
+        limit(): Returns the maximum number of products to import, if any
+        keeps_index(index): Returns True if the record at the given index of the read records is kept
+        keeps_barcode(barcode): Returns True if the product with the given barcode is kept
+        for_shards(shards): Returns the sampler of each shard of an import split into the given number of shards
+    """
+
+    modes = ("head", "every", "hash")
+
+    def __init__(self, mode: str, value: float, seed: int = 0):
+        if mode not in self.modes:
+            raise ValueError(
+                f"Unknown sampling mode {mode}, expected one of {', '.join(self.modes)}"
+            )
+        if mode == "hash" and not 0 < value <= 1:
+            raise ValueError(
+                f"The hash sampling fraction must be in ]0, 1], got {value}"
+            )
+        if mode != "hash" and (value < 1 or value != int(value)):
+            raise ValueError(
+                f"The {mode} sampling value must be a positive integer, got {value}"
+            )
+
+        self.mode = mode
+        self.value = value if mode == "hash" else int(value)
+        self.seed = seed
+        self.__threshold = int(value * 2**64) if mode == "hash" else None
+        self.__salt = f"{seed}:".encode("utf-8")
+
+    def __repr__(self) -> str:
+        return f"ImportSampler({self.mode}:{self.value}, seed={self.seed})"
+
+    @classmethod
+    def parse(cls, sample: str, seed: int = 0) -> "ImportSampler":
+        """Creates a sampler from a "mode:value" string, such as "head:10000", "every:100" or "hash:0.01" for 1% of the
+        barcodes"""
+        mode, separator, value = sample.partition(":")
+        if not separator:
+            raise ValueError(f"Invalid sample {sample}, expected mode:value")
+        return cls(mode.strip(), float(value), seed)
+
+    def limit(self) -> int | None:
+        """Returns the maximum number of products to import in head mode, None otherwise"""
+        return self.value if self.mode == "head" else None
+
+    def keeps_index(self, index: int) -> bool:
+        """Returns True if the record at the given index (from 0) of the read records is kept, i.e. in every mode but
+        every, in which case one record out of value is kept"""
+        return self.mode != "every" or index % self.value == 0
+
+    def keeps_barcode(self, barcode: str | None) -> bool:
+        """Returns True if the product with the given barcode is kept, i.e. in every mode but hash, in which case the
+        seeded hash of its normalized barcode must be below the fraction. Products without barcode are not kept by the
+        hash mode"""
+        if self.mode != "hash":
+            return True
+        if not barcode:
+            return False
+        normalized = "".join(str(barcode).split()).replace("-", "").lstrip("0")
+        digest = hashlib.blake2b(
+            self.__salt + normalized.encode("utf-8"), digest_size=8
+        ).digest()
+        return int.from_bytes(digest, "big") < self.__threshold
+
+    def for_shards(self, shards: int) -> "ImportSampler":
+        """Returns the sampler of each of the given number of shards of an import: in head mode, the products are
+        split between the shards, the other modes being applied to each shard as is"""
+        if self.mode != "head":
+            return self
+        return ImportSampler(self.mode, math.ceil(self.value / shards), self.seed)
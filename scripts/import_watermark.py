@@ -0,0 +1,61 @@
+import json
+import logging
+import os
+from datetime import datetime, timezone
+
+
+class ImportWatermark:
+    """
+    This is a class that keeps the high-water marks of the imported sources in a json file.
+    The watermark of a source is the highest modification timestamp of its products at the end of its last successful
+    import, so that the next import can skip the products not modified since.
+
+    Attributes:
+        watermark_file (str): The path to the json file of the watermarks
+
+    Methods:
+        get(source): Returns the watermark of the given source
+        save(source, watermark): Records the watermark of the given source
+        clear(source): Removes the watermark of the given source
+    """
+
+    def __init__(self, watermark_file: str):
+        self.watermark_file = watermark_file
+
+    def get(self, source: str) -> int | None:
+        """Returns the watermark of the given source, or None if it has never been imported"""
+        entry = self.__read().get(source)
+        return entry["watermark"] if entry is not None else None
+
+    def save(self, source: str, watermark: int) -> None:
+        """Records the watermark of the given source"""
+        entries = self.__read()
+        entries[source] = {
+            "watermark": watermark,
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+        }
+        self.__write(entries)
+
+    def clear(self, source: str) -> None:
+        """Removes the watermark of the given source, so that its next import is a full one"""
+        entries = self.__read()
+        if entries.pop(source, None) is not None:
+            self.__write(entries)
+
+    def __read(self) -> dict:
+        """Returns the watermarks of the file"""
+        if not os.path.exists(self.watermark_file):
+            return {}
+        try:
+            with open(self.watermark_file, "r", encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, json.JSONDecodeError) as e:
+            logging.warning(f"Could not read watermarks {self.watermark_file}: {e}")
+            return {}
+
+    def __write(self, entries: dict) -> None:
+        """Atomically replaces the file with the given watermarks"""
+        temporary_file = self.watermark_file + ".tmp"
+        with open(temporary_file, "w", encoding="utf-8") as file:
+            json.dump(entries, file, indent=2)
+        os.replace(temporary_file, self.watermark_file)
@@ -0,0 +1,61 @@
+import json
+import logging
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import simdjson
+except ImportError:
+    simdjson = None
+
+
+class JsonDecoder:
+    """
+    This is a class that decodes json documents with the fastest available library: orjson, then simdjson (pysimdjson),
+    then the standard json module.
+
+    Attributes:
+        name (str): The name of the library used to decode the documents
+        loads (Callable): The function of the library decoding a json document given as bytes (or str) into a Python object
+        decode_error (type): The type of the exceptions raised for invalid documents
+
+    Methods:
+        available_backends(): Returns the names of the installed libraries that can decode json documents
+    """
+
+    def __init__(self, backend: str = None):
+        """Creates a decoder using the given library ("orjson", "simdjson" or "json"), or the fastest installed one if
+        backend is None"""
+        available_backends = self.available_backends()
+        if backend is None:
+            backend = available_backends[0]
+        elif backend not in available_backends:
+            raise ValueError(
+                f"Unavailable json backend: {backend}. Available backends are {available_backends}."
+            )
+
+        self.name = backend
+        if backend == "orjson":
+            self.loads = orjson.loads
+            self.decode_error = orjson.JSONDecodeError
+        elif backend == "simdjson":
+            self.loads = simdjson.loads
+            self.decode_error = ValueError
+        else:
+            self.loads = json.loads
+            self.decode_error = json.JSONDecodeError
+        logging.debug(f"Decoding json documents with {backend}")
+
+    @staticmethod
+    def available_backends() -> list[str]:
+        """Returns the names of the installed libraries that can decode json documents, from the fastest to the slowest"""
+        backends = []
+        if orjson is not None:
+            backends.append("orjson")
+        if simdjson is not None:
+            backends.append("simdjson")
+        backends.append("json")
+        return backends
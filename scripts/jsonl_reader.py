@@ -0,0 +1,138 @@
+import gzip
+import logging
+import os
+import time
+from typing import Iterator
+
+
+class JsonlReader:
+    """
+    This is a class that reads the lines of a jsonl file, either plain or compressed with gzip.
+
+    Attributes:
+        decompressed_copy_file (str | None): The path where the decompressed lines are also written when reading a .gz file
+        bytes_read (int): The number of (decompressed) bytes read so far
+        lines_read (int): The number of lines read so far
+
+    Methods:
+        read_lines(filename, start, end): Yields the lines of the given jsonl file as bytes
+        get_throughput(): Returns the number of bytes read per second since the start of the reading
+        log_throughput(): Logs the amount of data read and the reading throughput
+        split_into_shards(filename, shards): Splits a plain jsonl file into byte ranges aligned on the beginning of lines
+    """
+
+    def __init__(self, decompressed_copy_file: str = None):
+        self.decompressed_copy_file = decompressed_copy_file
+        self.bytes_read = 0
+        self.lines_read = 0
+        self.__start_time = None
+        self.__filename = None
+
+    def read_lines(
+        self, filename: str, start: int = 0, end: int = None
+    ) -> Iterator[bytes]:
+        """Yields the lines of the given jsonl file as bytes, starting at the start byte offset, which is the offset of
+        the beginning of a line.
+        A file ending with .gz is decompressed on the fly, start being an offset in the decompressed data, and its
+        decompressed lines are also written to decompressed_copy_file if it is set and the file is read from its
+        beginning. The copy is only kept if the whole file is read.
+        For a plain file, only the lines between the start and end byte offsets are read
+        """
+        self.bytes_read = 0
+        self.lines_read = 0
+        self.__filename = filename
+        self.__start_time = time.perf_counter()
+
+        try:
+            if filename.endswith(".gz"):
+                yield from self.__read_gz_lines(filename, start)
+            else:
+                with open(filename, "rb") as file:
+                    if start > 0:
+                        file.seek(start)
+                    size = end - start if end is not None else None
+                    yield from self.__count_lines(file, size)
+        finally:
+            self.log_throughput()
+
+    def get_throughput(self) -> float:
+        """Returns the number of bytes read per second since the start of the reading"""
+        if self.__start_time is None:
+            return 0.0
+        elapsed = time.perf_counter() - self.__start_time
+        return self.bytes_read / elapsed if elapsed > 0 else 0.0
+
+    def log_throughput(self) -> None:
+        """Logs the amount of data read and the reading throughput"""
+        logging.info(
+            f"Read {self.lines_read} lines ({self.bytes_read / 1024 ** 2:.1f} MiB) from {self.__filename} "
+            f"at {self.get_throughput() / 1024 ** 2:.1f} MiB/s"
+        )
+
+    def __read_gz_lines(self, gz_file: str, start: int = 0) -> Iterator[bytes]:
+        """Yields the decompressed lines of a .gz file from the start offset in the decompressed data, writing them to
+        decompressed_copy_file if it is set and the file is read from its beginning. The lines are written to a .part
+        file, renamed to decompressed_copy_file once the whole file is read and removed if the reading stops before
+        (sample, limit, error), so that a truncated copy is never taken for the decompressed file
+        """
+        with gzip.open(gz_file, "rb") as file:
+            if start > 0:
+                # The data before the offset still has to be decompressed, but its lines are neither split nor parsed
+                file.seek(start)
+                if self.decompressed_copy_file is not None:
+                    logging.warning(
+                        f"Not writing {self.decompressed_copy_file}: {gz_file} is not read from its beginning"
+                    )
+            if self.decompressed_copy_file is None or start > 0:
+                yield from self.__count_lines(file)
+                return
+
+            logging.info(
+                f"Writing decompressed lines of {gz_file} into {self.decompressed_copy_file}..."
+            )
+            # A previous copy may be of another version of the file, it is replaced or removed
+            if os.path.exists(self.decompressed_copy_file):
+                os.remove(self.decompressed_copy_file)
+            part_file = f"{self.decompressed_copy_file}.part"
+            try:
+                with open(part_file, "wb") as copy:
+                    for line in self.__count_lines(file):
+                        copy.write(line)
+                        yield line
+            except BaseException:
+                # Also raised (GeneratorExit) when the lines are not all consumed
+                logging.warning(
+                    f"Not writing {self.decompressed_copy_file}: {gz_file} was not read entirely"
+                )
+                os.remove(part_file)
+                raise
+            os.replace(part_file, self.decompressed_copy_file)
+
+    def __count_lines(self, file, size: int = None) -> Iterator[bytes]:
+        """Yields the lines of an opened file while counting the lines and bytes read, until size bytes are read"""
+        for line in file:
+            if size is not None and self.bytes_read >= size:
+                return
+            self.bytes_read += len(line)
+            self.lines_read += 1
+            yield line
+
+    @staticmethod
+    def split_into_shards(filename: str, shards: int) -> list[tuple[int, int]]:
+        """Splits a plain jsonl file into at most the given number of byte ranges of similar sizes, aligned on the
+        beginning of lines. Returns the (start, end) offsets of each range"""
+        size = os.path.getsize(filename)
+        boundaries = [0]
+
+        with open(filename, "rb") as file:
+            for shard in range(1, shards):
+                file.seek(max(size * shard // shards, boundaries[-1]))
+                file.readline()
+                boundaries.append(min(file.tell(), size))
+        boundaries.append(size)
+
+        return [
+            (start, end)
+            for start, end in zip(boundaries, boundaries[1:])
+            if end > start
+        ]
@@ -0,0 +1,220 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Iterable
+
+from domain.product.product import Product
+
+
+class MappedProductCache:
+    """
+    This is a class that caches the products mapped from raw records in an SQLite file, so that the records unchanged
+    since a previous import are not mapped again. The products are stored as compressed json documents, keyed by the
+    blake2b digest of their raw record. The least recently used products are evicted beyond the maximum number of
+    entries, and the cache is emptied when the version of the mapping code changes.
+    The cache can be shared by the mapping threads of an import and sent to worker processes, each process opening its
+    own connection.
+
+    Attributes:
+        cache_file (str): The path to the SQLite file of the cache
+        max_entries (int): The maximum number of products kept after each eviction
+        version (str | None): The version of the mapping code. The products cached by another version are discarded.
+        hits (int): The number of lookups finding a cached product
+        misses (int): The number of lookups finding no cached product
+        evictions (int): The number of products evicted
+
+    Methods:
+        key_of(raw_record): Returns the key of a raw record
+        get_many(keys): Returns the cached documents of the given keys
+        put_many(products): Caches the given products with their keys
+        to_product(document): Returns the product of a cached document
+        evict(): Removes the least recently used products beyond the maximum number of entries
+        hit_rate(): Returns the share of lookups finding a cached product
+        log_stats(): Logs the hit rate, the number of entries and the number of evictions
+        close(): Closes the connection to the SQLite file
+        source_version(directories, files): Returns a version digest of the python files of the given directories and of
+        the given mapping input files
+    """
+
+    def __init__(self, cache_file: str, max_entries: int, version: str = None):
+        self.cache_file = cache_file
+        self.max_entries = max_entries
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.__lock = threading.Lock()
+        self.__connection = None
+
+    def __getstate__(self) -> dict:
+        """Sends the settings and not the connection to another process, which opens its own connection and keeps its
+        own statistics"""
+        state = self.__dict__.copy()
+        state.update(hits=0, misses=0, evictions=0)
+        state["_MappedProductCache__lock"] = None
+        state["_MappedProductCache__connection"] = None
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.__lock = threading.Lock()
+
+    @staticmethod
+    def key_of(raw_record: bytes) -> bytes:
+        """Returns the key of a raw record, i.e. the 16 bytes blake2b digest of its bytes"""
+        return hashlib.blake2b(raw_record, digest_size=16).digest()
+
+    def get_many(self, keys: list[bytes]) -> dict[bytes, bytes]:
+        """Returns the cached documents of the given keys, marking them as recently used"""
+        if not keys:
+            return {}
+        with self.__lock:
+            connection = self.__connect()
+            documents = {}
+            # Stays below the default limit of 999 variables of an SQLite query
+            for start in range(0, len(keys), 500):
+                sub_keys = keys[start : start + 500]
+                documents.update(
+                    connection.execute(
+                        "SELECT key, document FROM products WHERE key IN "
+                        f"({', '.join('?' * len(sub_keys))})",
+                        sub_keys,
+                    ).fetchall()
+                )
+            if documents:
+                now = time.time()
+                connection.executemany(
+                    "UPDATE products SET last_used = ? WHERE key = ?",
+                    [(now, key) for key in documents],
+                )
+                connection.commit()
+            self.hits += len(documents)
+            self.misses += len(keys) - len(documents)
+        return documents
+
+    def put_many(self, products: Iterable[tuple[bytes, Product]]) -> None:
+        """Caches the given products with the keys of their raw records"""
+        now = time.time()
+        rows = [
+            (key, zlib.compress(product.model_dump_json().encode("utf-8"), 1), now)
+            for key, product in products
+            if product is not None
+        ]
+        if not rows:
+            return
+        with self.__lock:
+            connection = self.__connect()
+            connection.executemany(
+                "INSERT OR REPLACE INTO products (key, document, last_used) VALUES (?, ?, ?)",
+                rows,
+            )
+            connection.commit()
+
+    @staticmethod
+    def to_product(document: bytes) -> Product:
+        """Returns the product of a cached document"""
+        return Product.model_validate_json(zlib.decompress(document))
+
+    def evict(self) -> None:
+        """Removes the least recently used products beyond the maximum number of entries"""
+        with self.__lock:
+            connection = self.__connect()
+            (entries,) = connection.execute("SELECT COUNT(*) FROM products").fetchone()
+            if entries <= self.max_entries:
+                return
+            connection.execute(
+                "DELETE FROM products WHERE key IN "
+                "(SELECT key FROM products ORDER BY last_used LIMIT ?)",
+                (entries - self.max_entries,),
+            )
+            connection.commit()
+            self.evictions += entries - self.max_entries
+
+    def hit_rate(self) -> float:
+        """Returns the share of lookups finding a cached product (0 if there was no lookup)"""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def log_stats(self) -> None:
+        """Logs the hit rate, the number of entries and the number of evictions"""
+        with self.__lock:
+            (entries,) = (
+                self.__connect().execute("SELECT COUNT(*) FROM products").fetchone()
+            )
+        logging.info(
+            f"Mapped product cache: {self.hits} hits, {self.misses} misses ({self.hit_rate():.1%} hit rate), "
+            f"{entries} entries, {self.evictions} evicted"
+        )
+
+    def close(self) -> None:
+        """Closes the connection to the SQLite file"""
+        with self.__lock:
+            if self.__connection is not None:
+                self.__connection.close()
+                self.__connection = None
+
+    @staticmethod
+    def source_version(directories: list[str], files: list[str] = ()) -> str:
+        """Returns a digest of the python files of the given directories and of the given files, changing with the
+        mapping code and with the other inputs of the mapping (the category files...)"""
+        digest = hashlib.blake2b(digest_size=16)
+        for directory in directories:
+            for root, dirs, names in os.walk(directory):
+                dirs.sort()
+                for name in sorted(names):
+                    if name.endswith(".py"):
+                        MappedProductCache.__digest_file(
+                            digest, name, os.path.join(root, name)
+                        )
+        for path in files:
+            MappedProductCache.__digest_file(digest, os.path.basename(path), path)
+        return digest.hexdigest()
+
+    @staticmethod
+    def __digest_file(digest, name: str, path: str) -> None:
+        """Adds the name and the content of the given file to the digest"""
+        digest.update(name.encode("utf-8"))
+        with open(path, "rb") as file:
+            digest.update(file.read())
+
+    def __connect(self) -> sqlite3.Connection:
+        """Returns the connection to the SQLite file, opening it and creating the tables on the first call.
+        The products of another version of the mapping code are removed"""
+        if self.__connection is not None:
+            return self.__connection
+
+        connection = sqlite3.connect(
+            self.cache_file, timeout=60, check_same_thread=False
+        )
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS products "
+            "(key BLOB PRIMARY KEY, document BLOB NOT NULL, last_used REAL NOT NULL)"
+        )
+        connection.execute(
+            "CREATE INDEX IF NOT EXISTS products_last_used ON products (last_used)"
+        )
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS metadata (name TEXT PRIMARY KEY, value TEXT)"
+        )
+        row = connection.execute(
+            "SELECT value FROM metadata WHERE name = 'version'"
+        ).fetchone()
+        if row is None or row[0] != self.version:
+            if row is not None:
+                logging.info(
+                    f"Emptying mapped product cache {self.cache_file}: the mapping code has changed"
+                )
+            connection.execute("DELETE FROM products")
+            connection.execute(
+                "INSERT OR REPLACE INTO metadata (name, value) VALUES ('version', ?)",
+                (self.version,),
+            )
+        connection.commit()
+        self.__connection = connection
+        return connection
@@ -0,0 +1,58 @@
+import logging
+
+
+class OffLineFilter:
+    """
+    This is a class that filters Open Food Facts jsonl lines on a value of a tags field (e.g. "en:canada" in
+    countries_tags). The raw bytes of each line are scanned for the quoted value before decoding it, so most of the
+    other lines are rejected without being decoded, and the decoded object of the remaining lines confirms the match.
+
+    Attributes:
+        field (str): The name of the tags field containing the wanted value
+        value (str): The wanted value
+        lines_scanned (int): The number of lines scanned for the value
+        pre_rejected (int): The number of lines rejected before being decoded
+        confirmed (int): The number of decoded objects containing the value in the field
+
+    Methods:
+        might_match(line): Returns True if the raw line contains the quoted value, so that it has to be decoded
+        matches(obj): Returns True if the value is in the field of the decoded object
+        record_confirmed(count): Adds the given number of decoded objects confirmed to contain the value
+        log_counts(): Logs the number of lines scanned, pre-rejected and confirmed
+    """
+
+    def __init__(self, value: str, field: str = "countries_tags"):
+        self.field = field
+        self.value = value
+        self.lines_scanned = 0
+        self.pre_rejected = 0
+        self.confirmed = 0
+        self.__quoted_value = f'"{value}"'.encode("utf-8")
+
+    def might_match(self, line: bytes) -> bool:
+        """Returns True if the raw line contains the quoted value. A line without it cannot match and is counted as
+        pre-rejected"""
+        self.lines_scanned += 1
+        if self.__quoted_value in line:
+            return True
+        self.pre_rejected += 1
+        return False
+
+    def matches(self, obj: dict) -> bool:
+        """Returns True if the value is in the field of the decoded object (either a list of tags or a string).
+        It does not update the counters, so that it can be called by several threads"""
+        tags = obj.get(self.field)
+        if tags is None:
+            return False
+        return self.value in tags if isinstance(tags, list) else tags == self.value
+
+    def record_confirmed(self, count: int) -> None:
+        """Adds the given number of decoded objects confirmed to contain the value"""
+        self.confirmed += count
+
+    def log_counts(self) -> None:
+        """Logs the number of lines scanned, pre-rejected and confirmed"""
+        logging.info(
+            f"Filter {self.field} = {self.value}: {self.lines_scanned} lines scanned, "
+            f"{self.pre_rejected} pre-rejected, {self.confirmed} confirmed"
+        )
@@ -0,0 +1,91 @@
+import logging
+import re
+
+# The digits of a value followed by the end of the value, i.e. an integer (not 1632675242.5)
+LAST_MODIFIED_PATTERN = re.compile(rb'"last_modified_t"\s*:\s*(\d+)(\s*[,}])?')
+# The bytes deleted from a line to find the depth of a position: all but the quotes and the brackets
+NON_STRUCTURAL_BYTES = bytes(byte for byte in range(256) if byte not in b'"[]{}')
+
+
+class OffWatermarkFilter:
+    """
+    This is a class that filters out the Open Food Facts jsonl lines of the products not modified since a previous
+    import, i.e. whose last_modified_t is at or below the watermark (the highest last_modified_t of that import).
+    With the byte scan, the raw bytes of each line are searched for its last_modified_t values, so that most unchanged
+    lines are skipped without being decoded. Only lines where every value found is an integer at or below the
+    watermark, one of them being the top-level value, are skipped: a nested last_modified_t can neither hide a newer
+    product nor stand for a missing top-level value. The decoded object of the other lines confirms that the product
+    is newer.
+
+    Attributes:
+        watermark (int): The highest last_modified_t of the previous import
+        byte_scan (bool): Whether the raw lines are scanned before being decoded
+        lines_scanned (int): The number of raw lines scanned
+        pre_skipped (int): The number of lines skipped before being decoded
+
+    Methods:
+        might_be_newer(line): Returns False if the raw line is known to be unchanged since the watermark
+        is_newer(obj): Returns True if the decoded object was modified after the watermark
+        log_counts(skipped, remapped): Logs the number of products skipped and re-mapped
+    """
+
+    def __init__(self, watermark: int, byte_scan: bool = True):
+        self.watermark = watermark
+        self.byte_scan = byte_scan
+        self.lines_scanned = 0
+        self.pre_skipped = 0
+
+    def might_be_newer(self, line: bytes) -> bool:
+        """Returns False if every last_modified_t value found in the raw line is an integer at or below the watermark
+        and one of them is the top-level value, in which case the line is counted as pre-skipped. Returns True if the
+        line has to be decoded
+        """
+        if not self.byte_scan:
+            return True
+
+        self.lines_scanned += 1
+        positions = []
+        for match in LAST_MODIFIED_PATTERN.finditer(line):
+            if match.group(2) is None or int(match.group(1)) > self.watermark:
+                return True
+            positions.append(match.start())
+
+        if any(self.__depth(line, position) == 1 for position in positions):
+            self.pre_skipped += 1
+            return False
+        return True
+
+    @staticmethod
+    def __depth(line: bytes, position: int) -> int | None:
+        """Returns the number of objects and arrays of the raw line open at the given position (1 for the top-level
+        keys), or None if it cannot be found without decoding the line (escaped quotes before the position).
+        The brackets are counted without the ones between quotes, found by the parity of the quotes before them: only
+        the quotes and brackets are kept, then the pairs of adjacent quotes, which do not change that parity, are
+        removed"""
+        prefix = line[:position]
+        if b'\\"' in prefix:
+            return None
+        structure = prefix.translate(None, NON_STRUCTURAL_BYTES).replace(b'""', b"")
+        if b'"' in structure:
+            # Some strings contain brackets, the ones between an odd and an even quote are removed
+            structure = b"".join(structure.split(b'"')[0::2])
+        return (
+            structure.count(b"{")
+            + structure.count(b"[")
+            - structure.count(b"}")
+            - structure.count(b"]")
+        )
+
+    def is_newer(self, obj: dict) -> bool:
+        """Returns True if the decoded object was modified after the watermark, or if its modification date is unknown.
+        It does not update the counters, so that it can be called by several threads"""
+        last_modified = obj.get("last_modified_t")
+        return not isinstance(last_modified, int) or last_modified > self.watermark
+
+    def log_counts(self, skipped_after_decoding: int, remapped: int) -> None:
+        """Logs the number of products skipped (before or after decoding their line) and re-mapped"""
+        logging.info(
+            f"Watermark last_modified_t = {self.watermark}: {self.pre_skipped + skipped_after_decoding} unchanged "
+            f"products skipped ({self.pre_skipped} before decoding, {skipped_after_decoding} after), "
+            f"{remapped} products re-mapped"
+        )
@@ -0,0 +1,44 @@
+import os
+
+from domain.mapper.category_mapper import CategoryMapper
+from domain.mapper.ingredients_mapper import IngredientsMapper
+from domain.mapper.number_mapper import NumberMapper
+from domain.mapper.nutriscore_data_mapper import NutriscoreDataMapper
+from domain.mapper.nutrition_facts_mapper import NutritionFactsMapper
+from domain.mapper.product_mapper import ProductMapper
+from domain.utils.category_creator import CategoryCreator
+from domain.utils.ingredient_normalizer import IngredientNormalizer
+from scripts.config import Config
+
+
+class ProductMapperFactory:
+    """
+    This is a class that creates the ProductMapper used by the imports.
+
+    Methods:
+        create_product_mapper(): Creates a ProductMapper using the source files given in the config
+    """
+
+    @staticmethod
+    def create_product_mapper() -> ProductMapper:
+        """Creates a ProductMapper with its categories read from the source files given in the config, building the
+        product models in the construction mode (trusted or validated) given in the config.
+        It can be called in a worker process to build the mapper of the process."""
+        config = Config()
+        parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+        categories_taxonomy_file = os.path.join(
+            parent_dir, config.categories_taxonomy_file
+        )
+        category_mapping_file = os.path.join(parent_dir, config.category_mapping_file)
+
+        return ProductMapper(
+            IngredientsMapper(IngredientNormalizer(config.ingredient_cache_size)),
+            NutriscoreDataMapper(NumberMapper()),
+            NutritionFactsMapper(),
+            CategoryMapper(
+                CategoryCreator(), categories_taxonomy_file, category_mapping_file
+            ),
+            validation_sample=config.trusted_product_validation_sample,
+            trusted_construction=config.trusted_product_construction,
+        )
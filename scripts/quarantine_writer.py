@@ -0,0 +1,131 @@
+import glob
+import gzip
+import json
+import logging
+import os
+import threading
+
+
+class QuarantineWriter:
+    """
+    This is a class that sets aside the records of an import which cannot be decoded or mapped, so that the import
+    continues without them. Each bad record is appended to a gzip compressed jsonl file with:
+        - reason: the class of the error
+        - error: the message of the error, truncated
+        - position: the byte offset of the Open Food Facts line, or the index of the Food Data Central record
+        - record: the raw line or the decoded record
+    The records are counted per reason, and only the first error of each reason is logged, so that the size of the log
+    stays bounded on dirty dumps. The writer can be used by the mapping threads of an import.
+    The records are kept in memory and appended to the file by flush_size, each flush being written at once as a
+    complete gzip member: an import stopped by a crash leaves a readable file, to which its resumed import appends.
+
+    Attributes:
+        quarantine_file (str): The path to the gzip compressed jsonl file of the bad records
+        counts (dict[str, int]): The number of bad records per reason
+
+    Methods:
+        write(error, position, record): Appends a bad record with the error raised by its decoding or its mapping
+        flush(): Appends the bad records kept in memory to the file, as a gzip member
+        total(): Returns the number of bad records
+        log_counts(): Logs the number of bad records per reason
+        close(): Appends the bad records kept in memory to the file
+        clear(): Removes the file and the files of its shards
+        for_shard(start, end): Returns the writer of the shard of the source file between two byte offsets
+    """
+
+    max_error_length = 500
+    flush_size = 1000
+
+    def __init__(self, quarantine_file: str):
+        self.quarantine_file = quarantine_file
+        self.counts = {}
+        self.__lock = threading.Lock()
+        self.__pending_lines = []
+
+    def __getstate__(self) -> dict:
+        """Sends the path and not the records kept in memory to another process, which keeps its own records"""
+        state = self.__dict__.copy()
+        state["counts"] = {}
+        state["_QuarantineWriter__lock"] = None
+        state["_QuarantineWriter__pending_lines"] = []
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.__lock = threading.Lock()
+
+    def write(self, error: Exception, position: int, record: bytes | dict) -> None:
+        """Appends a bad record with the error raised by its decoding or its mapping. The raw lines are written as text
+        and the decoded records as json objects"""
+        reason = type(error).__name__
+        entry = {
+            "reason": reason,
+            "error": str(error)[: self.max_error_length],
+            "position": position,
+            "record": (
+                record.decode("utf-8", errors="replace").rstrip("\n")
+                if isinstance(record, bytes)
+                else record
+            ),
+        }
+        line = json.dumps(entry, ensure_ascii=False, default=str) + "\n"
+
+        with self.__lock:
+            self.__pending_lines.append(line)
+            if len(self.__pending_lines) >= self.flush_size:
+                self.__flush_pending_lines()
+            self.counts[reason] = self.counts.get(reason, 0) + 1
+            first_of_reason = self.counts[reason] == 1
+
+        if first_of_reason:
+            logging.warning(
+                f"Quarantining record at position {position} ({reason}: {entry['error']}), "
+                f"the next records with this error are only counted"
+            )
+
+    def total(self) -> int:
+        """Returns the number of bad records"""
+        return sum(self.counts.values())
+
+    def log_counts(self) -> None:
+        """Logs the number of bad records per reason"""
+        if not self.counts:
+            return
+        reasons = ", ".join(
+            f"{reason}: {count}" for reason, count in sorted(self.counts.items())
+        )
+        logging.info(
+            f"{self.total()} records quarantined in {self.quarantine_file} ({reasons})"
+        )
+
+    def flush(self) -> None:
+        """Appends the bad records kept in memory to the file, as a gzip member"""
+        with self.__lock:
+            self.__flush_pending_lines()
+
+    def close(self) -> None:
+        """Appends the bad records kept in memory to the file"""
+        self.flush()
+
+    def clear(self) -> None:
+        """Removes the file and the files of its shards"""
+        self.close()
+        for file in [self.quarantine_file] + glob.glob(
+            glob.escape(self.quarantine_file) + ".shard-*"
+        ):
+            if os.path.exists(file):
+                os.remove(file)
+
+    def for_shard(self, start: int, end: int) -> "QuarantineWriter":
+        """Returns the writer of the shard of the source file between the given byte offsets, writing its own file"""
+        return QuarantineWriter(f"{self.quarantine_file}.shard-{start}-{end}")
+
+    def __flush_pending_lines(self) -> None:
+        """Appends the lines kept in memory to the file as a gzip member compressed beforehand, written at once, so
+        that the file never ends with an unfinished member. Called with the lock held"""
+        if not self.__pending_lines:
+            return
+        member = gzip.compress("".join(self.__pending_lines).encode("utf-8"))
+        with open(self.quarantine_file, "ab") as file:
+            file.write(member)
+        self.__pending_lines = []
@@ -6,7 +6,12 @@ from domain.utils.ingredient_normalizer import IngredientNormalizer
 
 @pytest.fixture
 def ingredient_normalizer():
-    return MagicMock(spec=IngredientNormalizer)
+    ingredient_normalizer = MagicMock(spec=IngredientNormalizer)
+    ingredient_normalizer.normalise_ingredients.side_effect = lambda text: (
+        (text or "").title(),
+        [],
+    )
+    return ingredient_normalizer
 
 
 @pytest.fixture
@@ -36,8 +41,10 @@ def test_should_return_ingredients_list_from_ingredients_normalizer_in_ingredien
 ):
     ingredients = "FLOUR, SUGAR, PEANUTS."
     ingredients_list = ["Flour", "sugar", "Peanuts"]
-    ingredients_mapper.ingredient_normalizer.normalise_ingredients_list.return_value = (
-        ingredients_list
+    ingredients_mapper.ingredient_normalizer.normalise_ingredients.side_effect = None
+    ingredients_mapper.ingredient_normalizer.normalise_ingredients.return_value = (
+        ingredients.title(),
+        ingredients_list,
     )
 
     result = ingredients_mapper.map_fdc_dict_to_ingredients(ingredients)
@@ -54,7 +61,7 @@ def test_should_correctly_call_ingredients_normalizer_for_given_fdc_dict(
 
     ingredients_mapper.map_fdc_dict_to_ingredients(ingredients)
 
-    ingredients_mapper.ingredient_normalizer.normalise_ingredients_list.assert_called_with(
+    ingredients_mapper.ingredient_normalizer.normalise_ingredients.assert_called_with(
         ingredients
     )
 
@@ -81,8 +88,10 @@ def test_should_return_ingredients_list_from_ingredients_normalizer_in_ingredien
 ):
     off_dict = {"ingredients_text": "FLOUR, SUGAR, PEANUTS."}
     ingredients_list = ["Flour", "sugar", "Peanuts"]
-    ingredients_mapper.ingredient_normalizer.normalise_ingredients_list.return_value = (
-        ingredients_list
+    ingredients_mapper.ingredient_normalizer.normalise_ingredients.side_effect = None
+    ingredients_mapper.ingredient_normalizer.normalise_ingredients.return_value = (
+        off_dict["ingredients_text"].title(),
+        ingredients_list,
     )
 
     result = ingredients_mapper.map_off_dict_to_ingredients(off_dict)
@@ -99,6 +108,31 @@ def test_should_correctly_call_ingredients_normalizer_for_given_off_dict(
 
     ingredients_mapper.map_off_dict_to_ingredients(off_dict)
 
-    ingredients_mapper.ingredient_normalizer.normalise_ingredients_list.assert_called_with(
+    ingredients_mapper.ingredient_normalizer.normalise_ingredients.assert_called_with(
         off_dict["ingredients_text"]
     )
+
+
+def test_should_return_no_ingredients_text_for_off_dict_without_ingredients_text(
+    ingredients_mapper,
+):
+    result = ingredients_mapper.map_off_dict_to_ingredients({})
+
+    assert result.ingredients_text is None
+    assert result.ingredients_list == []
+
+
+def test_should_share_the_normalizer_cache_entry_between_text_and_list():
+    ingredient_normalizer = IngredientNormalizer()
+    ingredients_mapper = IngredientsMapper(ingredient_normalizer)
+
+    fdc_result = ingredients_mapper.map_fdc_dict_to_ingredients(
+        "FLOUR, SUGAR, PEANUTS."
+    )
+    off_result = ingredients_mapper.map_off_dict_to_ingredients(
+        {"ingredients_text": "FLOUR, SUGAR, PEANUTS."}
+    )
+
+    assert fdc_result.ingredients_text == "Flour, Sugar, Peanuts."
+    assert off_result.ingredients_list == ["Flour", "Sugar", "Peanuts"]
+    assert (ingredient_normalizer.misses, ingredient_normalizer.hits) == (1, 1)
@@ -5,6 +5,7 @@ import pytest
 from domain.mapper.number_mapper import NumberMapper
 from domain.mapper.nutriscore_data_mapper import NutriscoreDataMapper
 from domain.utils.converter import Converter
+from domain.utils.nutrient_matrix import NutrientMatrix
 
 
 @pytest.fixture
@@ -263,3 +264,31 @@ def test_should_return_empty_is_beverage_field_in_nutriscore_data_for_given_off_
     assert (
         result.is_beverage is None
     ), f"Expected is beverage field to be {None}, got {result.is_beverage}"
+
+
+# ----------------------------------------------------------------
+# Tests map_off_dicts_to_nutriscore_data
+# ----------------------------------------------------------------
+
+
+def test_should_map_off_dicts_with_nutrient_matrix_as_each_off_dict(
+    off_valid_dict, off_invalid_dict
+):
+    nutriscore_data_mapper = NutriscoreDataMapper(NumberMapper())
+    off_dicts = [off_valid_dict, off_invalid_dict, {}]
+    nutriments = NutrientMatrix(len(off_dicts))
+
+    nutriscore_data_mapper.fill_off_nutriments(nutriments, off_dicts)
+    nutriscore_data = nutriscore_data_mapper.map_off_dicts_to_nutriscore_data(
+        off_dicts, nutriments
+    )
+    documents = nutriscore_data_mapper.map_off_dicts_to_nutriscore_data(
+        off_dicts, nutriments, as_dicts=True
+    )
+
+    expected = [
+        nutriscore_data_mapper.map_off_dict_to_nutriscore_data(product_dict)
+        for product_dict in off_dicts
+    ]
+    assert nutriscore_data == expected
+    assert documents == [data.model_dump() for data in expected]
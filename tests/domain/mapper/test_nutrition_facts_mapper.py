@@ -1,8 +1,8 @@
 from unittest.mock import patch
 
+import numpy as np
 import pytest
 
-from domain.mapper.nutrient_amount_mapper import NutrientAmountMapper
 from domain.mapper.nutrition_facts_mapper import NutritionFactsMapper
 from domain.product.complexFields.nutrition_facts import NutritionFacts
 from domain.product.complexFields.nutritionFactsPerHundredGrams import (
@@ -11,6 +11,8 @@ from domain.product.complexFields.nutritionFactsPerHundredGrams import (
 from domain.product.complexFields.nutritionFactsPerServing import (
     NutritionFactsPerServing,
 )
+from domain.utils.nutrient_matrix import NutrientMatrix
+from domain.utils.unit_converter import UnitConverter
 
 
 @pytest.fixture
@@ -77,7 +79,7 @@ def test_should_return_mapped_nutrient_level_values_in_nutrition_facts_for_fdc_d
     _, fdc_dict_100g, fdc_dict_serving = fdc_dict
     product_preparation_state_code = "PREPARED"
 
-    with patch.object(NutrientAmountMapper, "map_nutrient", return_value=25):
+    with patch.object(UnitConverter, "to_grams", return_value=25):
         result = nutrition_facts_mapper.map_fdc_dict_to_nutrition_facts(
             fdc_dict_100g, fdc_dict_serving, product_preparation_state_code
         )
@@ -95,6 +97,21 @@ def test_should_return_mapped_nutrient_level_values_in_nutrition_facts_for_fdc_d
     assert result.nutrition_facts_per_serving.fibers_serving == 25
 
 
+def test_should_return_salt_value_for_float_sodium_amount_in_nutrition_facts_for_fdc_dict(
+    nutrition_facts_mapper, fdc_dict
+):
+    fdc_ids, _, fdc_dict_serving = fdc_dict
+    fdc_dict_100g = [
+        {"nutrient": {"id": fdc_ids["sodium"], "unitName": "MG"}, "amount": 40.0}
+    ]
+
+    result = nutrition_facts_mapper.map_fdc_dict_to_nutrition_facts(
+        fdc_dict_100g, fdc_dict_serving, "PREPARED"
+    )
+
+    assert result.nutrition_facts_per_hundred_grams.salt_100g == pytest.approx(0.1)
+
+
 def test_should_return_correct_energy_values_for_nutrients_in_nutrition_facts_for_fdc_dict(
     nutrition_facts_mapper, fdc_dict
 ):
@@ -181,3 +198,65 @@ def test_should_return_correct_nutrition_facts_for_given_off_dict(
     assert (
         result == expected_nutrition_facts
     ), f"Expected {expected_nutrition_facts}, got {result}"
+
+
+# ----------------------------------------------------------------
+# Tests fill_off_nutriments and map_nutrient_matrix_to_nutrition_facts
+# ----------------------------------------------------------------
+
+
+def test_should_fill_nutrient_matrix_with_off_nutriments(
+    nutrition_facts_mapper, off_dict
+):
+    nutriments = NutrientMatrix(3)
+
+    nutrition_facts_mapper.fill_off_nutriments(
+        nutriments, [off_dict, {"nutriments": {"fat_serving": "1.5"}}, {}]
+    )
+
+    saturated_fats = nutriments.column(
+        "nutrition_facts.nutrition_facts_per_hundred_grams.saturated_fats_100g"
+    )
+    fat_serving = nutriments.column(
+        "nutrition_facts.nutrition_facts_per_serving.fat_serving"
+    )
+    assert NutrientMatrix.to_python(saturated_fats) == [63.78, None, None]
+    assert NutrientMatrix.to_python(fat_serving) == [None, 1.5, None]
+    assert np.isnan(nutriments.values[2]).all()
+
+
+@pytest.mark.parametrize(
+    "value, error", [(None, TypeError), ("", ValueError), ("abc", ValueError)]
+)
+def test_should_raise_error_for_invalid_off_nutriment(
+    nutrition_facts_mapper, value, error
+):
+    with pytest.raises(error):
+        nutrition_facts_mapper.fill_off_nutriments(
+            NutrientMatrix(2),
+            [{"nutriments": {"fat_100g": 1}}, {"nutriments": {"fat_100g": value}}],
+        )
+
+
+def test_should_map_nutrient_matrix_as_each_off_dict(nutrition_facts_mapper, off_dict):
+    off_dicts = [
+        off_dict,
+        {"nutriments": {"energy_serving": 5, "energy-kcal_serving": "2"}},
+        {},
+    ]
+    nutriments = NutrientMatrix(len(off_dicts))
+    nutrition_facts_mapper.fill_off_nutriments(nutriments, off_dicts)
+
+    nutrition_facts = nutrition_facts_mapper.map_nutrient_matrix_to_nutrition_facts(
+        nutriments
+    )
+    documents = nutrition_facts_mapper.map_nutrient_matrix_to_nutrition_facts(
+        nutriments, as_dicts=True
+    )
+
+    expected = [
+        nutrition_facts_mapper.map_off_dict_to_nutrition_facts(product_dict)
+        for product_dict in off_dicts
+    ]
+    assert nutrition_facts == expected
+    assert documents == [facts.model_dump() for facts in expected]
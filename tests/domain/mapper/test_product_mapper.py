@@ -8,14 +8,17 @@ from domain.mapper.food_groups_mapper import FoodGroupsMapper
 from domain.mapper.ingredients_mapper import IngredientsMapper
 from domain.mapper.category_mapper import CategoryMapper
 from domain.mapper.nova_data_mapper import NovaDataMapper
+from domain.mapper.number_mapper import NumberMapper
 from domain.mapper.nutriscore_data_mapper import NutriscoreDataMapper
 from domain.mapper.nutrition_facts_mapper import NutritionFactsMapper
 from domain.mapper.product_mapper import ProductMapper
+from domain.product.complexFields.complex_field import ComplexField
 from domain.product.complexFields.ingredients import Ingredients
 from domain.product.complexFields.nova_data import NovaData
 from domain.product.complexFields.nutrition_facts import NutritionFacts
 from domain.product.complexFields.score.ecoscore_data import EcoscoreData
 from domain.product.complexFields.score.nutriscore_data import NutriscoreData
+from domain.utils.ingredient_normalizer import IngredientNormalizer
 from domain.validator.nova_data_validator import NovaDataValidator
 from domain.validator.product_validator import ProductValidator
 
@@ -700,3 +703,153 @@ def test_should_return_mapped_nova_data_field_in_product_for_given_off_dict(
     assert (
         result.nova_data == mock_off_dict_functions["nova_data"]
     ), f"Expected nova data field to be {mock_off_dict_functions['nova_data']}, got {result.nova_data}"
+
+
+@pytest.fixture
+def trusted_construction(product_mapper):
+    product_mapper.trusted_construction = True
+
+
+@pytest.fixture
+def mock_off_models(product_mapper):
+    product_mapper.ingredients_mapper.map_off_dict_to_ingredients.return_value = (
+        Ingredients()
+    )
+    product_mapper.nutriscore_data_mapper.map_off_dict_to_nutriscore_data.return_value = NutriscoreData(
+        proteins_100g=8.5
+    )
+    product_mapper.nutrition_facts_mapper.map_off_dict_to_nutrition_facts.return_value = (
+        NutritionFacts()
+    )
+
+
+def test_should_map_same_product_for_off_dict_in_trusted_construction(
+    product_mapper, off_dict, mock_off_models
+):
+    validated = product_mapper.map_off_dict_to_product(off_dict)
+    product_mapper.trusted_construction = True
+    trusted = product_mapper.map_off_dict_to_product(off_dict)
+
+    assert trusted.model_dump() == validated.model_dump()
+    assert not ComplexField.is_trusted_construction()
+
+
+def test_should_keep_sampled_product_matching_its_validation(
+    product_mapper, off_dict, mock_off_models, trusted_construction
+):
+    product_mapper.validation_sample = 1
+
+    product = product_mapper.map_off_dict_to_product(off_dict)
+
+    assert product.serving_size == 70.0
+    assert product_mapper.validation_mismatches == 0
+
+
+def test_should_replace_sampled_product_differing_from_its_validation(
+    product_mapper, off_dict, mock_off_models, trusted_construction
+):
+    product_mapper.validation_sample = 2
+    product_mapper.nutriscore_data_mapper.map_off_dict_to_nutriscore_data.return_value = NutriscoreData.trusted(
+        proteins_100g="8.5"
+    )
+
+    first = product_mapper.map_off_dict_to_product(off_dict)
+    second = product_mapper.map_off_dict_to_product(off_dict)
+
+    assert first.nutriscore_data.proteins_100g == "8.5"
+    assert second.nutriscore_data.proteins_100g == 8.5
+    assert product_mapper.validation_mismatches == 1
+
+
+@pytest.fixture
+def batch_product_mapper(category_mapper):
+    return ProductMapper(
+        IngredientsMapper(IngredientNormalizer()),
+        NutriscoreDataMapper(NumberMapper()),
+        NutritionFactsMapper(),
+        category_mapper,
+    )
+
+
+@pytest.fixture
+def off_dicts(off_dict, off_empty_strings_dict):
+    return [
+        dict(
+            off_dict,
+            nutriscore_grade="b",
+            ingredients_text="sugar, cocoa (cocoa butter)",
+            nutriments={"fat_100g": "1.5", "sodium_100g": 0.2, "fat_serving": 3},
+        ),
+        off_empty_strings_dict,
+        # Values with more than the 6 significant digits of a float32
+        dict(
+            off_dict,
+            nutriments={
+                "fat_100g": 1234.5678,
+                "sodium_100g": 0.0123456789,
+                "proteins_100g": 16777217,
+                "sugars_100g": 1e40,
+                "fiber_100g": 1e-50,
+                "saturated-fat_100g": "12.3456789",
+            },
+        ),
+        # NaN nutriments, missing values in both paths
+        dict(
+            off_dict,
+            nutriments={
+                "fat_100g": float("nan"),
+                "sodium_100g": "nan",
+                "fiber_100g": "NaN",
+                "fat_serving": 3,
+            },
+        ),
+    ]
+
+
+@pytest.mark.parametrize("trusted", [False, True])
+def test_should_map_off_dicts_as_each_off_dict(
+    batch_product_mapper, off_dicts, trusted
+):
+    batch_product_mapper.trusted_construction = trusted
+
+    products = batch_product_mapper.map_off_dicts_to_products(off_dicts)
+    documents = batch_product_mapper.map_off_dicts_to_products(off_dicts, as_dicts=True)
+
+    expected = [
+        batch_product_mapper.map_off_dict_to_product(product_dict)
+        for product_dict in off_dicts
+    ]
+    assert [product.model_dump() for product in products] == [
+        product.model_dump() for product in expected
+    ]
+    assert documents == [product.model_dump() for product in expected]
+
+
+def test_should_map_nan_off_nutriments_to_none_in_each_path(
+    batch_product_mapper, off_dicts
+):
+    nan_dict = off_dicts[-1]
+
+    product = batch_product_mapper.map_off_dict_to_product(nan_dict)
+    (document,) = batch_product_mapper.map_off_dicts_to_products(
+        [nan_dict], as_dicts=True
+    )
+
+    for nutrition_facts_per_hundred_grams in (
+        product.nutrition_facts.nutrition_facts_per_hundred_grams.model_dump(),
+        document["nutrition_facts"]["nutrition_facts_per_hundred_grams"],
+    ):
+        assert nutrition_facts_per_hundred_grams["fat_100g"] is None
+        assert nutrition_facts_per_hundred_grams["sodium_100g"] is None
+    assert product.nutriscore_data.sodium_100g is None
+    assert product.nutriscore_data.fibers_100g is None
+    assert document["nutriscore_data"]["fibers_100g"] is None
+
+
+def test_should_raise_error_of_invalid_off_dict_in_batch(
+    batch_product_mapper, off_dicts
+):
+    off_dicts[1]["nutriments"] = {"proteins_100g": "abc"}
+
+    with pytest.raises(ValueError):
+        batch_product_mapper.map_off_dicts_to_products(off_dicts)
@@ -0,0 +1,102 @@
+import datetime
+import threading
+
+import pytest
+
+from domain.product.complexFields.complex_field import ComplexField
+from domain.product.complexFields.nutrition_facts import NutritionFacts
+from domain.product.complexFields.nutritionFactsPerHundredGrams import (
+    NutritionFactsPerHundredGrams,
+)
+from domain.product.complexFields.score.nutriscore_data import NutriscoreData
+from domain.product.product import Product
+
+
+@pytest.fixture
+def product_values():
+    return {
+        "id_match": "455612222",
+        "product_name": "granola",
+        "modified_date": datetime.datetime(2020, 4, 26),
+        "brands": ["michele's"],
+        "serving_size": 28.0,
+        "nutrition_facts": NutritionFacts.trusted(
+            nutrition_facts_per_hundred_grams=NutritionFactsPerHundredGrams.trusted(
+                energy_100g=1500.0, proteins_100g=8.5
+            )
+        ),
+    }
+
+
+@pytest.fixture
+def trusted_construction():
+    with ComplexField.construction_mode(True):
+        yield
+
+
+def test_should_build_trusted_product_equal_to_validated_product(product_values):
+    validated = Product(**product_values)
+    trusted = Product.trusted(**dict(product_values))
+
+    assert trusted.model_dump() == validated.model_dump()
+    assert trusted.model_fields_set == validated.model_fields_set
+    assert trusted == validated
+
+
+def test_should_turn_empty_strings_into_none_for_trusted_string_fields():
+    product = Product.trusted(product_name="", quantity="70 g")
+
+    assert product.product_name is None
+    assert product.quantity == "70 g"
+
+
+def test_should_not_share_mutable_defaults_between_trusted_products():
+    first = Product.trusted()
+    second = Product.trusted()
+    first.brands.append("brand")
+    first.nutriscore_data.proteins_100g = 10.0
+
+    assert second.brands == []
+    assert second.nutriscore_data == NutriscoreData()
+
+
+def test_should_validate_with_build_without_trusted_construction():
+    product = Product.build(serving_size="28")
+
+    assert product.serving_size == 28.0
+
+
+def test_should_not_validate_with_build_in_trusted_construction(
+    trusted_construction,
+):
+    product = Product.build(serving_size="28")
+
+    assert product.serving_size == "28"
+
+
+def test_should_ignore_unknown_fields_in_trusted_construction():
+    product = Product.trusted(id_match="123", unknown_field=1.0)
+
+    assert "unknown_field" not in product.__dict__
+    assert product.model_fields_set == {"id_match"}
+
+
+def test_should_restore_construction_mode_when_leaving_its_context():
+    with ComplexField.construction_mode(True):
+        with ComplexField.construction_mode(False):
+            assert not ComplexField.is_trusted_construction()
+        assert ComplexField.is_trusted_construction()
+
+    assert not ComplexField.is_trusted_construction()
+
+
+def test_should_set_construction_mode_of_current_thread_only(trusted_construction):
+    other_thread_modes = []
+    thread = threading.Thread(
+        target=lambda: other_thread_modes.append(ComplexField.is_trusted_construction())
+    )
+    thread.start()
+    thread.join()
+
+    assert ComplexField.is_trusted_construction()
+    assert other_thread_modes == [False]
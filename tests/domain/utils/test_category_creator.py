@@ -178,14 +178,16 @@ def test_should_keep_all_correctly_formatted_parent_tags_for_each_term(
 
 
 def test_should_return_mapping_with_correctly_formatted_existing_off_categories_in_values_for_fdc_to_off_mapping_content(
-    category_creator, fdc_mapping_content
+    category_creator, fdc_mapping_content, tmp_path
 ):
     content_to_read, off_categories, existing_categories, _ = fdc_mapping_content
 
-    with patch("builtins.open", mock_open(read_data=content_to_read)):
-        result = category_creator.create_fdc_to_off_categories_mapping(
-            "mock_categories_mapping_content.txt", off_categories
-        )
+    mapping_file = tmp_path / "mock_categories_mapping_content.json"
+    mapping_file.write_text(content_to_read, encoding="utf-8")
+
+    result = category_creator.create_fdc_to_off_categories_mapping(
+        str(mapping_file), off_categories
+    )
 
     expected_present_categories = [
         cat.strip().lower().replace("en: ", "en:").replace(" ", "-", 1)
@@ -196,14 +198,16 @@ def test_should_return_mapping_with_correctly_formatted_existing_off_categories_
 
 
 def test_should_return_mapping_with_removed_absent_off_categories_for_fdc_to_off_mapping_content(
-    category_creator, fdc_mapping_content
+    category_creator, fdc_mapping_content, tmp_path
 ):
     content_to_read, off_categories, _, absent_categories = fdc_mapping_content
 
-    with patch("builtins.open", mock_open(read_data=content_to_read)):
-        result = category_creator.create_fdc_to_off_categories_mapping(
-            "mock_categories_mapping_content.txt", off_categories
-        )
+    mapping_file = tmp_path / "mock_categories_mapping_content.json"
+    mapping_file.write_text(content_to_read, encoding="utf-8")
+
+    result = category_creator.create_fdc_to_off_categories_mapping(
+        str(mapping_file), off_categories
+    )
 
     expected_absent_categories = [
         cat.strip().lower().replace("en: ", "en:", 1).replace(" ", "-")
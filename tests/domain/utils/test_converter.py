@@ -21,3 +21,24 @@ def test_should_convert_to_float_for_float():
 
 def test_should_return_none_for_non_float():
     assert Converter.safe_float("abc") is None
+
+
+def test_should_convert_to_optional_float_for_number_or_numeric_string():
+    assert Converter.optional_float("70") == 70.0
+    assert Converter.optional_float(28) == 28.0
+
+
+def test_should_return_none_as_optional_float_for_none_or_empty_string():
+    assert Converter.optional_float(None) is None
+    assert Converter.optional_float("") is None
+
+
+def test_should_raise_value_error_as_optional_float_for_non_float():
+    with pytest.raises(ValueError):
+        Converter.optional_float("abc")
+
+
+def test_should_return_none_for_nan():
+    assert Converter.none_if_nan(float("nan")) is None
+    assert Converter.none_if_nan(1.5) == 1.5
+    assert Converter.none_if_nan(None) is None
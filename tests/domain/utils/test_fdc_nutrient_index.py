@@ -0,0 +1,55 @@
+from domain.utils.fdc_nutrient_index import FdcNutrientIndex
+
+
+def food_nutrient(nutrient_id: int, amount, unit_name: str = "G") -> dict:
+    return {"nutrient": {"id": nutrient_id, "unitName": unit_name}, "amount": amount}
+
+
+def test_should_return_first_amount_and_unit_of_nutrient():
+    index = FdcNutrientIndex(
+        [food_nutrient(1004, 12.5, "G"), food_nutrient(1004, 3.0, "MG")]
+    )
+
+    assert index.amount(1004) == 12.5
+    assert index.unit(1004) == "G"
+
+
+def test_should_return_first_amount_of_at_most_100_per_100g():
+    index = FdcNutrientIndex(
+        [
+            food_nutrient(1008, 450, "KCAL"),
+            food_nutrient(1008, 100, "KJ"),
+            food_nutrient(1008, 50),
+        ]
+    )
+
+    assert index.amount(1008) == 450
+    assert index.amount_per_100g(1008) == 100
+    assert index.unit(1008) == "KCAL"
+
+
+def test_should_return_none_for_missing_nutrient():
+    index = FdcNutrientIndex([food_nutrient(1004, 120)])
+
+    assert index.amount(1003) is None
+    assert index.amount_per_100g(1003) is None
+    assert index.unit(1003) is None
+    assert index.amount_per_100g(1004) is None
+
+
+def test_should_ignore_missing_amounts_per_100g():
+    index = FdcNutrientIndex([food_nutrient(1004, None), food_nutrient(1004, 5)])
+
+    assert index.amount(1004) is None
+    assert index.amount_per_100g(1004) == 5
+
+
+def test_should_index_missing_food_nutrients_as_empty():
+    assert FdcNutrientIndex(None).entries == {}
+
+
+def test_should_reuse_given_index():
+    index = FdcNutrientIndex([food_nutrient(1004, 1)])
+
+    assert FdcNutrientIndex.of(index) is index
+    assert FdcNutrientIndex.of([food_nutrient(1004, 1)]).entries == index.entries
@@ -0,0 +1,30 @@
+import io
+
+from domain.utils.ijson_backend import IjsonBackend
+
+
+def test_should_return_same_backend_on_each_call():
+    assert IjsonBackend.get_backend() is IjsonBackend.get_backend()
+
+
+def test_should_select_one_of_preferred_backends():
+    assert IjsonBackend.get_backend().backend_name in IjsonBackend.preferred_backends
+
+
+def test_should_parse_numbers_as_floats_when_use_float_is_set():
+    file = io.BytesIO(b'{"foodNutrients": [{"amount": 1.5}, {"amount": 2}]}')
+
+    amounts = list(
+        IjsonBackend.get_backend().items(
+            file, "foodNutrients.item.amount", use_float=True
+        )
+    )
+
+    assert amounts == [1.5, 2]
+    assert isinstance(amounts[0], float)
+
+
+def test_should_build_objects_natively_only_with_native_backends():
+    assert IjsonBackend.builds_objects_natively() == (
+        IjsonBackend.get_backend().backend_name in IjsonBackend.native_backends
+    )
@@ -0,0 +1,33 @@
+from domain.utils.ingredient_node import IngredientNode
+
+
+def test_should_return_name_before_brackets():
+    node = IngredientNode("Salt (Iodized)", (IngredientNode("Iodized"),))
+
+    assert node.name == "Salt"
+
+
+def test_should_return_text_as_name_without_brackets():
+    assert IngredientNode("Sea Salt").name == "Sea Salt"
+
+
+def test_should_return_text_as_name_when_starting_with_bracket():
+    assert IngredientNode("(Salt)").name == "(Salt)"
+
+
+def test_should_compare_nodes_with_their_children():
+    assert IngredientNode("Salt (Iodized)", (IngredientNode("Iodized"),)) == (
+        IngredientNode("Salt (Iodized)", (IngredientNode("Iodized"),))
+    )
+    assert IngredientNode("Salt (Iodized)") != IngredientNode(
+        "Salt (Iodized)", (IngredientNode("Iodized"),)
+    )
+
+
+def test_should_return_node_and_children_as_dictionaries():
+    node = IngredientNode("Salt (Iodized)", (IngredientNode("Iodized"),))
+
+    assert node.to_dict() == {
+        "name": "Salt",
+        "children": [{"name": "Iodized", "children": []}],
+    }
@@ -95,3 +95,150 @@ def test_should_return_empty_list_for_empty_string(ingredient_normalizer):
     )
 
     assert ingredients_list == []
+
+
+def test_should_return_ingredients_text_in_title_format_with_ingredients_list(
+    ingredient_normalizer,
+):
+    ingredients_text, ingredients_list = ingredient_normalizer.normalise_ingredients(
+        "salt (IODIZED), sugar."
+    )
+
+    assert ingredients_text == "Salt (Iodized), Sugar."
+    assert ingredients_list == ["Salt (Iodized)", "Sugar"]
+
+
+def test_should_return_empty_text_and_list_for_missing_text(ingredient_normalizer):
+    assert ingredient_normalizer.normalise_ingredients(None) == ("", [])
+
+
+def test_should_count_cache_hits_and_misses(ingredient_normalizer):
+    ingredient_normalizer.normalise_ingredients_list("Salt, Sugar")
+    ingredient_normalizer.normalise_ingredients_list("Salt, Sugar")
+    ingredient_normalizer.normalise_ingredients_list("Water")
+
+    assert ingredient_normalizer.hits == 1
+    assert ingredient_normalizer.misses == 2
+
+
+def test_should_return_a_new_list_for_each_cache_hit(ingredient_normalizer):
+    first_list = ingredient_normalizer.normalise_ingredients_list("Salt, Sugar")
+    first_list.append("Water")
+
+    second_list = ingredient_normalizer.normalise_ingredients_list("Salt, Sugar")
+
+    assert second_list == ["Salt", "Sugar"]
+
+
+def test_should_evict_least_recently_used_texts_beyond_cache_size():
+    ingredient_normalizer = IngredientNormalizer(cache_size=1)
+
+    ingredient_normalizer.normalise_ingredients_list("Salt")
+    ingredient_normalizer.normalise_ingredients_list("Sugar")
+    ingredient_normalizer.normalise_ingredients_list("Salt")
+
+    assert (ingredient_normalizer.hits, ingredient_normalizer.misses) == (0, 3)
+
+
+def test_should_keep_nested_brackets_in_their_ingredient(ingredient_normalizer):
+    ingredients_text = "Chocolate (Sugar, Cocoa (Beans), Milk), Salt"
+
+    ingredients_list = ingredient_normalizer.normalise_ingredients_list(
+        ingredients_text
+    )
+
+    assert ingredients_list == ["Chocolate (Sugar, Cocoa (Beans), Milk)", "Salt"]
+
+
+def test_should_keep_text_after_brackets_in_their_ingredient(ingredient_normalizer):
+    ingredients_text = "Mixed Tocopherols (Vitamin E) To Maintain Freshness, Salt"
+
+    ingredients_list = ingredient_normalizer.normalise_ingredients_list(
+        ingredients_text
+    )
+
+    assert ingredients_list == [
+        "Mixed Tocopherols (Vitamin E) To Maintain Freshness",
+        "Salt",
+    ]
+
+
+def test_should_not_split_decimal_numbers(ingredient_normalizer):
+    ingredients_text = "Water, 1.5% Olive Oil. Salt."
+
+    ingredients_list = ingredient_normalizer.normalise_ingredients_list(
+        ingredients_text
+    )
+
+    assert ingredients_list == ["Water", "1.5% Olive Oil", "Salt"]
+
+
+def test_should_remove_contains_prefix_without_colon(ingredient_normalizer):
+    ingredients_text = "Pork, Contains 2% Or Less Of Dextrose, Salt"
+
+    ingredients_list = ingredient_normalizer.normalise_ingredients_list(
+        ingredients_text
+    )
+
+    assert ingredients_list == ["Pork", "Dextrose", "Salt"]
+
+
+def test_should_only_remove_prefix_of_colon_of_same_level(ingredient_normalizer):
+    ingredients_text = "Ingredients: Salt (Contains: Iodine), Sugar"
+
+    ingredients_list = ingredient_normalizer.normalise_ingredients_list(
+        ingredients_text
+    )
+
+    assert ingredients_list == ["Salt (Contains: Iodine)", "Sugar"]
+
+
+def test_should_close_brackets_left_open(ingredient_normalizer):
+    ingredients_text = "Salt (Iodized, Sugar"
+
+    ingredients_list = ingredient_normalizer.normalise_ingredients_list(
+        ingredients_text
+    )
+
+    assert ingredients_list == ["Salt (Iodized, Sugar)"]
+
+
+def test_should_split_on_closing_brackets_without_opening_bracket(
+    ingredient_normalizer,
+):
+    ingredients_text = "Salt), Sugar"
+
+    ingredients_list = ingredient_normalizer.normalise_ingredients_list(
+        ingredients_text
+    )
+
+    assert ingredients_list == ["Salt", "Sugar"]
+
+
+def test_should_return_sub_ingredient_tree(ingredient_normalizer):
+    ingredients_text = "ENRICHED FLOUR [WHEAT FLOUR, NIACIN (VITAMIN B3)], SUGAR."
+
+    ingredients_tree = ingredient_normalizer.ingredients_tree(ingredients_text)
+
+    assert [ingredient.to_dict() for ingredient in ingredients_tree] == [
+        {
+            "name": "Enriched Flour",
+            "children": [
+                {"name": "Wheat Flour", "children": []},
+                {
+                    "name": "Niacin",
+                    "children": [{"name": "Vitamin B3", "children": []}],
+                },
+            ],
+        },
+        {"name": "Sugar", "children": []},
+    ]
+
+
+def test_should_remove_repeated_sub_ingredients_of_same_level(ingredient_normalizer):
+    ingredients_text = "Sauce (Salt, Water, Salt), Salt"
+
+    sauce, salt = ingredient_normalizer.ingredients_tree(ingredients_text)
+
+    assert [child.text for child in sauce.children] == ["Salt", "Water"]
+    assert salt.text == "Salt"
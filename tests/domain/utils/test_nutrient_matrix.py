@@ -0,0 +1,110 @@
+import numpy as np
+import pytest
+
+from domain.product.complexFields.nutritionFactsPerHundredGrams import (
+    NutritionFactsPerHundredGrams,
+)
+from domain.product.complexFields.nutrition_facts import NutritionFacts
+from domain.product.complexFields.score.nutriscore_data import NutriscoreData
+from domain.product.product import Product
+from domain.utils.nutrient_matrix import NutrientMatrix
+
+FAT_100G = "nutrition_facts.nutrition_facts_per_hundred_grams.fat_100g"
+SODIUM_100G = "nutrition_facts.nutrition_facts_per_hundred_grams.sodium_100g"
+SALT_100G = "nutrition_facts.nutrition_facts_per_hundred_grams.salt_100g"
+NUTRISCORE_PROTEINS = "nutriscore_data.proteins_100g"
+
+
+@pytest.fixture
+def product():
+    return Product(
+        id_match="123",
+        nutrition_facts=NutritionFacts(
+            nutrition_facts_per_hundred_grams=NutritionFactsPerHundredGrams(
+                fat_100g=63.78, sodium_100g=0.4
+            )
+        ),
+        nutriscore_data=NutriscoreData(proteins_100g=8.5, score=2),
+    )
+
+
+def test_should_register_float_fields_of_nutrient_models_as_columns():
+    assert FAT_100G in NutrientMatrix.columns
+    assert NUTRISCORE_PROTEINS in NutrientMatrix.columns
+    assert "nutriscore_data.score" not in NutrientMatrix.columns
+    assert NutrientMatrix.index(FAT_100G) == NutrientMatrix.columns.index(FAT_100G)
+
+
+def test_should_raise_value_error_for_unknown_column():
+    with pytest.raises(ValueError):
+        NutrientMatrix.index("nutriscore_data.unknown")
+
+
+def test_should_store_float32_with_nan_for_missing_values():
+    nutriments = NutrientMatrix(2)
+    nutriments.fill([FAT_100G], [[1.5], [None]])
+
+    assert nutriments.values.dtype == np.float32
+    assert nutriments.values.shape == (2, len(NutrientMatrix.columns))
+    assert nutriments.is_valid(0, FAT_100G)
+    assert not nutriments.is_valid(1, FAT_100G)
+
+
+@pytest.mark.parametrize("value", [63.78, 0.000123, 1234.56, 0.1, 0.0, -2.25])
+def test_should_read_float32_values_back_as_given(value):
+    nutriments = NutrientMatrix(1)
+    nutriments.fill([FAT_100G], [[value]])
+
+    assert NutrientMatrix.to_python(nutriments.column(FAT_100G)) == [value]
+    assert nutriments.to_float64([FAT_100G])[0, 0] == value
+
+
+def test_should_set_validity_bits_of_present_values():
+    nutriments = NutrientMatrix(2)
+    nutriments.fill([FAT_100G], [[1.0], [None]])
+    index = NutrientMatrix.index(FAT_100G)
+
+    validity = nutriments.validity
+
+    assert validity.dtype == np.uint8
+    assert validity[0, index // 8] >> (index % 8) & 1 == 1
+    assert validity[1, index // 8] >> (index % 8) & 1 == 0
+    assert validity[1].sum() == 0
+
+
+def test_should_derive_only_missing_values_of_column():
+    nutriments = NutrientMatrix(3)
+    nutriments.fill([SODIUM_100G, SALT_100G], [[0.4, None], [0.4, 3.0], [None, None]])
+
+    nutriments.derive(SALT_100G, SODIUM_100G, 2.5)
+
+    assert NutrientMatrix.to_python(nutriments.column(SALT_100G)) == [1.0, 3.0, None]
+
+
+def test_should_read_matrix_of_products_and_product_dicts(product):
+    nutriments = NutrientMatrix.from_products(
+        [product, product.model_dump(), Product(nutrition_facts=None)]
+    )
+
+    assert NutrientMatrix.to_python(nutriments.column(FAT_100G)) == [
+        63.78,
+        63.78,
+        None,
+    ]
+    assert NutrientMatrix.to_python(nutriments.column(NUTRISCORE_PROTEINS)) == [
+        8.5,
+        8.5,
+        None,
+    ]
+
+
+def test_should_return_section_dicts_as_model_dump(product):
+    nutriments = NutrientMatrix.from_products([product])
+
+    section_dicts = nutriments.section_dicts(
+        "nutrition_facts.nutrition_facts_per_hundred_grams"
+    )
+
+    assert section_dicts == [
+        product.nutrition_facts.nutrition_facts_per_hundred_grams.model_dump()
+    ]
@@ -0,0 +1,67 @@
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from domain.utils.unit_converter import UnitConverter
+
+
+def convert_with_decimals(value, unit: str):
+    """The former Decimal conversion of the NutrientAmountMapper, pinning the outputs of the UnitConverter"""
+    unit = unit.strip().lower()
+    if unit == "g":
+        return float(value)
+    if unit == "iu":
+        return float(Decimal(value) * Decimal("0.3") / Decimal("1000000"))
+    divisors = {"mcg": 1000000, "mg": 1000, "cg": 100, "dg": 10}
+    return float(Decimal(value) / divisors[unit]) if unit in divisors else None
+
+
+UNITS = ["g", "G", "mg", "MG", " mg ", "mcg", "MCG", "cg", "dg", "iu", "IU"]
+AMOUNTS = [0, 0.1, 1, 12.5, 40.0, 99.99, 123.456, 2500]
+
+
+@pytest.mark.parametrize("unit", UNITS)
+@pytest.mark.parametrize("amount", AMOUNTS)
+def test_should_convert_amount_as_decimal_conversion(amount, unit):
+    assert UnitConverter.to_grams(amount, unit) == pytest.approx(
+        convert_with_decimals(amount, unit), rel=1e-15
+    )
+
+
+@pytest.mark.parametrize("unit", ["ug", "UG", "kcal", "kJ", "other", ""])
+def test_should_not_convert_other_units(unit):
+    assert UnitConverter.to_grams(10, unit) is None
+    assert UnitConverter.unit_code(unit) == -1
+
+
+@pytest.mark.parametrize("amount, unit", [(None, "g"), (10, None)])
+def test_should_not_convert_missing_amount_or_unit(amount, unit):
+    assert UnitConverter.to_grams(amount, unit) is None
+
+
+def test_should_convert_decimal_and_string_amounts():
+    assert UnitConverter.to_grams(Decimal("45"), "mg") == 0.045
+    assert UnitConverter.to_grams("45", "g") == 45.0
+
+
+def test_should_convert_batch_of_amounts_as_scalar_conversion():
+    units = UNITS + ["kcal", None]
+    amounts = np.array([12.5 * index for index in range(len(units))])
+
+    result = UnitConverter.to_grams_batch(amounts, UnitConverter.unit_codes(units))
+
+    expected = [
+        UnitConverter.to_grams(amount, unit) for amount, unit in zip(amounts, units)
+    ]
+    assert result[:-2] == pytest.approx(expected[:-2], rel=1e-15)
+    assert np.isnan(result[-2:]).all()
+
+
+def test_should_keep_nan_amounts_in_batch():
+    result = UnitConverter.to_grams_batch(
+        np.array([np.nan, 1000.0]), UnitConverter.unit_codes(["mg", "mg"])
+    )
+
+    assert np.isnan(result[0])
+    assert result[1] == 1.0
@@ -0,0 +1,114 @@
+import logging
+from unittest.mock import patch
+
+import pytest
+
+from scripts.adaptive_batch_controller import AdaptiveBatchController
+
+MIB = 1024**2
+
+
+def create_controller(**settings) -> AdaptiveBatchController:
+    return AdaptiveBatchController(
+        **{
+            "batch_size": 1000,
+            "min_size": 100,
+            "max_size": 4000,
+            "max_rss": 1000 * MIB,
+            "target_latency": 2.0,
+            **settings,
+        }
+    )
+
+
+@patch.object(AdaptiveBatchController, "current_rss", return_value=100 * MIB)
+def test_should_grow_flush_size_when_loads_are_fast_and_memory_low(_, caplog):
+    controller = create_controller()
+
+    with caplog.at_level(logging.INFO):
+        controller.record(1000, 0.5)
+
+    assert controller.batch_size == 1500
+    assert "Flush size increased from 1000 to 1500" in caplog.text
+
+
+@patch.object(AdaptiveBatchController, "current_rss", return_value=100 * MIB)
+def test_should_not_grow_flush_size_after_partial_batch(_):
+    controller = create_controller()
+
+    controller.record(10, 0.5)
+
+    assert controller.batch_size == 1000
+
+
+@pytest.mark.parametrize("latency, expected_size", [(4.0, 500), (2.5, 800), (100, 500)])
+@patch.object(AdaptiveBatchController, "current_rss", return_value=100 * MIB)
+def test_should_reduce_flush_size_toward_target_latency(_, latency, expected_size):
+    controller = create_controller()
+
+    controller.record(1000, latency)
+
+    assert controller.batch_size == expected_size
+
+
+@patch.object(AdaptiveBatchController, "current_rss", return_value=1200 * MIB)
+def test_should_halve_flush_size_when_memory_above_ceiling(_, caplog):
+    controller = create_controller()
+
+    with caplog.at_level(logging.INFO):
+        controller.record(1000, 0.1)
+
+    assert controller.batch_size == 500
+    assert "RSS 1200 MiB above 1000 MiB" in caplog.text
+
+
+@patch.object(AdaptiveBatchController, "current_rss", return_value=800 * MIB)
+def test_should_keep_flush_size_when_memory_close_to_ceiling(_):
+    controller = create_controller()
+
+    controller.record(1000, 0.1)
+
+    assert controller.batch_size == 1000
+
+
+@patch.object(AdaptiveBatchController, "current_rss", return_value=100 * MIB)
+def test_should_keep_flush_size_within_bounds(_):
+    controller = create_controller(batch_size=3000)
+
+    controller.record(3000, 0.1)
+    controller.record(4000, 0.1)
+    assert controller.batch_size == 4000
+
+    for _ in range(10):
+        controller.record(4000, 10.0)
+    assert controller.batch_size == 100
+
+
+@patch.object(AdaptiveBatchController, "current_rss", return_value=5000 * MIB)
+def test_should_keep_fixed_flush_size(_):
+    controller = AdaptiveBatchController.fixed(50000)
+
+    controller.record(50000, 100.0)
+
+    assert not controller.is_adaptive()
+    assert controller.batch_size == 50000
+    assert not controller.memory_exceeded(50000)
+
+
+@patch.object(AdaptiveBatchController, "current_rss", return_value=1200 * MIB)
+def test_should_load_pending_records_early_when_memory_above_ceiling(_):
+    controller = create_controller()
+
+    assert not controller.memory_exceeded(99)
+    assert controller.memory_exceeded(100)
+
+
+def test_should_read_resident_memory_of_process():
+    rss = AdaptiveBatchController.current_rss()
+
+    assert rss is None or rss > 0
+
+
+def test_should_reject_invalid_bounds():
+    with pytest.raises(ValueError):
+        AdaptiveBatchController(1000, min_size=2000, max_size=1000)
@@ -0,0 +1,84 @@
+import concurrent.futures
+import os
+import time
+
+import pytest
+
+from scripts.collection_import import create_product_caches, run_source_tasks
+from scripts.config import Config
+
+
+def wait_and_return(delay: float, value: str) -> str:
+    time.sleep(delay)
+    return value
+
+
+def wait_and_return_times(delay: float) -> tuple[float, float]:
+    start = time.time()
+    time.sleep(delay)
+    return start, time.time()
+
+
+def fail(message: str) -> None:
+    raise ValueError(message)
+
+
+def test_should_run_source_tasks_one_after_the_other():
+    results = list(
+        run_source_tasks(
+            {
+                "off": (wait_and_return, (0, "off")),
+                "fdc": (wait_and_return, (0, "fdc")),
+            },
+            concurrent.futures.ProcessPoolExecutor,
+            concurrently=False,
+        )
+    )
+
+    assert results == [("off", "off"), ("fdc", "fdc")]
+
+
+@pytest.mark.parametrize(
+    "executor_class",
+    [concurrent.futures.ThreadPoolExecutor, concurrent.futures.ProcessPoolExecutor],
+)
+def test_should_run_source_tasks_concurrently(executor_class):
+    results = dict(
+        run_source_tasks(
+            {
+                "off": (wait_and_return_times, (0.5,)),
+                "fdc": (wait_and_return_times, (0.5,)),
+            },
+            executor_class,
+            concurrently=True,
+        )
+    )
+
+    # The tasks overlap, whatever the start-up time of the workers
+    (off_start, off_end), (fdc_start, fdc_end) = results["off"], results["fdc"]
+    assert off_start < fdc_end and fdc_start < off_end
+
+
+def test_should_raise_exception_of_source_task():
+    with pytest.raises(ValueError, match="import error"):
+        dict(
+            run_source_tasks(
+                {
+                    "off": (fail, ("import error",)),
+                    "fdc": (wait_and_return, (0, "fdc")),
+                },
+                concurrent.futures.ProcessPoolExecutor,
+                concurrently=True,
+            )
+        )
+
+
+def test_should_create_product_cache_file_per_source():
+    config = Config()
+    parent_dir = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+
+    off_cache, fdc_cache = create_product_caches(config, parent_dir)
+
+    assert off_cache.cache_file != fdc_cache.cache_file
+    assert off_cache.max_entries == fdc_cache.max_entries
+    assert off_cache.version == fdc_cache.version
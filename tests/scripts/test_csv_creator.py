@@ -1,6 +1,7 @@
 import unittest
 from unittest.mock import MagicMock, patch
 from domain.product.product import Product
+from domain.utils.nutrient_matrix import NutrientMatrix
 from scripts.csv_creator import CsvCreator
 
 
@@ -82,3 +83,34 @@ class CsvCreatorTests(unittest.TestCase):
         self.assertEqual(len(batches), 2)
         self.assertEqual(len(batches[0]), 10000)
         self.assertEqual(len(batches[1]), 5000)
+
+    def test_should_write_salt_and_energy_derived_from_sodium_and_kcal(self):
+        product = Product(
+            id_original="123456",
+            nutrition_data_per="100g",
+            nutrition_facts={
+                "nutrition_facts_per_hundred_grams": {
+                    "sodium_100g": 0.4,
+                    "energy_kcal_100g": 250.0,
+                }
+            },
+        )
+        csv_creator = CsvCreator(csv_files_base_names="test")
+        columns = (
+            csv_creator.mandatory_columns
+            + csv_creator.recommended_columns
+            + csv_creator.optional_columns
+        )
+        line = csv_creator._CsvCreator__create_csv_line_for_product(product, columns)
+        derived_values = csv_creator._CsvCreator__derive_nutrient_values(
+            NutrientMatrix.from_products([product])
+        )
+        csv_creator._CsvCreator__add_derived_nutrient_values(
+            columns, line, derived_values, 0, "100g"
+        )
+
+        self.assertEqual(line[columns.index("Salt for 100 g / 100 ml")], "1.0")
+        self.assertEqual(
+            line[columns.index("Energy (kJ) for 100 g / 100 ml")], "1046.7"
+        )
+        self.assertEqual(line[columns.index("Energy (kJ) per serving")], "")
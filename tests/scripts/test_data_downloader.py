@@ -0,0 +1,259 @@
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from scripts.data_downloader import DataDownloader
+from scripts.download_manifest import DownloadManifest
+
+FILE_CONTENT = bytes(range(256)) * 4096 * 3
+ETAG = '"dump-v1"'
+
+
+class RangeRequestHandler(BaseHTTPRequestHandler):
+    """Serves FILE_CONTENT, dropping the connection of the first GET request halfway through"""
+
+    def do_HEAD(self):
+        self.server.head_requests += 1
+        if self.headers.get("If-None-Match") == self.server.etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        if self.server.supports_ranges:
+            self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Length", str(len(FILE_CONTENT)))
+        self.send_header("ETag", self.server.etag)
+        self.end_headers()
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.received_headers.append(dict(self.headers))
+            is_first_request = len(server.received_headers) == 1
+        range_header = self.headers.get("Range")
+
+        if range_header is not None and server.supports_ranges:
+            start, end = range_header.removeprefix("bytes=").split("-")
+            end = int(end) if end else len(FILE_CONTENT) - 1
+            body = FILE_CONTENT[int(start) : end + 1]
+            self.send_response(206)
+            self.send_header(
+                "Content-Range", f"bytes {start}-{end}/{len(FILE_CONTENT)}"
+            )
+        else:
+            body = FILE_CONTENT
+            self.send_response(200)
+
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", self.server.etag)
+        self.end_headers()
+
+        if is_first_request:
+            body = body[: len(body) // 2]
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(supports_ranges: bool):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), RangeRequestHandler)
+    server.received_headers = []
+    server.lock = threading.Lock()
+    server.supports_ranges = supports_ranges
+    server.head_requests = 0
+    server.etag = ETAG
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+@pytest.fixture
+def range_server():
+    server = start_server(supports_ranges=True)
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture
+def no_range_server():
+    server = start_server(supports_ranges=False)
+    yield server
+    server.shutdown()
+
+
+def test_should_resume_interrupted_download_with_range_request(range_server, tmp_path):
+    download_path = tmp_path / "dump.gz"
+    url = f"http://127.0.0.1:{range_server.server_port}/dump.gz"
+
+    DataDownloader(retry_wait=0).download_data(url, str(download_path))
+
+    assert download_path.read_bytes() == FILE_CONTENT
+    assert len(range_server.received_headers) == 2
+    assert "Range" not in range_server.received_headers[0]
+    resumed_from = int(
+        range_server.received_headers[1]["Range"].removeprefix("bytes=").rstrip("-")
+    )
+    assert 0 < resumed_from <= len(FILE_CONTENT) // 2
+    assert range_server.received_headers[1]["If-Range"] == ETAG
+
+
+def test_should_resume_download_left_by_interrupted_run(range_server, tmp_path):
+    download_path = tmp_path / "dump.gz"
+    url = f"http://127.0.0.1:{range_server.server_port}/dump.gz"
+    with pytest.raises(Exception):
+        DataDownloader(max_retries=1, retry_wait=0).download_data(
+            url, str(download_path)
+        )
+    downloaded_size = (tmp_path / "dump.gz.part").stat().st_size
+
+    DataDownloader(retry_wait=0).download_data(url, str(download_path))
+
+    assert download_path.read_bytes() == FILE_CONTENT
+    assert range_server.received_headers[1]["Range"] == f"bytes={downloaded_size}-"
+    assert range_server.received_headers[1]["If-Range"] == ETAG
+    assert not (tmp_path / "dump.gz.part.json").exists()
+
+
+def test_should_request_whole_file_again_when_partial_response_does_not_match(
+    range_server, tmp_path
+):
+    download_path = tmp_path / "dump.gz"
+    url = f"http://127.0.0.1:{range_server.server_port}/dump.gz"
+    with pytest.raises(Exception):
+        DataDownloader(max_retries=1, retry_wait=0).download_data(
+            url, str(download_path)
+        )
+    # The server sends the range of a changed file, ignoring the If-Range header
+    range_server.etag = '"dump-v2"'
+
+    DataDownloader(retry_wait=0).download_data(url, str(download_path))
+
+    assert download_path.read_bytes() == FILE_CONTENT
+    assert "Range" in range_server.received_headers[1]
+    assert "Range" not in range_server.received_headers[2]
+
+
+def test_should_download_whole_file_again_when_server_ignores_ranges(
+    no_range_server, tmp_path
+):
+    download_path = tmp_path / "dump.gz"
+    url = f"http://127.0.0.1:{no_range_server.server_port}/dump.gz"
+
+    DataDownloader(retry_wait=0).download_data(url, str(download_path))
+
+    assert download_path.read_bytes() == FILE_CONTENT
+    assert "Range" in no_range_server.received_headers[1]
+
+
+def test_should_not_resume_when_resume_is_disabled(range_server, tmp_path):
+    download_path = tmp_path / "dump.gz"
+    url = f"http://127.0.0.1:{range_server.server_port}/dump.gz"
+
+    DataDownloader(retry_wait=0, resume=False).download_data(url, str(download_path))
+
+    assert download_path.read_bytes() == FILE_CONTENT
+    assert "Range" not in range_server.received_headers[1]
+
+
+def test_should_not_leave_part_file_after_download(range_server, tmp_path):
+    download_path = tmp_path / "dump.gz"
+    url = f"http://127.0.0.1:{range_server.server_port}/dump.gz"
+
+    DataDownloader(retry_wait=0).download_data(url, str(download_path))
+
+    assert not (tmp_path / "dump.gz.part").exists()
+
+
+def test_should_download_file_in_segments(range_server, tmp_path):
+    download_path = tmp_path / "dump.gz"
+    url = f"http://127.0.0.1:{range_server.server_port}/dump.gz"
+
+    DataDownloader(retry_wait=0, segments=4).download_data(url, str(download_path))
+
+    assert download_path.read_bytes() == FILE_CONTENT
+    requested_ranges = {
+        headers["Range"] for headers in range_server.received_headers[1:]
+    }
+    assert {
+        "bytes=0-786431",
+        "bytes=786432-1572863",
+        "bytes=1572864-2359295",
+        "bytes=2359296-3145727",
+    } <= requested_ranges
+
+
+def test_should_download_in_single_stream_when_server_does_not_support_ranges(
+    no_range_server, tmp_path
+):
+    download_path = tmp_path / "dump.gz"
+    url = f"http://127.0.0.1:{no_range_server.server_port}/dump.gz"
+
+    DataDownloader(retry_wait=0, segments=4).download_data(url, str(download_path))
+
+    assert download_path.read_bytes() == FILE_CONTENT
+    assert len(no_range_server.received_headers) == 2
+
+
+def test_should_record_download_in_manifest(range_server, tmp_path):
+    download_path = tmp_path / "dump.gz"
+    url = f"http://127.0.0.1:{range_server.server_port}/dump.gz"
+    manifest = DownloadManifest(str(tmp_path / "manifest.json"))
+
+    DataDownloader(retry_wait=0, manifest=manifest).download_data(
+        url, str(download_path)
+    )
+
+    entry = manifest.get_entry("dump.gz")
+    assert entry["url"] == url
+    assert entry["etag"] == ETAG
+    assert entry["size"] == len(FILE_CONTENT)
+    assert entry["sha256"] == hashlib.sha256(FILE_CONTENT).hexdigest()
+    assert entry["imported"] is False
+
+
+def test_should_compute_sha256_of_segmented_download(range_server, tmp_path):
+    download_path = tmp_path / "dump.gz"
+    url = f"http://127.0.0.1:{range_server.server_port}/dump.gz"
+    manifest = DownloadManifest(str(tmp_path / "manifest.json"))
+
+    DataDownloader(retry_wait=0, segments=4, manifest=manifest).download_data(
+        url, str(download_path)
+    )
+
+    entry = manifest.get_entry("dump.gz")
+    assert entry["sha256"] == hashlib.sha256(FILE_CONTENT).hexdigest()
+
+
+def test_should_skip_download_when_source_is_unchanged(range_server, tmp_path):
+    download_path = tmp_path / "dump.gz"
+    url = f"http://127.0.0.1:{range_server.server_port}/dump.gz"
+    data_downloader = DataDownloader(
+        retry_wait=0, manifest=DownloadManifest(str(tmp_path / "manifest.json"))
+    )
+    data_downloader.download_data(url, str(download_path))
+    get_requests = len(range_server.received_headers)
+
+    changed = data_downloader.download_data(url, str(download_path))
+
+    assert changed is False
+    assert len(range_server.received_headers) == get_requests
+    assert range_server.head_requests == 1
+
+
+def test_should_download_again_when_source_changed(range_server, tmp_path):
+    download_path = tmp_path / "dump.gz"
+    url = f"http://127.0.0.1:{range_server.server_port}/dump.gz"
+    manifest = DownloadManifest(str(tmp_path / "manifest.json"))
+    data_downloader = DataDownloader(retry_wait=0, manifest=manifest)
+    data_downloader.download_data(url, str(download_path))
+    manifest.mark_imported("dump.gz")
+    range_server.etag = '"dump-v2"'
+
+    changed = data_downloader.download_data(url, str(download_path))
+
+    assert changed is True
+    assert manifest.get_entry("dump.gz")["etag"] == '"dump-v2"'
+    assert not manifest.is_imported("dump.gz")
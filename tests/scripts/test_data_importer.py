@@ -1,9 +1,21 @@
+import gzip
+import json
+import logging
+import zipfile
+
 import pytest
 from unittest.mock import MagicMock, mock_open, patch
 
 from domain.mapper.product_mapper import ProductMapper
 from domain.product.product import Product
+from scripts.adaptive_batch_controller import AdaptiveBatchController
 from scripts.data_importer import DataImporter
+from scripts.import_checkpoint import ImportCheckpoint
+from scripts.import_sampler import ImportSampler
+from scripts.mapped_product_cache import MappedProductCache
+from scripts.off_line_filter import OffLineFilter
+from scripts.off_watermark_filter import OffWatermarkFilter
+from scripts.quarantine_writer import QuarantineWriter
 
 VALID_FDC_PRODUCT_COUNT = 2
 VALID_OFF_PRODUCT_COUNT = 2
@@ -11,9 +23,18 @@ LIMITED_OFF_PRODUCT_COUNT = 1
 BATCH_SIZE = 1000
 
 
+def map_in_batch(mapper: MagicMock) -> MagicMock:
+    """Makes the batch mapping of the OFF products of the mocked mapper map each product with its mocked
+    map_off_dict_to_product"""
+    mapper.map_off_dicts_to_products.side_effect = lambda objects, as_dicts=False: [
+        mapper.map_off_dict_to_product(obj) for obj in objects
+    ]
+    return mapper
+
+
 @pytest.fixture
 def product_mapper():
-    return MagicMock(spec=ProductMapper)
+    return map_in_batch(MagicMock(spec=ProductMapper))
 
 
 @pytest.fixture
@@ -27,7 +48,7 @@ def data_importer(product_mapper):
 
 
 @patch("scripts.data_loader.DataLoader.load_products_to_mongo")
-def test_should_import_fdc_data_when_valid_json(mock_loader, data_importer):
+def test_should_import_fdc_data_when_valid_json(mock_loader, data_importer, tmp_path):
     json_content = """
     {
         "BrandedFoods": [
@@ -44,15 +65,19 @@ def test_should_import_fdc_data_when_valid_json(mock_loader, data_importer):
     data_importer.config = MagicMock()
     data_importer.config.use_docker = False
 
-    with patch("builtins.open", mock_open(read_data=json_content)):
-        data_importer.import_json_fdc_data("mock_file.json", BATCH_SIZE)
+    json_file = tmp_path / "mock_file.json"
+    json_file.write_text(json_content)
+
+    data_importer.import_json_fdc_data(str(json_file), BATCH_SIZE)
 
     assert mock_mapper.map_fdc_dict_to_product.call_count == 2
     mock_loader.assert_called()
 
 
 @patch("scripts.data_loader.DataLoader.load_products_to_mongo")
-def test_should_ignore_non_us_products_in_fdc_data(mock_loader, data_importer):
+def test_should_ignore_non_us_products_in_fdc_data(
+    mock_loader, data_importer, tmp_path
+):
     json_content = """
     {
         "BrandedFoods": [
@@ -69,14 +94,18 @@ def test_should_ignore_non_us_products_in_fdc_data(mock_loader, data_importer):
     data_importer.config = MagicMock()
     data_importer.config.use_docker = False
 
-    with patch("builtins.open", mock_open(read_data=json_content)):
-        data_importer.import_json_fdc_data("mock_file.json", BATCH_SIZE)
+    json_file = tmp_path / "mock_file.json"
+    json_file.write_text(json_content)
+
+    data_importer.import_json_fdc_data(str(json_file), BATCH_SIZE)
 
     assert mock_mapper.map_fdc_dict_to_product.call_count == 1
 
 
 @patch("scripts.data_loader.DataLoader.load_products_to_mongo")
-def test_should_return_empty_list_when_fdc_file_is_empty(mock_loader, data_importer):
+def test_should_return_empty_list_when_fdc_file_is_empty(
+    mock_loader, data_importer, tmp_path
+):
     json_content = "{}"
 
     mock_mapper = MagicMock(spec=ProductMapper)
@@ -86,8 +115,10 @@ def test_should_return_empty_list_when_fdc_file_is_empty(mock_loader, data_impor
     data_importer.config = MagicMock()
     data_importer.config.use_docker = False
 
-    with patch("builtins.open", mock_open(read_data=json_content)):
-        data_importer.import_json_fdc_data("mock_file.json", BATCH_SIZE)
+    json_file = tmp_path / "mock_file.json"
+    json_file.write_text(json_content)
+
+    data_importer.import_json_fdc_data(str(json_file), BATCH_SIZE)
 
     mock_mapper.map_fdc_dict_to_product.assert_not_called()
     mock_loader.assert_called_once_with(
@@ -95,6 +126,78 @@ def test_should_return_empty_list_when_fdc_file_is_empty(mock_loader, data_impor
     )
 
 
+@patch("scripts.data_loader.DataLoader.load_products_to_mongo")
+def test_should_parse_fdc_amounts_as_floats(mock_loader, data_importer, tmp_path):
+    json_file = tmp_path / "mock_file.json"
+    json_file.write_text(
+        '{"BrandedFoods": [{"marketCountry": "United States", '
+        '"foodNutrients": [{"amount": 1.5}]}]}'
+    )
+    data_importer.config = MagicMock()
+    data_importer.config.use_docker = False
+
+    data_importer.import_json_fdc_data(str(json_file), BATCH_SIZE)
+
+    obj = data_importer.product_mapper.map_fdc_dict_to_product.call_args[0][0]
+    assert isinstance(obj["foodNutrients"][0]["amount"], float)
+
+
+@patch("scripts.data_loader.DataLoader.load_products_to_mongo")
+def test_should_import_fdc_data_from_zip_archive(mock_loader, data_importer, tmp_path):
+    json_content = """
+    {
+        "BrandedFoods": [
+            {"marketCountry": "United States", "gtinUpc": "12345"},
+            {"marketCountry": "United States", "gtinUpc": "67890"}
+        ]
+    }
+    """
+    zip_file = tmp_path / "fdc_branded.zip"
+    with zipfile.ZipFile(zip_file, "w") as zip_ref:
+        zip_ref.writestr("FoodData_Central_branded_food.json", json_content)
+    mock_product = MagicMock(spec=Product)
+    data_importer.product_mapper.map_fdc_dict_to_product.return_value = mock_product
+    data_importer.config = MagicMock()
+    data_importer.config.use_docker = False
+
+    data_importer.import_json_fdc_data(str(zip_file), BATCH_SIZE)
+
+    assert data_importer.product_mapper.map_fdc_dict_to_product.call_count == 2
+    mock_loader.assert_called_once_with(
+        [mock_product, mock_product], collection_name="fdc_products", use_docker=False
+    )
+
+
+@pytest.mark.parametrize("project_records", [True, False])
+@patch("scripts.data_loader.DataLoader.load_products_to_mongo")
+def test_should_import_same_fdc_products_with_or_without_projection(
+    mock_loader, data_importer, tmp_path, project_records
+):
+    json_file = tmp_path / "mock_file.json"
+    json_file.write_text(
+        '{"BrandedFoods": ['
+        '{"marketCountry": "United States", "gtinUpc": "12345"}, '
+        '{"marketCountry": "Canada", "gtinUpc": "67890"}, '
+        '{"marketCountry": "United States", "gtinUpc": "13579", '
+        '"foodAttributes": [{"id": 1}], "foodNutrients": [{"nutrient": {"id": 1003}, "amount": 2.5}]}]}'
+    )
+    data_importer.product_mapper.map_fdc_dict_to_product.side_effect = lambda obj: obj
+    data_importer.config = MagicMock()
+    data_importer.config.use_docker = False
+    checkpoint = ImportCheckpoint(str(tmp_path / "checkpoint.json"), "v1")
+    checkpoint.save(1, 1)
+
+    data_importer.import_json_fdc_data(
+        str(json_file), 100, checkpoint=checkpoint, project_records=project_records
+    )
+
+    [imported] = mock_loader.call_args[0][0]
+    assert imported["gtinUpc"] == "13579"
+    assert imported["foodNutrients"] == [{"nutrient": {"id": 1003}, "amount": 2.5}]
+    assert ("foodAttributes" in imported) != project_records
+    assert checkpoint.load()["position"] == 3
+
+
 # ----------------------------------------------------------------
 # Tests import_jsonl_off_data
 # ----------------------------------------------------------------
@@ -130,3 +233,442 @@ def test_should_apply_limit_on_off_jsonl_data(mock_loader, data_importer):
     mock_loader.assert_called_once_with(
         [mock_product], collection_name="off_products", use_docker=False
     )
+
+
+@patch("scripts.data_loader.DataLoader.load_products_to_mongo")
+def test_should_import_only_lines_of_off_shard(mock_loader, data_importer, tmp_path):
+    file = tmp_path / "products.jsonl"
+    file.write_bytes(b'{"code": "123"}\n{"code": "456"}\n{"code": "789"}\n')
+    data_importer.product_mapper.map_off_dict_to_product.side_effect = lambda obj: obj[
+        "code"
+    ]
+    data_importer.config = MagicMock()
+    data_importer.config.use_docker = False
+
+    counts = data_importer.import_jsonl_off_shard(str(file), 16, 32, batch_size=100)
+
+    assert counts == {
+        "lines": 1,
+        "products": 1,
+        "errors": 0,
+        "skipped": 0,
+        "cached": 0,
+        "max_last_modified_t": None,
+    }
+    mock_loader.assert_called_once_with(
+        ["456"], collection_name="off_products", use_docker=False
+    )
+
+
+@patch("scripts.data_loader.DataLoader.load_products_to_mongo")
+def test_should_import_only_off_lines_kept_by_line_filter(
+    mock_loader, data_importer, tmp_path
+):
+    file = tmp_path / "products.jsonl"
+    file.write_bytes(
+        b'{"code": "123", "countries_tags": ["en:canada"]}\n'
+        b'{"code": "456", "countries_tags": ["en:france"]}\n'
+        b'{"code": "789", "countries_tags": ["en:france"], "origins": "en:canada"}\n'
+    )
+    data_importer.product_mapper.map_off_dict_to_product.side_effect = lambda obj: obj[
+        "code"
+    ]
+    data_importer.config = MagicMock()
+    data_importer.config.use_docker = False
+    line_filter = OffLineFilter("en:canada")
+
+    data_importer.import_jsonl_off_data(str(file), 100, line_filter=line_filter)
+
+    mock_loader.assert_called_once_with(
+        ["123"], collection_name="off_products", use_docker=False
+    )
+    assert line_filter.lines_scanned == 3
+    assert line_filter.pre_rejected == 1
+    assert line_filter.confirmed == 1
+
+
+@patch("scripts.data_loader.DataLoader.load_products_to_mongo")
+def test_should_record_off_checkpoint_after_each_loaded_batch(
+    mock_loader, data_importer, tmp_path
+):
+    file = tmp_path / "products.jsonl"
+    file.write_bytes(b'{"code": "123"}\n{"code": "456"}\n{"code": "789"}\n')
+    data_importer.product_mapper.map_off_dict_to_product.side_effect = lambda obj: obj[
+        "code"
+    ]
+    data_importer.config = MagicMock()
+    data_importer.config.use_docker = False
+    checkpoint = ImportCheckpoint(str(tmp_path / "checkpoint.json"), "v1")
+    recorded = []
+    mock_loader.side_effect = lambda *args, **kwargs: recorded.append(checkpoint.load())
+
+    data_importer.import_jsonl_off_data(str(file), 2, checkpoint=checkpoint)
+
+    assert recorded[0] is None
+    assert (recorded[1]["position"], recorded[1]["batches"]) == (32, 1)
+    assert (checkpoint.load()["position"], checkpoint.load()["batches"]) == (48, 2)
+    assert mock_loader.call_count == 2
+
+
+@patch("scripts.data_loader.MongoClient")
+def test_should_not_record_off_checkpoint_of_batch_whose_write_failed(
+    mock_client, data_importer, tmp_path
+):
+    file = tmp_path / "products.jsonl"
+    file.write_bytes(b'{"code": "123"}\n{"code": "456"}\n')
+    data_importer.product_mapper.map_off_dict_to_product.side_effect = lambda obj: {
+        "id_match": obj["code"],
+        "publication_date": 1,
+        "modified_date": 0,
+    }
+    data_importer.config = MagicMock()
+    data_importer.config.use_docker = False
+    collection = mock_client.return_value.__getitem__.return_value.__getitem__
+    collection.return_value.bulk_write.side_effect = RuntimeError("write failed")
+    checkpoint = ImportCheckpoint(str(tmp_path / "checkpoint.json"), "v1")
+
+    with pytest.raises(RuntimeError, match="write failed"):
+        data_importer.import_jsonl_off_data(str(file), 100, checkpoint=checkpoint)
+
+    assert collection.return_value.bulk_write.called
+    assert checkpoint.load() is None
+
+
+@patch("scripts.data_loader.DataLoader.load_products_to_mongo")
+def test_should_resume_off_import_from_checkpoint(mock_loader, data_importer, tmp_path):
+    file = tmp_path / "products.jsonl"
+    file.write_bytes(b'{"code": "123"}\n{"code": "456"}\n{"code": "789"}\n')
+    data_importer.product_mapper.map_off_dict_to_product.side_effect = lambda obj: obj[
+        "code"
+    ]
+    data_importer.config = MagicMock()
+    data_importer.config.use_docker = False
+    checkpoint = ImportCheckpoint(str(tmp_path / "checkpoint.json"), "v1")
+    checkpoint.save(32, 1)
+
+    data_importer.import_jsonl_off_data(str(file), 100, checkpoint=checkpoint)
+
+    mock_loader.assert_called_once_with(
+        ["789"], collection_name="off_products", use_docker=False
+    )
+    assert (checkpoint.load()["position"], checkpoint.load()["batches"]) == (48, 2)
+
+
+@patch("scripts.data_loader.DataLoader.load_products_to_mongo")
+def test_should_resume_fdc_import_from_checkpoint(mock_loader, data_importer, tmp_path):
+    json_file = tmp_path / "mock_file.json"
+    json_file.write_text(
+        '{"BrandedFoods": ['
+        '{"marketCountry": "United States", "gtinUpc": "12345"}, '
+        '{"marketCountry": "Canada", "gtinUpc": "67890"}, '
+        '{"marketCountry": "United States", "gtinUpc": "13579"}]}'
+    )
+    data_importer.product_mapper.map_fdc_dict_to_product.side_effect = lambda obj: obj[
+        "gtinUpc"
+    ]
+    data_importer.config = MagicMock()
+    data_importer.config.use_docker = False
+    checkpoint = ImportCheckpoint(str(tmp_path / "checkpoint.json"), "v1")
+    checkpoint.save(1, 1)
+
+    data_importer.import_json_fdc_data(str(json_file), 100, checkpoint=checkpoint)
+
+    mock_loader.assert_called_once_with(
+        ["13579"], collection_name="fdc_products", use_docker=False
+    )
+    assert checkpoint.load()["position"] == 3
+
+
+@patch("scripts.data_loader.DataLoader.load_products_to_mongo")
+def test_should_skip_off_products_unchanged_since_watermark(
+    mock_loader, data_importer, tmp_path
+):
+    file = tmp_path / "products.jsonl"
+    file.write_bytes(
+        b'{"code": "123", "last_modified_t": 100}\n'
+        b'{"code": "456", "last_modified_t": 300}\n'
+        b'{"code": "789", "last_modified_t": 150, "images": {"last_modified_t": 250}}\n'
+        b'{"code": "000"}\n'
+    )
+    data_importer.product_mapper.map_off_dict_to_product.side_effect = lambda obj: obj[
+        "code"
+    ]
+    data_importer.config = MagicMock()
+    data_importer.config.use_docker = False
+    watermark_filter = OffWatermarkFilter(200)
+
+    counts = data_importer.import_jsonl_off_data(
+        str(file), 100, watermark_filter=watermark_filter
+    )
+
+    mock_loader.assert_called_once_with(
+        ["456", "000"], collection_name="off_products", use_docker=False
+    )
+    assert counts["skipped"] == 2
+    assert watermark_filter.pre_skipped == 1
+    assert counts["max_last_modified_t"] == 300
+
+
+def create_code_mapper():
+    mapper = map_in_batch(MagicMock(spec=ProductMapper))
+    mapper.map_off_dict_to_product.side_effect = lambda obj: obj["code"]
+    return mapper
+
+
+@patch("scripts.data_loader.DataLoader.load_products_to_mongo")
+def test_should_aggregate_counts_of_parallel_off_import(
+    mock_loader, data_importer, tmp_path, caplog
+):
+    file = tmp_path / "products.jsonl"
+    file.write_bytes(b"".join(f'{{"code": "{i}"}}\n'.encode() for i in range(20)))
+
+    with caplog.at_level(logging.INFO):
+        data_importer.import_jsonl_off_data_in_parallel(
+            str(file), 100, workers=3, product_mapper_factory=create_code_mapper
+        )
+
+    assert "20 lines read, 20 products mapped, 0 lines in error" in caplog.text
+
+
+@pytest.mark.parametrize(
+    "skip_cached_upserts, reloaded_codes", [(False, ["123", "456"]), (True, ["456"])]
+)
+@patch("scripts.data_loader.DataLoader.load_products_to_mongo")
+def test_should_reuse_cached_products_of_unchanged_lines(
+    mock_loader, product_mapper, tmp_path, skip_cached_upserts, reloaded_codes
+):
+    file = tmp_path / "products.jsonl"
+    file.write_bytes(b'{"code": "123"}\n')
+    product_mapper.map_off_dict_to_product.side_effect = lambda obj: Product(
+        id_match=obj["code"], ecoscore_data=None, nova_data=None
+    )
+    product_cache = MappedProductCache(str(tmp_path / "cache.sqlite"), 100)
+    data_importer = DataImporter(
+        product_mapper,
+        product_cache=product_cache,
+        skip_cached_upserts=skip_cached_upserts,
+    )
+    data_importer.config = MagicMock()
+    data_importer.config.use_docker = False
+    data_importer.import_jsonl_off_data(str(file), BATCH_SIZE)
+    file.write_bytes(b'{"code": "123"}\n{"code": "456"}\n')
+
+    counts = data_importer.import_jsonl_off_data(str(file), BATCH_SIZE)
+
+    assert product_mapper.map_off_dict_to_product.call_count == 2
+    assert counts["cached"] == 1
+    assert [
+        product.id_match for product in mock_loader.call_args[0][0]
+    ] == reloaded_codes
+    assert product_cache.hits == 1
+    product_cache.close()
+
+
+@patch("scripts.data_loader.DataLoader.load_products_to_mongo")
+def test_should_sample_same_barcodes_in_off_and_fdc_imports(
+    mock_loader, data_importer, tmp_path
+):
+    codes = [f"{code:012d}" for code in range(200)]
+    off_file = tmp_path / "products.jsonl"
+    off_file.write_text("".join(f'{{"code": "{code}"}}\n' for code in codes))
+    fdc_file = tmp_path / "fdc.json"
+    fdc_file.write_text(
+        '{"BrandedFoods": ['
+        + ", ".join(
+            f'{{"marketCountry": "United States", "gtinUpc": "{code.lstrip("0")}"}}'
+            for code in codes
+        )
+        + "]}"
+    )
+    data_importer.product_mapper.map_off_dict_to_product.side_effect = lambda obj: obj[
+        "code"
+    ].lstrip("0")
+    data_importer.product_mapper.map_fdc_dict_to_product.side_effect = lambda obj: obj[
+        "gtinUpc"
+    ]
+    data_importer.config = MagicMock()
+    data_importer.config.use_docker = False
+    sampler = ImportSampler("hash", 0.2, seed=7)
+
+    data_importer.import_jsonl_off_data(str(off_file), BATCH_SIZE, sampler=sampler)
+    off_sample = mock_loader.call_args[0][0]
+    data_importer.import_json_fdc_data(str(fdc_file), BATCH_SIZE, sampler=sampler)
+    fdc_sample = mock_loader.call_args[0][0]
+
+    assert 10 < len(off_sample) < 70
+    assert sorted(off_sample) == sorted(fdc_sample)
+
+
+@patch("scripts.data_loader.DataLoader.load_products_to_mongo")
+def test_should_import_every_kth_and_first_fdc_products(
+    mock_loader, data_importer, tmp_path
+):
+    fdc_file = tmp_path / "fdc.json"
+    fdc_file.write_text(
+        '{"BrandedFoods": ['
+        + ", ".join(
+            f'{{"marketCountry": "United States", "gtinUpc": "{code}"}}'
+            for code in range(10)
+        )
+        + "]}"
+    )
+    data_importer.product_mapper.map_fdc_dict_to_product.side_effect = lambda obj: obj[
+        "gtinUpc"
+    ]
+    data_importer.config = MagicMock()
+    data_importer.config.use_docker = False
+
+    data_importer.import_json_fdc_data(
+        str(fdc_file), BATCH_SIZE, sampler=ImportSampler("every", 4)
+    )
+    every_sample = mock_loader.call_args[0][0]
+    data_importer.import_json_fdc_data(
+        str(fdc_file), BATCH_SIZE, sampler=ImportSampler("head", 3)
+    )
+    head_sample = mock_loader.call_args[0][0]
+
+    assert every_sample == ["0", "4", "8"]
+    assert head_sample == ["0", "1", "2"]
+
+
+def map_code_or_fail(obj):
+    if obj["code"] == "bad":
+        raise ValueError("unmappable product")
+    return obj["code"]
+
+
+@patch("scripts.data_loader.DataLoader.load_products_to_mongo")
+def test_should_quarantine_bad_off_lines_and_continue_import(
+    mock_loader, data_importer, tmp_path
+):
+    file = tmp_path / "products.jsonl"
+    file.write_bytes(b'{"code": "123"}\n{"code": \n{"code": "bad"}\n{"code": "456"}\n')
+    data_importer.product_mapper.map_off_dict_to_product.side_effect = map_code_or_fail
+    data_importer.config = MagicMock()
+    data_importer.config.use_docker = False
+    quarantine = QuarantineWriter(str(tmp_path / "quarantine.jsonl.gz"))
+
+    counts = data_importer.import_jsonl_off_data(
+        str(file), BATCH_SIZE, quarantine=quarantine
+    )
+
+    assert mock_loader.call_args[0][0] == ["123", "456"]
+    assert counts["errors"] == 2
+    assert quarantine.counts == {"JSONDecodeError": 1, "ValueError": 1}
+    with gzip.open(quarantine.quarantine_file, "rt") as quarantined:
+        entries = [json.loads(line) for line in quarantined]
+    assert [(entry["position"], entry["record"]) for entry in entries] == [
+        (16, '{"code": '),
+        (26, {"code": "bad"}),
+    ]
+
+
+@patch("scripts.data_loader.DataLoader.load_products_to_mongo")
+def test_should_not_move_watermark_past_quarantined_off_products(
+    mock_loader, data_importer, tmp_path
+):
+    file = tmp_path / "products.jsonl"
+    file.write_bytes(
+        b'{"code": "123", "last_modified_t": 100}\n'
+        b'{"code": "bad", "last_modified_t": 300}\n'
+    )
+    data_importer.product_mapper.map_off_dict_to_product.side_effect = map_code_or_fail
+    data_importer.config = MagicMock()
+    data_importer.config.use_docker = False
+    quarantine = QuarantineWriter(str(tmp_path / "quarantine.jsonl.gz"))
+
+    counts = data_importer.import_jsonl_off_data(
+        str(file), BATCH_SIZE, quarantine=quarantine
+    )
+
+    assert counts["errors"] == 1
+    assert counts["max_last_modified_t"] == 100
+
+
+@patch("scripts.data_loader.DataLoader.load_products_to_mongo")
+def test_should_quarantine_unmappable_fdc_records_and_continue_import(
+    mock_loader, data_importer, tmp_path
+):
+    fdc_file = tmp_path / "fdc.json"
+    fdc_file.write_text(
+        '{"BrandedFoods": ['
+        + ", ".join(
+            f'{{"marketCountry": "United States", "gtinUpc": "{code}"}}'
+            for code in ["123", "bad", "456"]
+        )
+        + "]}"
+    )
+    data_importer.product_mapper.map_fdc_dict_to_product.side_effect = (
+        lambda obj: map_code_or_fail({"code": obj["gtinUpc"]})
+    )
+    data_importer.config = MagicMock()
+    data_importer.config.use_docker = False
+    quarantine = QuarantineWriter(str(tmp_path / "quarantine.jsonl.gz"))
+
+    data_importer.import_json_fdc_data(str(fdc_file), BATCH_SIZE, quarantine=quarantine)
+
+    assert mock_loader.call_args[0][0] == ["123", "456"]
+    with gzip.open(quarantine.quarantine_file, "rt") as quarantined:
+        (entry,) = [json.loads(line) for line in quarantined]
+    assert entry["reason"] == "ValueError"
+    assert entry["position"] == 1
+    assert entry["record"]["gtinUpc"] == "bad"
+
+
+@patch.object(AdaptiveBatchController, "current_rss", return_value=100 * 1024**2)
+@patch("scripts.data_loader.DataLoader.load_products_to_mongo", return_value=0.01)
+def test_should_grow_flush_size_of_fast_loads(mock_loader, _, data_importer, tmp_path):
+    file = tmp_path / "products.jsonl"
+    file.write_bytes(b"".join(f'{{"code": "{i}"}}\n'.encode() for i in range(20)))
+    data_importer.product_mapper.map_off_dict_to_product.side_effect = lambda obj: obj[
+        "code"
+    ]
+    data_importer.config = MagicMock()
+    data_importer.config.use_docker = False
+    controller = AdaptiveBatchController(
+        2, min_size=2, max_size=8, max_rss=1024**3, target_latency=1.0, growth=2
+    )
+
+    data_importer.import_jsonl_off_data(str(file), controller)
+
+    assert [len(call.args[0]) for call in mock_loader.call_args_list] == [2, 4, 8, 6]
+    assert controller.batch_size == 8
+
+
+@patch.object(AdaptiveBatchController, "current_rss", return_value=2 * 1024**3)
+@patch("scripts.data_loader.DataLoader.load_products_to_mongo", return_value=None)
+def test_should_load_products_early_when_memory_above_ceiling(
+    mock_loader, _, product_mapper, tmp_path
+):
+    file = tmp_path / "products.jsonl"
+    file.write_bytes(b"".join(f'{{"code": "{i}"}}\n'.encode() for i in range(20)))
+    product_mapper.map_off_dict_to_product.side_effect = lambda obj: obj["code"]
+    data_importer = DataImporter(product_mapper, chunk_size=5)
+    data_importer.config = MagicMock()
+    data_importer.config.use_docker = False
+    controller = AdaptiveBatchController(100, min_size=5, max_size=100, max_rss=1024**3)
+
+    data_importer.import_jsonl_off_data(str(file), controller)
+
+    assert [len(call.args[0]) for call in mock_loader.call_args_list] == [5, 5, 5, 5, 0]
+    assert controller.batch_size == 5
+
+
+@patch("scripts.data_loader.DataLoader.load_products_to_mongo")
+def test_should_map_off_lines_in_batch_to_dicts_without_product_cache(
+    mock_loader, data_importer, tmp_path
+):
+    file = tmp_path / "products.jsonl"
+    file.write_bytes(b'{"code": "123"}\n{"code": "456"}\n')
+    data_importer.product_mapper.map_off_dict_to_product.side_effect = lambda obj: obj[
+        "code"
+    ]
+    data_importer.config = MagicMock()
+    data_importer.config.use_docker = False
+
+    data_importer.import_jsonl_off_data(str(file), BATCH_SIZE)
+
+    data_importer.product_mapper.map_off_dicts_to_products.assert_called_once_with(
+        [{"code": "123"}, {"code": "456"}], as_dicts=True
+    )
+    assert mock_loader.call_args[0][0] == ["123", "456"]
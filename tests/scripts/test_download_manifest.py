@@ -0,0 +1,56 @@
+import pytest
+
+from scripts.download_manifest import DownloadManifest
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    return DownloadManifest(str(tmp_path / "manifest.json"))
+
+
+def record_download(manifest, etag='"v1"'):
+    manifest.update_entry(
+        "dump.gz", "https://example.com/dump.gz", etag, None, 10, "abc"
+    )
+
+
+def test_should_return_none_for_unknown_file(manifest):
+    assert manifest.get_entry("dump.gz") is None
+    assert not manifest.is_imported("dump.gz")
+
+
+def test_should_record_download(manifest):
+    record_download(manifest)
+
+    entry = manifest.get_entry("dump.gz")
+
+    assert entry["url"] == "https://example.com/dump.gz"
+    assert entry["etag"] == '"v1"'
+    assert entry["size"] == 10
+    assert entry["sha256"] == "abc"
+    assert entry["imported"] is False
+
+
+def test_should_mark_file_as_imported(manifest):
+    record_download(manifest)
+
+    manifest.mark_imported("dump.gz")
+
+    assert manifest.is_imported("dump.gz")
+
+
+def test_should_reset_imported_flag_on_new_download(manifest):
+    record_download(manifest)
+    manifest.mark_imported("dump.gz")
+
+    record_download(manifest, etag='"v2"')
+
+    assert not manifest.is_imported("dump.gz")
+
+
+def test_should_persist_entries(manifest):
+    record_download(manifest)
+
+    reloaded_manifest = DownloadManifest(manifest.manifest_file)
+
+    assert reloaded_manifest.get_entry("dump.gz")["etag"] == '"v1"'
@@ -0,0 +1,112 @@
+import io
+import json
+
+import pytest
+
+from scripts.fdc_record_extractor import FdcRecordExtractor
+
+US_RECORD = {
+    "fdcId": 1,
+    "gtinUpc": "12345",
+    "marketCountry": "United States",
+    "foodAttributes": [{"id": 1, "name": "Added Package Weight", "value": "1 oz"}],
+    "foodUpdateLog": [{"fdcId": 1, "foodAttributes": [], "changes": ""}],
+    "labelNutrients": {"fat": {"value": 9.0}, "sodium": {"value": 180}},
+    "foodNutrients": [
+        {
+            "type": "FoodNutrient",
+            "id": 31,
+            "nutrient": {
+                "id": 1003,
+                "number": "203",
+                "name": "Protein",
+                "unitName": "g",
+            },
+            "foodNutrientDerivation": {"code": "LCCS", "foodNutrientSource": {"id": 9}},
+            "amount": 25.5,
+        }
+    ],
+}
+CANADIAN_RECORD = {
+    "marketCountry": "Canada",
+    "gtinUpc": "67890",
+    "foodNutrients": [{"nutrient": {"id": 1003, "unitName": "g"}, "amount": 1.0}],
+}
+
+
+@pytest.fixture
+def extractor():
+    return FdcRecordExtractor()
+
+
+def create_fdc_file(records: list[dict], **other_keys) -> io.BytesIO:
+    return io.BytesIO(json.dumps({**other_keys, "BrandedFoods": records}).encode())
+
+
+def test_should_only_build_fields_used_by_mapper(extractor):
+    file = create_fdc_file([US_RECORD])
+
+    records = list(extractor.records(file))
+
+    assert records == [
+        (
+            0,
+            {
+                "fdcId": 1,
+                "gtinUpc": "12345",
+                "marketCountry": "United States",
+                "labelNutrients": {"fat": {"value": 9.0}, "sodium": {"value": 180}},
+                "foodNutrients": [
+                    {"nutrient": {"id": 1003, "unitName": "g"}, "amount": 25.5}
+                ],
+            },
+        )
+    ]
+
+
+def test_should_skip_records_of_other_market_countries(extractor):
+    file = create_fdc_file([CANADIAN_RECORD, US_RECORD, {"gtinUpc": "13579"}])
+
+    records = list(extractor.records(file))
+
+    assert [(index, record["gtinUpc"]) for index, record in records] == [(1, "12345")]
+    assert extractor.records_read == 3
+    assert extractor.records_skipped == 2
+
+
+def test_should_keep_every_record_without_market_country():
+    extractor = FdcRecordExtractor(market_country=None)
+    file = create_fdc_file([CANADIAN_RECORD, US_RECORD])
+
+    records = list(extractor.records(file))
+
+    assert [record["gtinUpc"] for _, record in records] == ["67890", "12345"]
+
+
+def test_should_skip_records_before_start_index(extractor):
+    file = create_fdc_file([US_RECORD, CANADIAN_RECORD, {**US_RECORD, "fdcId": 2}])
+
+    records = list(extractor.records(file, start=1))
+
+    assert [(index, record["fdcId"]) for index, record in records] == [(2, 2)]
+    assert extractor.records_skipped == 2
+
+
+def test_should_find_records_array_after_other_top_level_keys(extractor):
+    file = create_fdc_file(
+        [US_RECORD], metadata={"BrandedFoods": [CANADIAN_RECORD], "version": 1}
+    )
+
+    records = list(extractor.records(file))
+
+    assert [record["gtinUpc"] for _, record in records] == ["12345"]
+
+
+def test_should_yield_nothing_when_file_has_no_records_array(extractor):
+    assert list(extractor.records(io.BytesIO(b"{}"))) == []
+
+
+def test_should_parse_amounts_as_floats_when_use_float_is_set(extractor):
+    records = list(extractor.records(create_fdc_file([US_RECORD]), use_float=True))
+
+    assert isinstance(records[0][1]["foodNutrients"][0]["amount"], float)
@@ -0,0 +1,45 @@
+import pytest
+
+from scripts.import_checkpoint import ImportCheckpoint
+
+
+@pytest.fixture
+def checkpoint(tmp_path):
+    return ImportCheckpoint(str(tmp_path / "checkpoint.json"), "sha-v1")
+
+
+def test_should_return_none_when_no_checkpoint_is_recorded(checkpoint):
+    assert checkpoint.load() is None
+
+
+def test_should_load_recorded_checkpoint(checkpoint):
+    checkpoint.save(1024, 3)
+
+    recorded = checkpoint.load()
+
+    assert recorded["position"] == 1024
+    assert recorded["batches"] == 3
+    assert recorded["source_version"] == "sha-v1"
+
+
+def test_should_ignore_checkpoint_of_another_source_version(checkpoint):
+    checkpoint.save(1024, 3)
+
+    assert ImportCheckpoint(checkpoint.checkpoint_file, "sha-v2").load() is None
+
+
+def test_should_ignore_unreadable_checkpoint(checkpoint, tmp_path):
+    (tmp_path / "checkpoint.json").write_text("{")
+
+    assert checkpoint.load() is None
+
+
+def test_should_clear_checkpoint_and_checkpoints_of_shards(checkpoint):
+    checkpoint.save(1024, 3)
+    shard_checkpoint = checkpoint.for_shard(0, 2048)
+    shard_checkpoint.save(512, 1)
+
+    checkpoint.clear()
+
+    assert checkpoint.load() is None
+    assert shard_checkpoint.load() is None
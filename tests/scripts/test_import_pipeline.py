@@ -0,0 +1,101 @@
+import itertools
+import logging
+import random
+import time
+
+import pytest
+
+from scripts.import_pipeline import ImportPipeline
+
+
+def slow_double(chunk):
+    time.sleep(random.uniform(0, 0.01))
+    return [item * 2 for item in chunk]
+
+
+def test_should_load_mapped_chunks_in_order_of_read_items():
+    loaded = []
+    pipeline = ImportPipeline(
+        slow_double, loaded.extend, mapping_workers=4, queue_size=2, chunk_size=3
+    )
+
+    pipeline.run(range(100))
+
+    assert loaded == [item * 2 for item in range(100)]
+    assert pipeline.stats["read"]["items"] == 100
+    assert pipeline.stats["map"]["items"] == 100
+    assert pipeline.stats["load"]["items"] == 100
+
+
+def test_should_stop_reading_when_loading_returns_false():
+    loaded = []
+
+    def load_until_ten_chunks(mapped_chunk):
+        loaded.append(mapped_chunk)
+        return len(loaded) < 10
+
+    pipeline = ImportPipeline(
+        slow_double, load_until_ten_chunks, queue_size=2, chunk_size=5
+    )
+
+    pipeline.run(itertools.count())
+
+    assert len(loaded) == 10
+    assert loaded[9] == [item * 2 for item in range(45, 50)]
+
+
+def test_should_block_reader_when_queues_are_full():
+    read_items = []
+    loaded_items = []
+
+    def read(count):
+        for item in range(count):
+            read_items.append(item)
+            yield item
+
+    def slow_load(mapped_chunk):
+        time.sleep(0.01)
+        loaded_items.extend(mapped_chunk)
+        # The reader can only be ahead by the chunks in the queues and held by the threads
+        assert len(read_items) - len(loaded_items) <= (2 * 2 + 2 + 2) * 10
+
+    pipeline = ImportPipeline(
+        lambda chunk: chunk, slow_load, mapping_workers=2, queue_size=2, chunk_size=10
+    )
+
+    pipeline.run(read(500))
+
+    assert len(read_items) == 500
+
+
+def test_should_raise_exception_of_mapping_thread():
+    def failing_map(chunk):
+        raise ValueError("mapping error")
+
+    pipeline = ImportPipeline(failing_map, lambda chunk: None, chunk_size=2)
+
+    with pytest.raises(ValueError, match="mapping error"):
+        pipeline.run(range(10))
+
+
+def test_should_raise_exception_of_reader_thread():
+    def failing_read():
+        yield 1
+        raise OSError("reading error")
+
+    pipeline = ImportPipeline(lambda chunk: chunk, lambda chunk: None, chunk_size=1)
+
+    with pytest.raises(OSError, match="reading error"):
+        pipeline.run(failing_read())
+
+
+def test_should_log_stats_of_each_stage(caplog):
+    pipeline = ImportPipeline(lambda chunk: chunk, lambda chunk: None, chunk_size=10)
+
+    with caplog.at_level(logging.INFO):
+        pipeline.run(range(50))
+
+    assert "queues: read 0/8, mapped 0/8" in caplog.text
+    assert "read: 50 items" in caplog.text
+    assert "map: 50 items" in caplog.text
+    assert "load: 50 items" in caplog.text
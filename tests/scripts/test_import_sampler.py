@@ -0,0 +1,61 @@
+import pytest
+
+from scripts.import_sampler import ImportSampler
+
+
+def test_should_keep_every_kth_index():
+    sampler = ImportSampler("every", 3)
+
+    assert [index for index in range(10) if sampler.keeps_index(index)] == [0, 3, 6, 9]
+    assert sampler.keeps_barcode(None)
+    assert sampler.limit() is None
+
+
+def test_should_limit_head_sample():
+    sampler = ImportSampler.parse("head:100")
+
+    assert sampler.limit() == 100
+    assert all(sampler.keeps_index(index) for index in range(10))
+
+
+def test_should_keep_about_fraction_of_barcodes():
+    sampler = ImportSampler("hash", 0.1)
+
+    kept = [code for code in range(100000) if sampler.keeps_barcode(str(code))]
+
+    assert 9000 < len(kept) < 11000
+
+
+def test_should_keep_same_normalized_barcodes_in_both_sources():
+    sampler = ImportSampler("hash", 0.5, seed=42)
+
+    for code in range(1000):
+        off_code = f"00{code}-1"
+        fdc_gtin_upc = f" {code}1 "
+        assert sampler.keeps_barcode(off_code) == sampler.keeps_barcode(fdc_gtin_upc)
+
+
+def test_should_change_hash_sample_with_seed():
+    first = ImportSampler("hash", 0.5, seed=1)
+    second = ImportSampler("hash", 0.5, seed=2)
+
+    codes = [str(code) for code in range(1000)]
+
+    assert [first.keeps_barcode(code) for code in codes] != [
+        second.keeps_barcode(code) for code in codes
+    ]
+
+
+def test_should_not_keep_missing_barcodes_in_hash_sample():
+    assert not ImportSampler("hash", 1).keeps_barcode(None)
+
+
+def test_should_split_head_sample_between_shards():
+    assert ImportSampler("head", 10).for_shards(3).limit() == 4
+    assert ImportSampler("every", 10).for_shards(3).value == 10
+
+
+@pytest.mark.parametrize("sample", ["tail:10", "hash:2", "every:0", "head:1.5", "head"])
+def test_should_reject_invalid_samples(sample):
+    with pytest.raises(ValueError):
+        ImportSampler.parse(sample)
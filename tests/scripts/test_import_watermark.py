@@ -0,0 +1,27 @@
+import pytest
+
+from scripts.import_watermark import ImportWatermark
+
+
+@pytest.fixture
+def watermarks(tmp_path):
+    return ImportWatermark(str(tmp_path / "watermarks.json"))
+
+
+def test_should_return_none_for_never_imported_source(watermarks):
+    assert watermarks.get("off_jsonl.gz") is None
+
+
+def test_should_return_saved_watermark_of_source(watermarks):
+    watermarks.save("off_jsonl.gz", 1700000000)
+    watermarks.save("other.gz", 1600000000)
+
+    assert watermarks.get("off_jsonl.gz") == 1700000000
+
+
+def test_should_clear_watermark_of_source(watermarks):
+    watermarks.save("off_jsonl.gz", 1700000000)
+
+    watermarks.clear("off_jsonl.gz")
+
+    assert watermarks.get("off_jsonl.gz") is None
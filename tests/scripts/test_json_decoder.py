@@ -0,0 +1,34 @@
+import pytest
+
+from scripts.json_decoder import JsonDecoder
+
+
+@pytest.mark.parametrize("backend", JsonDecoder.available_backends())
+def test_should_decode_bytes_line_with_each_available_backend(backend):
+    decoder = JsonDecoder(backend)
+
+    obj = decoder.loads(b'{"code": "123", "nutriments": {"salt_100g": 1.5}}\n')
+
+    assert decoder.name == backend
+    assert obj == {"code": "123", "nutriments": {"salt_100g": 1.5}}
+
+
+@pytest.mark.parametrize("backend", JsonDecoder.available_backends())
+def test_should_raise_decode_error_of_backend_when_invalid_line(backend):
+    decoder = JsonDecoder(backend)
+
+    with pytest.raises(decoder.decode_error):
+        decoder.loads(b'{"code": ')
+
+
+def test_should_use_fastest_available_backend_by_default():
+    assert JsonDecoder().name == JsonDecoder.available_backends()[0]
+
+
+def test_should_always_have_standard_json_backend():
+    assert JsonDecoder.available_backends()[-1] == "json"
+
+
+def test_should_raise_value_error_when_backend_is_unavailable():
+    with pytest.raises(ValueError):
+        JsonDecoder("unknown")
@@ -0,0 +1,105 @@
+import gzip
+
+import pytest
+
+from scripts.jsonl_reader import JsonlReader
+
+JSONL_CONTENT = b'{"code": "123"}\n{"code": "456"}\n'
+
+
+@pytest.fixture
+def jsonl_file(tmp_path):
+    file = tmp_path / "products.jsonl"
+    file.write_bytes(JSONL_CONTENT)
+    return str(file)
+
+
+@pytest.fixture
+def gz_file(tmp_path):
+    file = tmp_path / "products.jsonl.gz"
+    with gzip.open(file, "wb") as f:
+        f.write(JSONL_CONTENT)
+    return str(file)
+
+
+def test_should_read_lines_of_plain_file(jsonl_file):
+    reader = JsonlReader()
+
+    lines = list(reader.read_lines(jsonl_file))
+
+    assert lines == [b'{"code": "123"}\n', b'{"code": "456"}\n']
+    assert reader.lines_read == 2
+    assert reader.bytes_read == len(JSONL_CONTENT)
+
+
+def test_should_read_decompressed_lines_of_gz_file(gz_file):
+    reader = JsonlReader()
+
+    lines = list(reader.read_lines(gz_file))
+
+    assert lines == [b'{"code": "123"}\n', b'{"code": "456"}\n']
+    assert reader.bytes_read == len(JSONL_CONTENT)
+
+
+def test_should_write_decompressed_copy_when_reading_gz_file(gz_file, tmp_path):
+    copy_file = tmp_path / "copy.jsonl"
+    reader = JsonlReader(decompressed_copy_file=str(copy_file))
+
+    list(reader.read_lines(gz_file))
+
+    assert copy_file.read_bytes() == JSONL_CONTENT
+
+
+def test_should_not_write_copy_when_gz_file_is_not_read_entirely(gz_file, tmp_path):
+    copy_file = tmp_path / "copy.jsonl"
+    copy_file.write_bytes(b"previous copy\n")
+    reader = JsonlReader(decompressed_copy_file=str(copy_file))
+
+    lines = reader.read_lines(gz_file)
+    next(lines)
+    lines.close()
+
+    assert not copy_file.exists()
+    assert not (tmp_path / "copy.jsonl.part").exists()
+
+
+def test_should_not_write_copy_when_reading_plain_file(jsonl_file, tmp_path):
+    copy_file = tmp_path / "copy.jsonl"
+    reader = JsonlReader(decompressed_copy_file=str(copy_file))
+
+    list(reader.read_lines(jsonl_file))
+
+    assert not copy_file.exists()
+
+
+def test_should_split_file_into_shards_aligned_on_lines(tmp_path):
+    lines = [f'{{"code": "{i}"}}\n'.encode() for i in range(10)]
+    file = tmp_path / "products.jsonl"
+    file.write_bytes(b"".join(lines))
+
+    shards = JsonlReader.split_into_shards(str(file), 3)
+
+    read_lines = []
+    for start, end in shards:
+        read_lines += list(JsonlReader().read_lines(str(file), start, end))
+    assert len(shards) == 3
+    assert shards[0][0] == 0
+    assert shards[-1][1] == len(b"".join(lines))
+    assert read_lines == lines
+
+
+def test_should_not_create_empty_shards(jsonl_file):
+    shards = JsonlReader.split_into_shards(jsonl_file, 8)
+
+    assert all(end > start for start, end in shards)
+    assert len(shards) <= 2
+
+
+def test_should_read_lines_of_gz_file_from_decompressed_offset(gz_file, tmp_path):
+    copy_file = tmp_path / "copy.jsonl"
+    reader = JsonlReader(decompressed_copy_file=str(copy_file))
+
+    lines = list(reader.read_lines(gz_file, start=16))
+
+    assert lines == [b'{"code": "456"}\n']
+    assert not copy_file.exists()
@@ -0,0 +1,137 @@
+import pickle
+from datetime import datetime
+
+import pytest
+
+from domain.product.product import Product
+from scripts.mapped_product_cache import MappedProductCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = MappedProductCache(str(tmp_path / "cache.sqlite"), 10, "v1")
+    yield cache
+    cache.close()
+
+
+def create_product(id_match: str) -> Product:
+    return Product(
+        id_match=id_match,
+        product_name="Chocolate cookies",
+        modified_date=datetime(2024, 5, 1),
+        brands=["Brand A"],
+        ecoscore_data=None,
+        nova_data=None,
+    )
+
+
+def test_should_return_cached_product_of_same_raw_record(cache):
+    key = cache.key_of(b'{"code": "123"}')
+    cache.put_many([(key, create_product("123"))])
+
+    documents = cache.get_many([key, cache.key_of(b'{"code": "456"}')])
+
+    assert list(documents) == [key]
+    assert cache.to_product(documents[key]) == create_product("123")
+    assert cache.hits == 1
+    assert cache.misses == 1
+    assert cache.hit_rate() == 0.5
+
+
+def test_should_keep_cached_products_after_reopening(cache, tmp_path):
+    key = cache.key_of(b"raw record")
+    cache.put_many([(key, create_product("123"))])
+    cache.close()
+
+    reopened = MappedProductCache(str(tmp_path / "cache.sqlite"), 10, "v1")
+
+    assert key in reopened.get_many([key])
+    reopened.close()
+
+
+def test_should_empty_cache_when_version_changes(cache, tmp_path):
+    key = cache.key_of(b"raw record")
+    cache.put_many([(key, create_product("123"))])
+    cache.close()
+
+    new_version = MappedProductCache(str(tmp_path / "cache.sqlite"), 10, "v2")
+
+    assert new_version.get_many([key]) == {}
+    new_version.close()
+
+
+def test_should_evict_least_recently_used_products(tmp_path):
+    cache = MappedProductCache(str(tmp_path / "cache.sqlite"), 2, "v1")
+    keys = [cache.key_of(str(index).encode()) for index in range(3)]
+    for index, key in enumerate(keys):
+        cache.put_many([(key, create_product(str(index)))])
+    cache.get_many([keys[0]])
+
+    cache.evict()
+
+    assert set(cache.get_many(keys)) == {keys[0], keys[2]}
+    assert cache.evictions == 1
+    cache.close()
+
+
+def test_should_not_cache_missing_products(cache):
+    key = cache.key_of(b"raw record")
+
+    cache.put_many([(key, None)])
+
+    assert cache.get_many([key]) == {}
+
+
+def test_should_look_up_more_keys_than_sqlite_variables(tmp_path):
+    cache = MappedProductCache(str(tmp_path / "cache.sqlite"), 2000, "v1")
+    keys = [cache.key_of(str(index).encode()) for index in range(1200)]
+    cache.put_many([(key, create_product("123")) for key in keys])
+
+    assert len(cache.get_many(keys)) == 1200
+    cache.close()
+
+
+def test_should_reopen_its_own_connection_when_pickled(cache):
+    key = cache.key_of(b"raw record")
+    cache.put_many([(key, create_product("123"))])
+
+    copy = pickle.loads(pickle.dumps(cache))
+
+    assert key in copy.get_many([key])
+    copy.close()
+
+
+def test_should_change_source_version_with_python_files(tmp_path):
+    (tmp_path / "mapper.py").write_text("MAPPING = 1\n")
+    first_version = MappedProductCache.source_version([str(tmp_path)])
+    (tmp_path / "mapper.py").write_text("MAPPING = 2\n")
+
+    assert MappedProductCache.source_version([str(tmp_path)]) != first_version
+
+
+def test_should_empty_cache_when_mapping_input_file_changes(tmp_path):
+    code_directory = tmp_path / "domain"
+    code_directory.mkdir()
+    (code_directory / "mapper.py").write_text("MAPPING = 1\n")
+    mapping_file = tmp_path / "categories_mapping.json"
+    mapping_file.write_text('{"Cheese": ["en:cheeses"]}')
+    cache_file = str(tmp_path / "cache.sqlite")
+
+    def create_cache() -> MappedProductCache:
+        return MappedProductCache(
+            cache_file,
+            10,
+            MappedProductCache.source_version(
+                [str(code_directory)], [str(mapping_file)]
+            ),
+        )
+
+    cache = create_cache()
+    key = cache.key_of(b'{"code": "123"}')
+    cache.put_many([(key, create_product("123"))])
+    cache.close()
+    mapping_file.write_text('{"Cheese": ["en:dairies"]}')
+
+    new_version = create_cache()
+    assert new_version.get_many([key]) == {}
+    new_version.close()
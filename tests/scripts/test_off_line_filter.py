@@ -0,0 +1,47 @@
+import pytest
+
+from scripts.off_line_filter import OffLineFilter
+
+
+@pytest.fixture
+def line_filter():
+    return OffLineFilter("en:canada")
+
+
+def test_should_pre_reject_line_without_quoted_value(line_filter):
+    line = b'{"code": "123", "countries_tags": ["en:france"]}\n'
+
+    assert not line_filter.might_match(line)
+    assert line_filter.lines_scanned == 1
+    assert line_filter.pre_rejected == 1
+
+
+def test_should_keep_line_containing_quoted_value(line_filter):
+    line = b'{"code": "123", "countries_tags": ["en:france", "en:canada"]}\n'
+
+    assert line_filter.might_match(line)
+    assert line_filter.pre_rejected == 0
+
+
+def test_should_not_keep_line_containing_value_as_part_of_another_one(line_filter):
+    line = b'{"code": "123", "countries_tags": ["en:canada-dry"]}\n'
+
+    assert not line_filter.might_match(line)
+
+
+def test_should_confirm_match_when_value_is_in_field(line_filter):
+    assert line_filter.matches({"countries_tags": ["en:france", "en:canada"]})
+
+
+def test_should_not_confirm_match_when_value_is_in_another_field(line_filter):
+    obj = {"countries_tags": ["en:france"], "product_name": "en:canada"}
+
+    assert not line_filter.matches(obj)
+    assert not line_filter.matches({"code": "123"})
+
+
+def test_should_add_recorded_confirmed_objects(line_filter):
+    line_filter.record_confirmed(2)
+    line_filter.record_confirmed(3)
+
+    assert line_filter.confirmed == 5
@@ -0,0 +1,99 @@
+import pytest
+
+from scripts.off_watermark_filter import OffWatermarkFilter
+
+
+@pytest.fixture
+def watermark_filter():
+    return OffWatermarkFilter(1700000000)
+
+
+def test_should_pre_skip_line_modified_before_watermark(watermark_filter):
+    line = b'{"code": "123", "last_modified_t": 1600000000}\n'
+
+    assert not watermark_filter.might_be_newer(line)
+    assert watermark_filter.lines_scanned == 1
+    assert watermark_filter.pre_skipped == 1
+
+
+def test_should_pre_skip_line_modified_at_watermark(watermark_filter):
+    assert not watermark_filter.might_be_newer(b'{"last_modified_t":1700000000}\n')
+
+
+def test_should_keep_line_modified_after_watermark(watermark_filter):
+    line = b'{"code": "123", "last_modified_t": 1800000000}\n'
+
+    assert watermark_filter.might_be_newer(line)
+    assert watermark_filter.pre_skipped == 0
+
+
+def test_should_keep_line_when_any_found_value_is_after_watermark(watermark_filter):
+    line = (
+        b'{"images": {"last_modified_t": 1800000000}, "last_modified_t": 1600000000}\n'
+    )
+
+    assert watermark_filter.might_be_newer(line)
+
+
+def test_should_keep_line_without_last_modified_t(watermark_filter):
+    assert watermark_filter.might_be_newer(b'{"code": "123"}\n')
+
+
+def test_should_keep_every_line_without_byte_scan():
+    watermark_filter = OffWatermarkFilter(1700000000, byte_scan=False)
+
+    assert watermark_filter.might_be_newer(b'{"last_modified_t": 1600000000}\n')
+    assert watermark_filter.lines_scanned == 0
+
+
+def test_should_confirm_decoded_object_is_newer(watermark_filter):
+    assert watermark_filter.is_newer({"last_modified_t": 1800000000})
+    assert watermark_filter.is_newer({"code": "123"})
+    assert not watermark_filter.is_newer({"last_modified_t": 1600000000})
+    assert not watermark_filter.is_newer({"last_modified_t": 1700000000})
+
+
+def test_should_keep_line_with_nested_value_and_no_top_level_value(
+    watermark_filter,
+):
+    line = b'{"code": "123", "images": {"front": {"last_modified_t": 1600000000}}}\n'
+
+    assert watermark_filter.might_be_newer(line)
+    assert watermark_filter.is_newer({"code": "123", "images": {}})
+
+
+def test_should_pre_skip_line_with_nested_and_top_level_values_before_watermark(
+    watermark_filter,
+):
+    line = (
+        b'{"images": {"last_modified_t": 1500000000}, "last_modified_t": 1600000000}\n'
+    )
+
+    assert not watermark_filter.might_be_newer(line)
+
+
+def test_should_keep_line_with_value_which_is_not_an_integer(watermark_filter):
+    line = b'{"code": "123", "last_modified_t": 1632675242.5}\n'
+
+    assert watermark_filter.might_be_newer(line)
+    assert watermark_filter.is_newer({"last_modified_t": 1632675242.5})
+
+
+def test_should_ignore_brackets_in_strings_to_find_top_level_value(
+    watermark_filter,
+):
+    pre_skipped = b'{"product_name": "Cookies {new]", "last_modified_t": 1600000000}\n'
+    nested = (
+        b'{"product_name": "Cookies }", "packaging": {"last_modified_t": 1600000000}}\n'
+    )
+
+    assert not watermark_filter.might_be_newer(pre_skipped)
+    assert watermark_filter.might_be_newer(nested)
+
+
+def test_should_keep_line_with_escaped_quotes_before_value(watermark_filter):
+    line = (
+        b'{"product_name": "The \\"best\\" {cookies", "last_modified_t": 1600000000}\n'
+    )
+
+    assert watermark_filter.might_be_newer(line)
@@ -0,0 +1,119 @@
+import gzip
+import json
+import logging
+import pickle
+
+from scripts.quarantine_writer import QuarantineWriter
+
+
+def read_entries(file) -> list[dict]:
+    with gzip.open(file, "rt", encoding="utf-8") as quarantined:
+        return [json.loads(line) for line in quarantined]
+
+
+def test_should_write_bad_records_with_their_error_and_position(tmp_path):
+    quarantine = QuarantineWriter(str(tmp_path / "quarantine.jsonl.gz"))
+
+    quarantine.write(ValueError("invalid line"), 10, b'{"code": \n')
+    quarantine.write(KeyError("code"), 42, {"name": "é"})
+    quarantine.close()
+
+    assert read_entries(quarantine.quarantine_file) == [
+        {
+            "reason": "ValueError",
+            "error": "invalid line",
+            "position": 10,
+            "record": '{"code": ',
+        },
+        {
+            "reason": "KeyError",
+            "error": "'code'",
+            "position": 42,
+            "record": {"name": "é"},
+        },
+    ]
+
+
+def test_should_count_bad_records_per_reason_and_log_first_one_only(tmp_path, caplog):
+    quarantine = QuarantineWriter(str(tmp_path / "quarantine.jsonl.gz"))
+
+    with caplog.at_level(logging.INFO):
+        for position in range(3):
+            quarantine.write(ValueError("invalid"), position, b"x")
+        quarantine.write(TypeError("wrong type"), 3, b"y")
+        quarantine.log_counts()
+    quarantine.close()
+
+    assert quarantine.counts == {"ValueError": 3, "TypeError": 1}
+    assert quarantine.total() == 4
+    assert caplog.text.count("Quarantining record") == 2
+    assert "4 records quarantined" in caplog.text
+
+
+def test_should_append_to_existing_quarantine_file(tmp_path):
+    quarantine = QuarantineWriter(str(tmp_path / "quarantine.jsonl.gz"))
+    quarantine.write(ValueError("first"), 0, b"a")
+    quarantine.close()
+
+    quarantine.write(ValueError("second"), 1, b"b")
+    quarantine.close()
+
+    assert [entry["error"] for entry in read_entries(quarantine.quarantine_file)] == [
+        "first",
+        "second",
+    ]
+
+
+def test_should_write_each_flush_as_complete_gzip_member(tmp_path):
+    quarantine = QuarantineWriter(str(tmp_path / "quarantine.jsonl.gz"))
+    quarantine.flush_size = 2
+    quarantine.write(ValueError("first"), 0, b"a")
+    quarantine.write(ValueError("second"), 1, b"b")
+    # The writer of the interrupted import is never closed, its last record is not written
+    quarantine.write(ValueError("lost"), 2, b"c")
+
+    resumed = QuarantineWriter(quarantine.quarantine_file)
+    resumed.write(ValueError("third"), 2, b"c")
+    resumed.close()
+
+    assert [entry["error"] for entry in read_entries(quarantine.quarantine_file)] == [
+        "first",
+        "second",
+        "third",
+    ]
+
+
+def test_should_truncate_long_error_messages(tmp_path):
+    quarantine = QuarantineWriter(str(tmp_path / "quarantine.jsonl.gz"))
+
+    quarantine.write(ValueError("x" * 1000), 0, b"a")
+    quarantine.close()
+
+    (entry,) = read_entries(quarantine.quarantine_file)
+    assert len(entry["error"]) == QuarantineWriter.max_error_length
+
+
+def test_should_pickle_writer_without_its_file_and_counts(tmp_path):
+    quarantine = QuarantineWriter(str(tmp_path / "quarantine.jsonl.gz"))
+    quarantine.write(ValueError("parent"), 0, b"a")
+
+    copy = pickle.loads(pickle.dumps(quarantine))
+    copy.write(ValueError("copy"), 1, b"b")
+    copy.close()
+    quarantine.close()
+
+    assert copy.counts == {"ValueError": 1}
+    assert len(read_entries(quarantine.quarantine_file)) == 2
+
+
+def test_should_clear_quarantine_file_and_shard_files(tmp_path):
+    quarantine = QuarantineWriter(str(tmp_path / "quarantine.jsonl.gz"))
+    shard = quarantine.for_shard(0, 100)
+    quarantine.write(ValueError("invalid"), 0, b"a")
+    shard.write(ValueError("invalid"), 0, b"a")
+    shard.close()
+
+    quarantine.clear()
+
+    assert shard.quarantine_file == f"{quarantine.quarantine_file}.shard-0-100"
+    assert list(tmp_path.iterdir()) == []